@@ -0,0 +1,324 @@
+import asyncio
+import json
+import logging
+import uuid
+from typing import Any
+
+import bson
+from redis.asyncio import Redis
+
+from ..settings import get_settings
+from ..tracing import traced
+from ..worker import get_redis
+from .memory import TTLCache
+
+settings = get_settings()
+
+logger = logging.getLogger("gunicorn.error")
+
+INVALIDATION_CHANNEL = "cache:creator:invalidate"
+
+# The variant of a creator holding all of their fields, which can stand in for any other variant.
+FULL_VARIANT = "*"
+
+# The field of the shared entry of a creator changed on every invalidation, to tell whether one happened
+# since the entry was read. It can't collide with the variants, which are named after fields.
+VERSION_FIELD = "#version"
+
+# Replaces the entry of a creator with a new version of it, with nothing cached for the version yet.
+_INVALIDATE_SCRIPT = """
+redis.call("DEL", KEYS[1])
+redis.call("HSET", KEYS[1], ARGV[1], ARGV[2])
+redis.call("EXPIRE", KEYS[1], ARGV[3])
+"""
+
+# Caches a variant unless the entry has been invalidated since it was read. The entry expires as long after
+# it was created as a variant is cached for, so caching another variant doesn't keep the older ones alive.
+_CACHE_VARIANT_SCRIPT = """
+if (redis.call("HGET", KEYS[1], ARGV[1]) or "") ~= ARGV[2] then
+    return 0
+end
+redis.call("HSET", KEYS[1], ARGV[3], ARGV[4])
+if redis.call("TTL", KEYS[1]) < 0 then
+    redis.call("EXPIRE", KEYS[1], ARGV[5])
+end
+return 1
+"""
+
+# The first tier, local to a process. The second one is shared by all the processes through Redis.
+# Both keep the variants of a creator limited to different fields, and the pages of their assets, together,
+# so they are invalidated together.
+# The entries hold the encoded variants, so every read gets its own copy to change.
+local_cache = TTLCache(maxsize=settings.creator_cache_size, ttl=settings.creator_cache_ttl)
+
+# Counts the entries dropped from the local cache, to tell whether an invalidation arrived during a read from Redis.
+local_invalidations = 0
+
+invalidation_listener = None
+
+
+def _get_redis_key(email: str) -> str:
+    return f"cache:creator:{email}"
+
+
+def _get_variant(fields: list[str] | None) -> str:
+    return ",".join(sorted(fields)) if fields is not None else FULL_VARIANT
+
+
+def _get_assets_variant(asset_type: str | None, offset: int, limit: int | None) -> str:
+    # Can't collide with the variants named after fields, nor with the version.
+    return f"assets:{json.dumps([asset_type, offset, limit])}"
+
+
+@traced("redis")
+async def get_cached_creators(
+    emails: list[str],
+    fields: list[str] | None = None,
+) -> tuple[dict[str, dict[str, Any]], dict[str, bytes]]:
+    """
+    Get the cached creators from the local cache, falling back to Redis for the ones missing there.
+
+    Args:
+        emails (list[str]): The emails of the creators.
+        fields (list[str], optional): The fields of the creators needed. Defaults to all of them.
+
+    Returns:
+        tuple[dict[str, dict[str, Any]], dict[str, bytes]]: The creator data of the cached creators by their emails,
+            with all of their fields or at least the needed ones, and the versions of the entries of the missing
+            creators by their emails, to cache them with (see `cache_creators`).
+    """
+    cached_variants, versions = await _get_cached_variants(emails, _get_variant(fields))
+    return {email: creator for email, (_, creator) in cached_variants.items()}, versions
+
+
+@traced("redis")
+async def cache_creators(
+    creators: list[dict[str, Any]],
+    versions: dict[str, bytes],
+    fields: list[str] | None = None,
+):
+    """
+    Put the creators into both tiers of the cache, skipping the ones invalidated since they were looked up
+    in the cache, whose data read from the database in the meantime may be stale.
+
+    Args:
+        creators (list[dict[str, Any]]): The creator data as stored in the database.
+        versions (dict[str, bytes]): The versions of the entries of the creators by their emails,
+            as returned by `get_cached_creators` before the creators were read from the database.
+        fields (list[str], optional): The fields the creator data is limited to. Defaults to all of them.
+    """
+    await _cache_variants({creator["email"]: creator for creator in creators}, versions, _get_variant(fields))
+
+
+@traced("redis")
+async def get_cached_assets(
+    emails: list[str],
+    asset_type: str | None = None,
+    offset: int = 0,
+    limit: int | None = None,
+) -> tuple[dict[str, list[dict[str, Any]]], dict[str, bytes]]:
+    """
+    Get the cached pages of the assets of creators, cached along with the creators, or sliced from their cached
+    data when it holds all of their fields.
+
+    Args:
+        emails (list[str]): The emails of the creators.
+        asset_type (str, optional): The type of the assets on the page. Defaults to all of them.
+        offset (int, optional): The number of assets before the page. Defaults to 0.
+        limit (int, optional): The number of assets on the page. Defaults to all of them.
+
+    Returns:
+        tuple[dict[str, list[dict[str, Any]]], dict[str, bytes]]: The cached pages of the assets by the emails
+            of the creators, and the versions of the entries of the missing ones by their emails, to cache them with
+            (see `cache_assets`).
+    """
+    cached_variants, versions = await _get_cached_variants(emails, _get_assets_variant(asset_type, offset, limit))
+
+    cached_assets = {}
+    for email, (variant, value) in cached_variants.items():
+        if variant == FULL_VARIANT:
+            assets = [asset for asset in value.get("assets", []) if asset_type is None or asset["type"] == asset_type]
+            cached_assets[email] = assets[offset : offset + limit if limit is not None else None]
+        else:
+            cached_assets[email] = value["assets"]
+
+    return cached_assets, versions
+
+
+@traced("redis")
+async def cache_assets(
+    assets_by_email: dict[str, list[dict[str, Any]]],
+    versions: dict[str, bytes],
+    asset_type: str | None = None,
+    offset: int = 0,
+    limit: int | None = None,
+):
+    """
+    Put pages of the assets of creators into both tiers of the cache, along with the creators, so they are
+    invalidated together. Skips the creators invalidated since they were looked up in the cache.
+
+    Args:
+        assets_by_email (dict[str, list[dict[str, Any]]]): The pages of the assets by the emails of the creators.
+        versions (dict[str, bytes]): The versions of the entries of the creators by their emails,
+            as returned by `get_cached_assets` before the assets were read from the database.
+        asset_type (str, optional): The type of the assets on the page. Defaults to all of them.
+        offset (int, optional): The number of assets before the page. Defaults to 0.
+        limit (int, optional): The number of assets on the page. Defaults to all of them.
+    """
+    await _cache_variants(
+        {email: {"assets": assets} for email, assets in assets_by_email.items()},
+        versions,
+        _get_assets_variant(asset_type, offset, limit),
+    )
+
+
+async def _get_cached_variants(
+    emails: list[str],
+    variant: str,
+) -> tuple[dict[str, tuple[str, dict[str, Any]]], dict[str, bytes]]:
+    cached_variants = {}
+    versions = {}
+    missing_emails = []
+    for email in emails:
+        variants = local_cache.get(email, {})
+        for name in (FULL_VARIANT, variant):
+            if name in variants:
+                cached_variants[email] = (name, bson.decode(variants[name]))
+                break
+        else:
+            missing_emails.append(email)
+
+    if missing_emails:
+        invalidations = local_invalidations
+        redis = await get_redis()
+        async with redis.pipeline(transaction=False) as pipeline:
+            for email in missing_emails:
+                pipeline.hmget(_get_redis_key(email), [FULL_VARIANT, variant, VERSION_FIELD])
+            values = await pipeline.execute()
+        for email, (full_value, value, version) in zip(missing_emails, values):
+            if full_value is not None or value is not None:
+                name = FULL_VARIANT if full_value is not None else variant
+                # What was read may predate an invalidation already applied to the local cache.
+                if local_invalidations == invalidations:
+                    _set_local_variant(email, name, full_value or value)
+                cached_variants[email] = (name, bson.decode(full_value or value))
+            else:
+                versions[email] = version or b""
+
+    return cached_variants, versions
+
+
+async def _cache_variants(values_by_email: dict[str, dict[str, Any]], versions: dict[str, bytes], variant: str):
+    encoded_values = {email: bson.encode(value) for email, value in values_by_email.items() if email in versions}
+    if not encoded_values:
+        return
+
+    # Set locally before the shared entry, so an invalidation coming after the latter drops it.
+    for email, encoded_value in encoded_values.items():
+        _set_local_variant(email, variant, encoded_value)
+
+    redis = await get_redis()
+    async with redis.pipeline(transaction=False) as pipeline:
+        for email, encoded_value in encoded_values.items():
+            pipeline.eval(
+                _CACHE_VARIANT_SCRIPT,
+                1,
+                _get_redis_key(email),
+                VERSION_FIELD,
+                versions[email],
+                variant,
+                encoded_value,
+                settings.creator_cache_ttl,
+            )
+        cached = await pipeline.execute()
+
+    for email, is_cached in zip(encoded_values, cached):
+        if not is_cached:
+            _drop_local(email)
+
+
+def _set_local_variant(email: str, variant: str, encoded_value: bytes):
+    variants = local_cache.get(email, {})
+    variants[variant] = encoded_value
+    local_cache.set(email, variants)
+
+
+def _drop_local(email: str | None = None):
+    global local_invalidations
+    local_invalidations += 1
+    if email is None:
+        local_cache.clear()
+    else:
+        local_cache.delete(email)
+
+
+async def invalidate_creator(email: str):
+    """
+    Drop a creator from the shared cache and tell every process to drop it from its local cache too.
+
+    Args:
+        email (str): The email of the creator.
+    """
+    await invalidate_creators([email])
+
+
+@traced("redis")
+async def invalidate_creators(emails: list[str]):
+    """
+    Drop all the variants of creators from the shared cache and tell every process to drop them from its local cache
+    too, in a single round trip. The data of the creators read before is then no longer cached.
+
+    Args:
+        emails (list[str]): The emails of the creators.
+    """
+    if not emails:
+        return
+
+    for email in emails:
+        _drop_local(email)
+
+    version = uuid.uuid4().hex
+    redis = await get_redis()
+    async with redis.pipeline(transaction=False) as pipeline:
+        for email in emails:
+            pipeline.eval(
+                _INVALIDATE_SCRIPT, 1, _get_redis_key(email), VERSION_FIELD, version, settings.creator_cache_ttl
+            )
+        for email in emails:
+            pipeline.publish(INVALIDATION_CHANNEL, email)
+        await pipeline.execute()
+
+
+async def _listen_for_invalidations():
+    while True:
+        redis = Redis(host=settings.redis_host, port=settings.redis_port)
+        try:
+            async with redis.pubsub() as pubsub:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                # The invalidations published while not subscribed are lost.
+                _drop_local()
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        _drop_local(message["data"].decode())
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Lost the subscription to the creator cache invalidations, resubscribing...")
+            await asyncio.sleep(1)
+        finally:
+            await redis.close()
+
+
+async def start_invalidation_listener():
+    global invalidation_listener
+    if invalidation_listener is None:
+        invalidation_listener = asyncio.create_task(_listen_for_invalidations())
+
+
+async def stop_invalidation_listener():
+    global invalidation_listener
+    if invalidation_listener is not None:
+        # There is nothing to stop once the event loop of the listener is closed.
+        if not invalidation_listener.get_loop().is_closed():
+            invalidation_listener.cancel()
+        invalidation_listener = None
@@ -0,0 +1,70 @@
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Any
+
+
+class TTLCache:
+    """
+    An in-process cache that evicts the least recently used entries once it is full
+    and treats the entries older than the time to live as missing.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Get the value of a key, marking it as the most recently used.
+
+        Args:
+            key (Hashable): The key to look up.
+            default (Any, optional): The value to return if the key is missing or expired. Defaults to None.
+
+        Returns:
+            Any: The cached value or the default.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return default
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        """
+        Set the value of a key, evicting the least recently used keys if the cache is full.
+
+        Args:
+            key (Hashable): The key to set.
+            value (Any): The value to cache.
+        """
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: Hashable):
+        """
+        Delete a key from the cache if it's there.
+
+        Args:
+            key (Hashable): The key to delete.
+        """
+        self._entries.pop(key, None)
+
+    def clear(self):
+        """
+        Delete all the keys from the cache.
+        """
+        self._entries.clear()
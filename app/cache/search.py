@@ -0,0 +1,128 @@
+import hashlib
+import json
+import re
+from typing import Any
+
+import bson
+from redis.asyncio import Redis
+
+from ..search_engine.mappings import INDICES
+from ..settings import get_settings
+from ..tracing import traced
+
+settings = get_settings()
+
+# How long the changes of an index take to become visible to its searches when its refresh interval isn't set.
+DEFAULT_REFRESH_INTERVAL = 1.0
+
+_TIME_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+def _get_generation_key(index_name: str) -> str:
+    return f"cache:search:{index_name}:generation"
+
+
+def _get_settling_key(index_name: str) -> str:
+    return f"cache:search:{index_name}:settling"
+
+
+def _get_refresh_interval(index_name: str) -> float:
+    value = INDICES.get(index_name, {}).get("settings", {}).get("refresh_interval")
+    if value is None:
+        return DEFAULT_REFRESH_INTERVAL
+    match = re.fullmatch(r"(\d+)(ms|s|m|h)", value)
+    # Disabled, the changes are then made visible by the explicit refreshes, which bump the generation afterwards.
+    return int(match[1]) * _TIME_UNITS[match[2]] if match else 0.0
+
+
+@traced("redis")
+async def bump_search_generation(redis: Redis, index_name: str):
+    """
+    Invalidate all the cached search results of an index at once by moving it to the next generation.
+
+    The changes become visible to the searches only once the index is refreshed, so the generation is settling
+    for the refresh interval of the index, and the results of the searches made meanwhile are cached apart from
+    the ones made afterwards (see `get_search_cache_key`), instead of outliving the refresh.
+
+    Args:
+        redis (Redis): The Redis connection.
+        index_name (str): The name of the index that has changed.
+    """
+    refresh_interval = _get_refresh_interval(index_name)
+    async with redis.pipeline(transaction=False) as pipeline:
+        pipeline.incr(_get_generation_key(index_name))
+        if refresh_interval:
+            pipeline.set(_get_settling_key(index_name), 1, px=int(refresh_interval * 1000))
+        await pipeline.execute()
+
+
+@traced("redis")
+async def get_search_cache_key(
+    redis: Redis,
+    index_name: str,
+    query: dict,
+    page: int,
+    per_page: int,
+    fields: list[str] | None = None,
+    aggregations: dict | None = None,
+    track_total_hits: bool | int = False,
+) -> str:
+    """
+    Get the key of a search results page in the current generation of the index, which is a different one
+    while the generation is settling.
+
+    Args:
+        redis (Redis): The Redis connection.
+        index_name (str): The name of the searched index.
+        query (dict): The Elasticsearch query to search with.
+        page (int): The page number of the search results.
+        per_page (int): The number of search results per page.
+        fields (list[str], optional): The fields of the documents to return. Defaults to all of them.
+        aggregations (dict, optional): The Elasticsearch aggregations computed along. Defaults to none.
+        track_total_hits (bool | int, optional): Whether or up to how many of the total hits are counted.
+            Defaults to False.
+
+    Returns:
+        str: The key of the cached search results.
+    """
+    generation, settling = await redis.mget(_get_generation_key(index_name), _get_settling_key(index_name))
+    generation = f"{int(generation or 0)}{'.settling' if settling else ''}"
+
+    search = json.dumps(
+        [query, page, per_page, sorted(fields) if fields is not None else None, aggregations, track_total_hits],
+        sort_keys=True,
+    )
+    search_hash = hashlib.sha1(search.encode()).hexdigest()
+
+    return f"cache:search:{index_name}:{generation}:{search_hash}"
+
+
+@traced("redis")
+async def get_cached_search(redis: Redis, key: str) -> dict[str, Any] | None:
+    """
+    Get the cached search results.
+
+    Args:
+        redis (Redis): The Redis connection.
+        key (str): The key of the cached search results.
+
+    Returns:
+        Optional[dict[str, Any]]: The search results, or None if they are not cached.
+    """
+    value = await redis.get(key)
+    if value is None:
+        return None
+    return bson.decode(value)
+
+
+@traced("redis")
+async def cache_search(redis: Redis, key: str, results: dict[str, Any]):
+    """
+    Cache the search results for a short time, which bounds the staleness caused by the refresh interval of the index.
+
+    Args:
+        redis (Redis): The Redis connection.
+        key (str): The key of the cached search results.
+        results (dict[str, Any]): The search results, e.g. the found documents along with the aggregations.
+    """
+    await redis.set(key, bson.encode(results), ex=settings.search_cache_ttl)
@@ -0,0 +1,89 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from functools import partial
+from typing import Any
+
+from ..metrics import SINGLE_FLIGHT_CALLS, SINGLE_FLIGHT_COALESCED
+
+
+class SingleFlight:
+    """
+    A class that shares one in-flight call among the concurrent callers asking for the same key,
+    so a spike of identical reads within a process turns into a single read.
+
+    The `calls` and `coalesced` counters tell how many keys were asked for and how many of them
+    were served by a call that was already in flight, and are exported as metrics under the name.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.coalesced = 0
+        self._futures: dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Call the function unless there is an in-flight call for the key already, and return its result.
+
+        Args:
+            key (Hashable): The key identifying the call.
+            fn (Callable[[], Awaitable[Any]]): The function to call.
+
+        Returns:
+            Any: The result of the call.
+        """
+
+        async def call(keys: list[Hashable]) -> dict[Hashable, Any]:
+            return {key: await fn()}
+
+        results = await self.do_many([key], call)
+        return results[key]
+
+    async def do_many(
+        self,
+        keys: list[Hashable],
+        fn: Callable[[list[Hashable]], Awaitable[dict[Hashable, Any]]],
+    ) -> dict[Hashable, Any]:
+        """
+        Call the function with the keys that don't have an in-flight call yet, and join the calls of the others.
+
+        Args:
+            keys (list[Hashable]): The keys to get the results for.
+            fn (Callable[[list[Hashable]], Awaitable[dict[Hashable, Any]]]): The function to call with a batch of keys,
+                returning the results by key. The keys it omits get None as their result.
+
+        Returns:
+            dict[Hashable, Any]: The results by key.
+        """
+        futures = {}
+        new_keys = []
+        for key in dict.fromkeys(keys):
+            if key in self._futures:
+                futures[key] = self._futures[key]
+            else:
+                new_keys.append(key)
+
+        self.calls += len(futures) + len(new_keys)
+        self.coalesced += len(futures)
+        SINGLE_FLIGHT_CALLS.labels(self.name).inc(len(futures) + len(new_keys))
+        SINGLE_FLIGHT_COALESCED.labels(self.name).inc(len(futures))
+
+        if new_keys:
+            loop = asyncio.get_running_loop()
+            for key in new_keys:
+                futures[key] = self._futures[key] = loop.create_future()
+            task = asyncio.create_task(fn(new_keys))
+            task.add_done_callback(partial(self._resolve, new_keys))
+
+        # Shielded, so that a cancelled caller doesn't cancel the call shared with the others.
+        return {key: await asyncio.shield(future) for key, future in futures.items()}
+
+    def _resolve(self, keys: list[Hashable], task: asyncio.Task):
+        for key in keys:
+            future = self._futures.pop(key)
+            if task.cancelled():
+                future.cancel()
+            elif task.exception() is not None:
+                future.set_exception(task.exception())
+            else:
+                future.set_result(task.result().get(key))
@@ -1,7 +1,9 @@
 import logging
 
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import ASCENDING, IndexModel
 
+from ..metrics import MongoCommandListener
 from ..settings import get_settings
 
 settings = get_settings()
@@ -14,7 +16,7 @@ mongo_client = None
 async def get_db() -> AsyncIOMotorDatabase:
     global mongo_client
     if mongo_client is None:
-        mongo_client = AsyncIOMotorClient(settings.mongodb_url)
+        mongo_client = AsyncIOMotorClient(settings.mongodb_url, event_listeners=[MongoCommandListener()])
     return mongo_client[settings.mongodb_database]
 
 
@@ -23,3 +25,13 @@ async def close_db():
     if mongo_client is not None:
         mongo_client.close()
         mongo_client = None
+
+
+async def create_indexes(db: AsyncIOMotorDatabase):
+    await db["creators"].create_indexes(
+        [
+            IndexModel([("email", ASCENDING)], unique=True),
+            IndexModel([("signed_up", ASCENDING)]),
+            IndexModel([("assets.type", ASCENDING)]),
+        ]
+    )
@@ -0,0 +1,128 @@
+import time
+from collections.abc import Awaitable, Callable, Iterator
+from inspect import isawaitable
+from typing import Any
+
+from graphql import GraphQLResolveInfo
+from strawberry.extensions import SchemaExtension
+from strawberry.extensions.tracing.utils import should_skip_tracing
+from strawberry.types import ExecutionContext
+
+from ..metrics import GRAPHQL_OPERATION_SECONDS, GRAPHQL_PHASE_SECONDS, GRAPHQL_RESOLVER_SECONDS
+from ..settings import get_settings
+from ..tracing import Trace, current_trace
+
+settings = get_settings()
+
+
+class TimingExtension(SchemaExtension):
+    """
+    A schema extension timing the phases of a GraphQL operation, its resolvers and the datastore calls
+    made meanwhile (see `app.tracing`). The timings are recorded in histograms and, when `graphql_timing_results`
+    is enabled, returned in milliseconds in the `timing` key of the `extensions` of the response.
+
+    The fields resolved by the default resolvers, i.e. read off their parent, are not timed.
+    """
+
+    def __init__(self, *, execution_context: ExecutionContext):
+        super().__init__(execution_context=execution_context)
+        self.trace = Trace()
+        self.duration: float | None = None
+        self.phases: dict[str, float] = {}
+        self.resolvers: list[dict[str, Any]] = []
+
+    def on_operation(self) -> Iterator[None]:
+        token = current_trace.set(self.trace)
+        try:
+            yield
+        finally:
+            current_trace.reset(token)
+            self.duration = time.perf_counter() - self.trace.started_at
+            GRAPHQL_OPERATION_SECONDS.labels(*self._get_operation_labels()).observe(self.duration)
+
+    def on_parse(self) -> Iterator[None]:
+        yield from self._time_phase("parsing")
+
+    def on_validate(self) -> Iterator[None]:
+        yield from self._time_phase("validation")
+
+    def on_execute(self) -> Iterator[None]:
+        yield from self._time_phase("execution")
+
+    def resolve(
+        self,
+        _next: Callable,
+        root: Any,
+        info: GraphQLResolveInfo,
+        *args: str,
+        **kwargs: Any,
+    ) -> Any:
+        if should_skip_tracing(_next, info):
+            return _next(root, info, *args, **kwargs)
+
+        started_at = time.perf_counter()
+        result = _next(root, info, *args, **kwargs)
+        if isawaitable(result):
+            return self._await_resolver(result, info, started_at)
+
+        self._record_resolver(info, started_at)
+        return result
+
+    def get_results(self) -> dict[str, Any]:
+        if not settings.graphql_timing_results:
+            return {}
+
+        # The results of an operation that failed to parse are taken before it ends.
+        duration = self.duration if self.duration is not None else time.perf_counter() - self.trace.started_at
+        return {
+            "timing": {
+                "duration": _to_ms(duration),
+                "phases": {phase: _to_ms(phase_duration) for phase, phase_duration in self.phases.items()},
+                "resolvers": self.resolvers,
+                "spans": [
+                    {
+                        "kind": span.kind,
+                        "name": span.name,
+                        "startOffset": _to_ms(span.start_offset),
+                        "duration": _to_ms(span.duration),
+                    }
+                    for span in self.trace.spans
+                ],
+            }
+        }
+
+    def _get_operation_labels(self) -> tuple[str, str]:
+        # Operations that failed to parse or don't match the given name are labeled as unknown.
+        try:
+            operation_type = self.execution_context.operation_type.value
+        except RuntimeError:
+            return "unknown", "unknown"
+        return self.execution_context.operation_name or "anonymous", operation_type
+
+    def _time_phase(self, phase: str) -> Iterator[None]:
+        started_at = time.perf_counter()
+        yield
+        duration = time.perf_counter() - started_at
+        self.phases[phase] = duration
+        GRAPHQL_PHASE_SECONDS.labels(phase).observe(duration)
+
+    async def _await_resolver(self, result: Awaitable[Any], info: GraphQLResolveInfo, started_at: float) -> Any:
+        try:
+            return await result
+        finally:
+            self._record_resolver(info, started_at)
+
+    def _record_resolver(self, info: GraphQLResolveInfo, started_at: float):
+        duration = time.perf_counter() - started_at
+        GRAPHQL_RESOLVER_SECONDS.labels(f"{info.parent_type.name}.{info.field_name}").observe(duration)
+        self.resolvers.append(
+            {
+                "path": ".".join(str(key) for key in info.path.as_list()),
+                "startOffset": _to_ms(started_at - self.trace.started_at),
+                "duration": _to_ms(duration),
+            }
+        )
+
+
+def _to_ms(seconds: float) -> float:
+    return round(seconds * 1000, 3)
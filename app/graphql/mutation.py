@@ -1,13 +1,27 @@
 import strawberry
 from graphql import GraphQLError
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import DuplicateKeyError
 from strawberry.types import Info
 
 from ..models.asset import AssetModel
 from ..models.creator import CreatorModel
 from ..schemas.asset import AssetSchema
-from ..schemas.creator import CreatorSchema
-from ..services.creator import create_creator, delete_creator_by_email, get_creator_by_email, update_creator_assets
+from ..schemas.creator import AddCreatorResult, CreatorInput, CreatorSchema
+from ..services.creator import (
+    add_creator_asset,
+    create_creator,
+    creator_exists,
+    delete_creator_by_email,
+    import_creators,
+    remove_creator_asset,
+)
+from ..settings import get_settings
+
+settings = get_settings()
+
+# The most creators added by a single addCreators mutation, larger imports go through the NDJSON route.
+MAX_ADDED_CREATORS = 1_000
 
 
 @strawberry.type
@@ -24,8 +38,12 @@ class Mutation:
                 email
                 signedUp
                 assets {
-                    type
-                    createdAt
+                    edges {
+                        node {
+                            type
+                            createdAt
+                        }
+                    }
                 }
             }
         }
@@ -40,14 +58,55 @@ class Mutation:
         """
         db: AsyncIOMotorDatabase = info.context["db"]
 
-        creator = await get_creator_by_email(db, email)
-        if creator:
+        new_creator = CreatorModel(username=username, email=email).dict(by_alias=True)
+        try:
+            result = await create_creator(db, new_creator)
+        except DuplicateKeyError:
             raise GraphQLError(message="Creator already exists.")
 
-        new_creator = CreatorModel(username=username, email=email).dict(by_alias=True)
-        result = await create_creator(db, new_creator)
+        return CreatorSchema.from_document(result)
 
-        return CreatorSchema(**result)
+    @strawberry.mutation
+    async def add_creators(self, info: Info, input: list[CreatorInput]) -> list[AddCreatorResult]:
+        """
+        Mutation to add many creators at once, inserted and indexed in chunks. Example of the GraphQL document:
+
+        ```graphql
+        mutation {
+            addCreators(input: [{username: "CoolUser", email: "cool@email.com"}]) {
+                creator {
+                    Id
+                    email
+                }
+                error
+            }
+        }
+        ```
+
+        Args:
+            input (list[CreatorInput]): The usernames and emails of the creators, at most 1000 of them.
+
+        Returns:
+            list[AddCreatorResult]: For each of the creators, either the added creator or the error
+                that prevented adding it, e.g. when a creator with the same email already exists.
+        """
+        if len(input) > MAX_ADDED_CREATORS:
+            raise GraphQLError(message=f"At most {MAX_ADDED_CREATORS} creators can be added at once.")
+
+        db: AsyncIOMotorDatabase = info.context["db"]
+
+        rows = [{"username": creator.username, "email": creator.email} for creator in input]
+        results = []
+        for start in range(0, len(rows), settings.creator_import_chunk_size):
+            results.extend(await import_creators(db, rows[start : start + settings.creator_import_chunk_size]))
+
+        return [
+            AddCreatorResult(
+                creator=CreatorSchema.from_document(result["creator"]) if "creator" in result else None,
+                error=result.get("error"),
+            )
+            for result in results
+        ]
 
     @strawberry.mutation
     async def add_asset_to_creator(self, info: Info, type: str, email: str) -> AssetSchema:
@@ -72,22 +131,18 @@ class Mutation:
         """
         db: AsyncIOMotorDatabase = info.context["db"]
 
-        creator = await get_creator_by_email(db, email)
-        if not creator:
-            raise GraphQLError(message="Creator does not exist.")
-
         new_asset = AssetModel(type=type).dict()
-        creator_assets = creator.get("assets", [])
-        creator_assets.append(new_asset)
 
-        await update_creator_assets(db, email, creator_assets)
+        creator = await add_creator_asset(db, email, new_asset)
+        if not creator:
+            raise GraphQLError(message="Creator does not exist.")
 
         return AssetSchema(**new_asset)
 
     @strawberry.mutation
     async def remove_asset_from_creator(self, info: Info, type: str, email: str) -> AssetSchema:
         """
-        Mutation to remove an asset from the creator. Example of the GraphQL document:
+        Mutation to remove the first asset of the given type from the creator. Example of the GraphQL document:
 
         ```graphql
         mutation {
@@ -107,24 +162,13 @@ class Mutation:
         """
         db: AsyncIOMotorDatabase = info.context["db"]
 
-        creator = await get_creator_by_email(db, email)
-        if not creator:
-            raise GraphQLError(message="Creator does not exist.")
-
-        creator_assets = creator.get("assets", [])
-        asset_to_remove = None
-
-        for index, asset in enumerate(creator_assets):
-            if asset["type"] == type:
-                asset_to_remove = creator_assets.pop(index)
-                break
-
-        if asset_to_remove is None:
+        removed_asset = await remove_creator_asset(db, email, type)
+        if removed_asset is None:
+            if not await creator_exists(db, email):
+                raise GraphQLError(message="Creator does not exist.")
             raise GraphQLError(message="Asset does not exist.")
 
-        await update_creator_assets(db, email, creator_assets)
-
-        return AssetSchema(**asset_to_remove)
+        return AssetSchema(**removed_asset)
 
     @strawberry.mutation
     async def delete_creator(self, info: Info, email: str) -> CreatorSchema:
@@ -138,8 +182,12 @@ class Mutation:
                 email
                 signedUp
                 assets {
-                    type
-                    createdAt
+                    edges {
+                        node {
+                            type
+                            createdAt
+                        }
+                    }
                 }
             }
         }
@@ -153,10 +201,8 @@ class Mutation:
         """
         db: AsyncIOMotorDatabase = info.context["db"]
 
-        creator = await get_creator_by_email(db, email)
-        if not creator:
-            raise GraphQLError(message="Creator does not exist.")
-
         deleted_creator = await delete_creator_by_email(db, email)
+        if not deleted_creator:
+            raise GraphQLError(message="Creator does not exist.")
 
-        return CreatorSchema(**deleted_creator)
+        return CreatorSchema.from_document(deleted_creator)
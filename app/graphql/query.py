@@ -1,10 +1,29 @@
 import strawberry
 from graphql import GraphQLError
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pydantic import ValidationError
+from strawberry.dataloader import DataLoader
 from strawberry.types import Info
 
-from ..schemas.creator import CreatorSchema
-from ..services.creator import get_creator_by_email, search_creators
+from ..models.search import CreatorSearchModel
+from ..schemas.creator import CreatorConnection, CreatorEdge, CreatorSchema, CreatorSuggestion
+from ..schemas.pagination import PageInfo
+from ..schemas.search import (
+    CreatorFacets,
+    CreatorSearchInput,
+    CreatorSearchResult,
+    FacetBucket,
+    SearchTotal,
+    TotalHitsMode,
+)
+from ..services.creator import (
+    count_creators,
+    search_creators,
+    search_creators_after,
+    search_creators_page,
+    suggest_creators,
+)
+from .selection import get_selected_fields
 
 
 @strawberry.type
@@ -22,8 +41,12 @@ class Query:
                 username
                 signedUp
                 assets {
-                    type
-                    createdAt
+                    edges {
+                        node {
+                            type
+                            createdAt
+                        }
+                    }
                 }
             }
         }
@@ -35,50 +58,285 @@ class Query:
         Returns:
             CreatorSchema: Data about creator and the related assets.
         """
-        db: AsyncIOMotorDatabase = info.context["db"]
+        creator_by_email_loader: DataLoader = info.context["creator_by_email_loader"]
+        fields = tuple(sorted(get_selected_fields(info, CreatorSchema)))
 
-        creator = await get_creator_by_email(db, email)
+        creator = await creator_by_email_loader.load((email, fields))
         if not creator:
             raise GraphQLError(message="Creator does not exist.")
 
-        return CreatorSchema(**creator)
+        return CreatorSchema.from_document(creator)
+
+    @strawberry.field
+    async def get_creators(self, info: Info, emails: list[str]) -> list[CreatorSchema | None]:
+        """
+        Query to get creators by their emails in a single database query. Example of the GraphQL document:
+
+        ```graphql
+        query {
+            getCreators(emails: ["cool@email.com", "another@email.com"]) {
+                Id
+                email
+                username
+            }
+        }
+        ```
+
+        Args:
+            emails (list[str]): The emails of the creators.
+
+        Returns:
+            list[Optional[CreatorSchema]]: Data about each of the creators, or null for the ones that don't exist.
+        """
+        creator_by_email_loader: DataLoader = info.context["creator_by_email_loader"]
+        fields = tuple(sorted(get_selected_fields(info, CreatorSchema)))
+
+        creators = await creator_by_email_loader.load_many([(email, fields) for email in emails])
+
+        return [CreatorSchema.from_document(creator) if creator else None for creator in creators]
 
     @strawberry.field
     async def search_creators(
         self,
         info: Info,
-        search_text: str,
+        search_text: str | None = None,
+        query: CreatorSearchInput | None = None,
         page: int = 1,
         per_page: int = 10,
     ) -> list[CreatorSchema]:
         """
-        Query to search creators based on the search text. Example of the GraphQL document:
+        Query to search creators based on the search text, or on a structured query with filters.
+        Without either, all the creators are returned. Example of the GraphQL document:
 
         ```graphql
         query {
-            searchCreators(searchText: "New Fancy Platform", page: 1, perPage: 10) {
+            searchCreators(
+                query: {text: "New Fancy Platform", assetTypes: ["video"], signedUpFrom: "2023-01-01T00:00:00"},
+                page: 1,
+                perPage: 10
+            ) {
                 Id
                 username
                 email
                 signedUp
                 assets {
-                    type
-                    createdAt
+                    edges {
+                        node {
+                            type
+                            createdAt
+                        }
+                    }
                 }
             }
         }
         ```
 
         Args:
-            search_text (str): The text to search for in the creators' data.
+            search_text (str, optional): The text to search for in the creators' data.
+            query (CreatorSearchInput, optional): The structured search, instead of the search text.
             page (int): The page number of the search results.
             per_page (int): The number of search results per page.
 
         Returns:
-            list[CreatorSchema]: A list of creators matching the search text along with their related assets.
+            list[CreatorSchema]: A list of creators matching the search along with their related assets.
+        """
+        db: AsyncIOMotorDatabase = info.context["db"]
+
+        fields = get_selected_fields(info, CreatorSchema)
+        creators = await search_creators(db, _get_creator_search(search_text, query), page, per_page, fields)
+
+        return [CreatorSchema.from_document(creator) for creator in creators]
+
+    @strawberry.field
+    async def search_creators_with_facets(
+        self,
+        info: Info,
+        search_text: str | None = None,
+        query: CreatorSearchInput | None = None,
+        page: int = 1,
+        per_page: int = 10,
+        total_hits: TotalHitsMode = TotalHitsMode.CAPPED,
+    ) -> CreatorSearchResult:
+        """
+        Query to search creators like `searchCreators`, which can also count all the matching creators,
+        in total and per asset type and signup month, in the same request. The facets and the total
+        are only computed when selected. Example of the GraphQL document:
+
+        ```graphql
+        query {
+            searchCreatorsWithFacets(query: {text: "New Fancy Platform"}, page: 1, perPage: 10, totalHits: EXACT) {
+                total {
+                    value
+                    isExact
+                }
+                creators {
+                    username
+                    email
+                }
+                facets {
+                    assetTypes {
+                        key
+                        count
+                    }
+                    signedUp {
+                        key
+                        count
+                    }
+                }
+            }
+        }
+        ```
+
+        Args:
+            search_text (str, optional): The text to search for in the creators' data.
+            query (CreatorSearchInput, optional): The structured search, instead of the search text.
+            page (int): The page number of the search results.
+            per_page (int): The number of search results per page.
+            total_hits (TotalHitsMode): Whether to count all the matching creators exactly, up to a cap,
+                or not at all. Defaults to up to a cap.
+
+        Returns:
+            CreatorSearchResult: A page of creators matching the search, and the facets and the number of all of them.
+        """
+        db: AsyncIOMotorDatabase = info.context["db"]
+
+        search = _get_creator_search(search_text, query)
+        fields = get_selected_fields(info, CreatorSchema, path=("creators",))
+        selected_fields = get_selected_fields(info, CreatorSearchResult)
+        facets = "facets" in selected_fields
+        if "total" not in selected_fields:
+            total_hits = TotalHitsMode.OFF
+        results = await search_creators_page(db, search, page, per_page, fields, facets, total_hits.value)
+
+        creator_facets = None
+        if results["facets"] is not None:
+            creator_facets = CreatorFacets(
+                asset_types=[FacetBucket(**bucket) for bucket in results["facets"]["asset_types"]],
+                signed_up=[FacetBucket(**bucket) for bucket in results["facets"]["signed_up"]],
+            )
+
+        return CreatorSearchResult(
+            creators=[CreatorSchema.from_document(creator) for creator in results["creators"]],
+            facets=creator_facets,
+            total=SearchTotal(**results["total"]) if results["total"] is not None else None,
+        )
+
+    @strawberry.field
+    async def count_creators(
+        self,
+        search_text: str | None = None,
+        query: CreatorSearchInput | None = None,
+    ) -> int:
+        """
+        Query to count the creators matching the search text or a structured query exactly,
+        without fetching any of them. Example of the GraphQL document:
+
+        ```graphql
+        query {
+            countCreators(query: {assetTypes: ["video"]})
+        }
+        ```
+
+        Args:
+            search_text (str, optional): The text to search for in the creators' data.
+            query (CreatorSearchInput, optional): The structured search, instead of the search text.
+
+        Returns:
+            int: The number of creators matching the search.
+        """
+        return await count_creators(_get_creator_search(search_text, query))
+
+    @strawberry.field
+    async def search_creators_connection(
+        self,
+        info: Info,
+        search_text: str | None = None,
+        query: CreatorSearchInput | None = None,
+        first: int = 10,
+        after: str | None = None,
+    ) -> CreatorConnection:
+        """
+        Query to search creators based on the search text or a structured query with cursor-based pagination,
+        which keeps the cost of a page constant regardless of how deep it is. Example of the GraphQL document:
+
+        ```graphql
+        query {
+            searchCreatorsConnection(searchText: "New Fancy Platform", first: 10, after: "eyJwaXRfaWQiOi...") {
+                edges {
+                    cursor
+                    node {
+                        Id
+                        username
+                        email
+                    }
+                }
+                pageInfo {
+                    hasNextPage
+                    endCursor
+                }
+            }
+        }
+        ```
+
+        Args:
+            search_text (str, optional): The text to search for in the creators' data.
+            query (CreatorSearchInput, optional): The structured search, instead of the search text.
+            first (int): The number of search results to return, at most 100.
+            after (str, optional): The cursor of the search result to start after.
+
+        Returns:
+            CreatorConnection: A page of creators matching the search along with their cursors.
         """
         db: AsyncIOMotorDatabase = info.context["db"]
 
-        creators = await search_creators(db, search_text, page, per_page)
+        search = _get_creator_search(search_text, query)
+        fields = get_selected_fields(info, CreatorSchema, path=("edges", "node"))
+        results, has_next_page = await search_creators_after(db, search, first, after, fields)
+
+        edges = [CreatorEdge(cursor=cursor, node=CreatorSchema.from_document(creator)) for cursor, creator in results]
+        end_cursor = edges[-1].cursor if edges else None
+
+        return CreatorConnection(edges=edges, page_info=PageInfo(has_next_page=has_next_page, end_cursor=end_cursor))
+
+    @strawberry.field
+    async def suggest_creators(self, prefix: str, limit: int = 10) -> list[CreatorSuggestion]:
+        """
+        Query to suggest creators by the beginning of their username, for searching as the user types.
+        Example of the GraphQL document:
+
+        ```graphql
+        query {
+            suggestCreators(prefix: "cool cre", limit: 5) {
+                username
+                email
+            }
+        }
+        ```
+
+        Args:
+            prefix (str): The beginning of the username typed so far.
+            limit (int): The number of creators to suggest, at most 20.
+
+        Returns:
+            list[CreatorSuggestion]: The usernames and emails of the suggested creators, the best matches first.
+        """
+        suggestions = await suggest_creators(prefix, limit)
+
+        return [CreatorSuggestion(**suggestion) for suggestion in suggestions]
+
 
-        return [CreatorSchema(**creator) for creator in creators]
+def _get_creator_search(search_text: str | None, query: CreatorSearchInput | None) -> CreatorSearchModel:
+    if search_text is not None and query is not None:
+        raise GraphQLError(message="Only one of searchText and query can be given.")
+    try:
+        if query is None:
+            # The search text keeps the query string syntax it has always accepted.
+            return CreatorSearchModel(text=search_text, query_mode="query_string")
+        return CreatorSearchModel(
+            text=query.text,
+            asset_types=query.asset_types or [],
+            signed_up_from=query.signed_up_from,
+            signed_up_to=query.signed_up_to,
+        )
+    except ValidationError as e:
+        raise GraphQLError(message="; ".join(error["msg"] for error in e.errors()))
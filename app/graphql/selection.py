@@ -0,0 +1,48 @@
+from collections.abc import Iterator
+
+from strawberry.types import Info
+from strawberry.types.nodes import SelectedField, Selection
+
+
+def _iter_selected_fields(selections: list[Selection]) -> Iterator[SelectedField]:
+    for selection in selections:
+        if isinstance(selection, SelectedField):
+            yield selection
+        else:  # fragment spreads and inline fragments
+            yield from _iter_selected_fields(selection.selections)
+
+
+def get_selected_fields(info: Info, schema_type: type, path: tuple[str, ...] = ()) -> list[str]:
+    """
+    Get the names of the document fields needed to resolve the fields of `schema_type` selected in the GraphQL query.
+
+    A field of the Strawberry type can point to a differently named document field through the
+    `document_field` key of its metadata, e.g. a resolver that post-processes the `assets` of the document.
+
+    Args:
+        info (Info): The resolver info of the field that returns the `schema_type`.
+        schema_type (type): The Strawberry type whose selected fields to collect.
+        path (tuple[str, ...], optional): The names of the nested fields leading to the `schema_type`,
+            e.g. `("edges", "node")` for a connection. Defaults to the field of the resolver itself.
+
+    Returns:
+        list[str]: The names of the selected document fields, in the order of their first selection.
+    """
+    name_converter = info.schema.config.name_converter
+    document_fields = {
+        name_converter.get_graphql_name(field): field.metadata.get("document_field", field.python_name)
+        for field in schema_type._type_definition.fields
+    }
+
+    fields = list(_iter_selected_fields(info.selected_fields))
+    for name in path:
+        fields = [child for field in fields for child in _iter_selected_fields(field.selections) if child.name == name]
+
+    selected_fields = []
+    for field in fields:
+        for child in _iter_selected_fields(field.selections):
+            document_field = document_fields.get(child.name)
+            if document_field is not None and document_field not in selected_fields:
+                selected_fields.append(document_field)
+
+    return selected_fields
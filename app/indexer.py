@@ -0,0 +1,160 @@
+import asyncio
+import logging
+import time
+
+from elasticsearch.helpers import BulkIndexError
+from motor.motor_asyncio import AsyncIOMotorChangeStream, AsyncIOMotorDatabase
+from redis.asyncio import Redis
+
+from .cache.search import bump_search_generation
+from .database.mongodb import close_db, get_db
+from .search_engine.elasticsearch import close_es, create_indices, get_es
+from .search_engine.manager import ElasticsearchManager
+from .settings import get_settings
+from .worker import close_redis, get_redis
+
+settings = get_settings()
+
+logger = logging.getLogger("gunicorn.error")
+
+# Where the resume token of the change stream is kept between the restarts.
+STATE_COLLECTION = "indexer_state"
+
+# How many times a batch is applied before the indexer stops, leaving the resume token before the batch.
+APPLY_MAX_TRIES = 5
+
+# How many seconds the indexer waits per try before applying the failed changes of a batch again.
+APPLY_RETRY_DELAY = 2
+
+
+def _prepare_change_for_es(index_name: str, change: dict) -> dict | None:
+    if change["operationType"] == "delete":
+        return {"_op_type": "delete", "_index": index_name, "_id": str(change["documentKey"]["_id"])}
+
+    if change["operationType"] in ("insert", "replace", "update"):
+        # An update looked up after the document was deleted has no full document, the deletion follows anyway.
+        if change.get("fullDocument") is None:
+            return None
+        doc = ElasticsearchManager._prepare_mongo_doc_for_es(change["fullDocument"])
+        return {"_op_type": "index", "_index": index_name, "_id": str(change["documentKey"]["_id"]), "_source": doc}
+
+    return None  # drop, rename and invalidate events of the collection itself
+
+
+async def _load_resume_token(db: AsyncIOMotorDatabase, collection_name: str) -> dict | None:
+    state = await db[STATE_COLLECTION].find_one({"_id": collection_name})
+    return state["resume_token"] if state else None
+
+
+async def _save_resume_token(db: AsyncIOMotorDatabase, collection_name: str, resume_token: dict):
+    await db[STATE_COLLECTION].update_one(
+        {"_id": collection_name},
+        {"$set": {"resume_token": resume_token}},
+        upsert=True,
+    )
+
+
+async def index_changes(collection_name: str = "creators", index_name: str = "creator"):
+    """
+    Tail the change stream of a collection and apply the changes to the Elasticsearch index in bulk,
+    as an alternative to enqueueing the indexing jobs on every write (see `change_stream_indexing`).
+
+    The changes are batched until `es_bulk_size` of them are collected or `es_bulk_flush_interval` has passed,
+    keeping only the latest change of each document. The resume token is saved after every applied batch,
+    so a restarted indexer continues right after the last applied change. The failed changes of a batch are
+    applied again, and the indexer stops without saving the token when they keep failing, so a restart
+    replays them. Change streams require MongoDB to run as a replica set.
+
+    Args:
+        collection_name (str, optional): The name of the collection to watch. Defaults to "creators".
+        index_name (str, optional): The name of the index to apply the changes to. Defaults to "creator".
+    """
+    db = await get_db()
+    es = await get_es()
+    await create_indices(es)
+    redis = await get_redis()
+    manager = ElasticsearchManager(es)
+
+    resume_token = await _load_resume_token(db, collection_name)
+    logger.info(f"Watching the {collection_name} collection, resuming after {resume_token}...")
+
+    async with db[collection_name].watch(
+        full_document="updateLookup",
+        resume_after=resume_token,
+        max_await_time_ms=int(settings.es_bulk_flush_interval * 1000),
+    ) as stream:
+        await _tail_changes(db, redis, manager, stream, collection_name, index_name, resume_token)
+
+    logger.warning(f"The change stream of the {collection_name} collection has been invalidated.")
+
+
+async def _tail_changes(
+    db: AsyncIOMotorDatabase,
+    redis: Redis,
+    manager: ElasticsearchManager,
+    stream: AsyncIOMotorChangeStream,
+    collection_name: str,
+    index_name: str,
+    resume_token: dict | None,
+):
+    actions: dict[str, dict] = {}
+    batch_started_at = time.monotonic()
+
+    while stream.alive:
+        change = await stream.try_next()
+        if change is not None:
+            action = _prepare_change_for_es(index_name, change)
+            if action is not None:
+                if not actions:
+                    batch_started_at = time.monotonic()
+                actions.pop(action["_id"], None)  # only the latest change of a document matters
+                actions[action["_id"]] = action
+
+            batch_is_full = len(actions) >= settings.es_bulk_size
+            batch_is_due = time.monotonic() - batch_started_at >= settings.es_bulk_flush_interval
+            if stream.alive and not batch_is_full and not batch_is_due:
+                continue
+
+        if actions:
+            write_index_names = await manager.get_write_indices(index_name)
+            await _apply_actions(
+                manager,
+                [{**action, "_index": name} for name in write_index_names for action in actions.values()],
+            )
+            await bump_search_generation(redis, index_name)
+            actions = {}
+
+        # Also advances while idle, so a restart doesn't have to scan the changes of the other collections.
+        if stream.resume_token is not None and stream.resume_token != resume_token:
+            resume_token = stream.resume_token
+            await _save_resume_token(db, collection_name, resume_token)
+
+
+async def _apply_actions(manager: ElasticsearchManager, actions: list[dict]):
+    for attempt in range(1, APPLY_MAX_TRIES + 1):
+        errors = await manager.bulk(actions)
+        if not errors:
+            return
+
+        for error in errors:
+            logger.error(f"Failed to apply a change (attempt {attempt} of {APPLY_MAX_TRIES}): {error}")
+        if attempt == APPLY_MAX_TRIES:
+            raise BulkIndexError(f"Failed to apply {len(errors)} changes, stopping before the batch.", errors)
+
+        # The results name the concrete indices behind the write aliases, so the documents are matched by ID.
+        failed_ids = {result["_id"] for error in errors for result in error.values()}
+        actions = [action for action in actions if action["_id"] in failed_ids]
+        await asyncio.sleep(attempt * APPLY_RETRY_DELAY)
+
+
+async def main():
+    try:
+        await index_changes()
+    finally:
+        await close_db()
+        await close_es()
+        await close_redis()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
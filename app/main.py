@@ -3,9 +3,10 @@ import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from .database.mongodb import close_db, get_db
-from .routers import graphql
-from .search_engine.elasticsearch import close_es, get_es
+from .cache.creator import start_invalidation_listener, stop_invalidation_listener
+from .database.mongodb import close_db, create_indexes, get_db
+from .routers import creators, graphql, metrics
+from .search_engine.elasticsearch import close_es, create_indices, get_es
 from .settings import get_settings
 
 settings = get_settings()
@@ -27,6 +28,8 @@ def create_application() -> FastAPI:
         allow_headers=["*"],
     )
     application.include_router(graphql.router)
+    application.include_router(creators.router)
+    application.include_router(metrics.router)
     return application
 
 
@@ -36,12 +39,16 @@ app = create_application()
 @app.on_event("startup")
 async def startup_event() -> None:
     logger.info("Starting up...")
-    await get_db()
-    await get_es()
+    db = await get_db()
+    await create_indexes(db)
+    es = await get_es()
+    await create_indices(es)
+    await start_invalidation_listener()
 
 
 @app.on_event("shutdown")
 async def shutdown_event() -> None:
     logger.info("Shutting down...")
+    await stop_invalidation_listener()
     await close_db()
     await close_es()
@@ -0,0 +1,131 @@
+import os
+import time
+from collections.abc import Awaitable, Callable
+from functools import wraps
+from typing import Any
+
+from arq import Retry
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, multiprocess
+from pymongo import monitoring
+
+GRAPHQL_OPERATION_SECONDS = Histogram(
+    "graphql_operation_seconds",
+    "Time spent handling the GraphQL operations, by their name and type.",
+    ["operation_name", "operation_type"],
+)
+GRAPHQL_PHASE_SECONDS = Histogram(
+    "graphql_phase_seconds",
+    "Time spent in the phases of the GraphQL operations.",
+    ["phase"],
+)
+GRAPHQL_RESOLVER_SECONDS = Histogram(
+    "graphql_resolver_seconds",
+    "Time spent in the GraphQL resolvers, by the type and the name of their field.",
+    ["field"],
+)
+SPAN_SECONDS = Histogram(
+    "span_seconds",
+    "Time spent in the calls to MongoDB, Elasticsearch, Redis and arq, by the kind and the name of the call.",
+    ["kind", "name"],
+)
+MONGODB_COMMAND_SECONDS = Histogram(
+    "mongodb_command_seconds",
+    "Time spent in the MongoDB commands as reported by the driver, by the command and whether it succeeded.",
+    ["command", "status"],
+)
+ELASTICSEARCH_RETRIES = Counter(
+    "elasticsearch_retries",
+    "Retries of the Elasticsearch requests after a connection error, by the method of the manager.",
+    ["method"],
+)
+SINGLE_FLIGHT_CALLS = Counter(
+    "single_flight_calls",
+    "Keys asked for through a single flight, by its name.",
+    ["name"],
+)
+SINGLE_FLIGHT_COALESCED = Counter(
+    "single_flight_coalesced",
+    "Keys asked for through a single flight that joined a call already in flight, by its name.",
+    ["name"],
+)
+ARQ_QUEUE_DEPTH = Gauge(
+    "arq_queue_depth",
+    "Jobs waiting in the arq queue.",
+    multiprocess_mode="livemax",
+)
+ARQ_JOB_WAIT_SECONDS = Histogram(
+    "arq_job_wait_seconds",
+    "Time the arq jobs waited in the queue before they started, by the function.",
+    ["function"],
+)
+ARQ_JOB_SECONDS = Histogram(
+    "arq_job_seconds",
+    "Time spent running the arq jobs, by the function.",
+    ["function"],
+)
+ARQ_JOB_FAILURES = Counter(
+    "arq_job_failures",
+    "The arq jobs that failed, by the function.",
+    ["function"],
+)
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    """
+    A PyMongo command listener recording the duration of every command sent to MongoDB.
+    """
+
+    def started(self, event: monitoring.CommandStartedEvent):
+        pass
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent):
+        MONGODB_COMMAND_SECONDS.labels(event.command_name, "succeeded").observe(event.duration_micros / 1_000_000)
+
+    def failed(self, event: monitoring.CommandFailedEvent):
+        MONGODB_COMMAND_SECONDS.labels(event.command_name, "failed").observe(event.duration_micros / 1_000_000)
+
+
+def get_registry() -> CollectorRegistry:
+    """
+    Get the registry to export the metrics from. When `PROMETHEUS_MULTIPROC_DIR` is set, e.g. for the processes
+    forked by gunicorn, the metrics of all the processes are collected from the files they write there.
+
+    Returns:
+        CollectorRegistry: The registry of the metrics.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return REGISTRY
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def job_metrics(fn: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """
+    Decorate an arq job function to record how long its jobs waited and ran, and how many of them failed.
+    Keeps the name of the function, which the jobs are enqueued by.
+
+    Args:
+        fn (Callable[..., Awaitable[Any]]): The job function.
+
+    Returns:
+        Callable[..., Awaitable[Any]]: The decorated job function.
+    """
+    function = fn.__qualname__
+
+    @wraps(fn)
+    async def wrapper(ctx: dict, *args, **kwargs) -> Any:
+        ARQ_JOB_WAIT_SECONDS.labels(function).observe(time.time() - ctx["enqueue_time"].timestamp())
+        started_at = time.perf_counter()
+        try:
+            return await fn(ctx, *args, **kwargs)
+        except Retry:
+            raise
+        except Exception:
+            ARQ_JOB_FAILURES.labels(function).inc()
+            raise
+        finally:
+            ARQ_JOB_SECONDS.labels(function).observe(time.perf_counter() - started_at)
+
+    return wrapper
@@ -0,0 +1,36 @@
+from datetime import datetime
+from typing import Literal
+
+from pydantic import BaseModel, Field, root_validator, validator
+
+
+class CreatorSearchModel(BaseModel):
+    """
+    A Pydantic model representing a structured search of creators, with the text to match and the filters to apply.
+    """
+
+    text: str | None = None
+    asset_types: list[str] = Field(default_factory=list)
+    signed_up_from: datetime | None = None
+    signed_up_to: datetime | None = None
+    # How to match the text, defaulting to `search_query_mode`.
+    query_mode: Literal["match", "query_string"] | None = None
+
+    @validator("text")
+    def normalize_text(cls, text: str | None) -> str | None:
+        """
+        Collapses the whitespace of the text, so the searches differing only in it are the same search.
+        """
+        if text is None:
+            return None
+        return " ".join(text.split()) or None
+
+    @root_validator(skip_on_failure=True)
+    def check_signed_up_range(cls, values: dict) -> dict:
+        """
+        Checks that the range of the signup dates is not empty.
+        """
+        signed_up_from, signed_up_to = values["signed_up_from"], values["signed_up_to"]
+        if signed_up_from is not None and signed_up_to is not None and signed_up_from > signed_up_to:
+            raise ValueError("signed_up_from must not be later than signed_up_to")
+        return values
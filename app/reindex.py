@@ -0,0 +1,311 @@
+import argparse
+import asyncio
+import logging
+import time
+
+from bson import ObjectId
+from elasticsearch import AsyncElasticsearch
+from elasticsearch.helpers import async_scan
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from .cache.search import bump_search_generation
+from .database.mongodb import close_db, get_db
+from .search_engine.elasticsearch import close_es, create_indices, get_es
+from .search_engine.manager import WRITE_INDICES_TTL, ElasticsearchManager
+from .search_engine.mappings import INDICES, get_versioned_index_name, get_write_alias
+from .settings import get_settings
+from .worker import close_redis, get_redis
+
+settings = get_settings()
+
+logger = logging.getLogger("gunicorn.error")
+
+# How often the progress is reported, in seconds.
+PROGRESS_INTERVAL = 10
+
+
+async def _get_index_settings(es: AsyncElasticsearch, index_name: str) -> dict:
+    response = await es.indices.get_settings(index=index_name)
+    # The index name may be an alias, the settings are keyed by the name of the index behind it.
+    index_settings = next(iter(response.values()))["settings"]["index"]
+    return {
+        "refresh_interval": index_settings.get("refresh_interval"),  # None resets it to the default
+        "number_of_replicas": index_settings.get("number_of_replicas"),
+    }
+
+
+async def _copy_collection(
+    db: AsyncIOMotorDatabase,
+    manager: ElasticsearchManager,
+    collection_name: str,
+    index_name: str,
+    op_type: str,
+    batch_size: int,
+    concurrency: int,
+) -> tuple[int, int]:
+    # The collection is streamed with a batched cursor into `concurrency` parallel bulk requests of `batch_size`
+    # documents, so only about `2 * concurrency` batches are held in memory at a time.
+    total = await db[collection_name].estimated_document_count()
+    indexed = 0
+    failed = 0
+    batches: asyncio.Queue[list[dict] | None] = asyncio.Queue(maxsize=concurrency)
+
+    async def write_batches():
+        nonlocal indexed, failed
+        while (batch := await batches.get()) is not None:
+            batch_failed = await _write_batch(manager, index_name, batch)
+            indexed += len(batch) - batch_failed
+            failed += batch_failed
+
+    async def report_progress():
+        while True:
+            await asyncio.sleep(PROGRESS_INTERVAL)
+            elapsed = time.monotonic() - started_at
+            percent = f"{(indexed + failed) / total:.1%}" if total else "n/a"
+            logger.info(f"Reindexed {indexed} of ~{total} documents ({percent}), {indexed / elapsed:.0f} docs/sec")
+
+    logger.info(f"Reindexing ~{total} documents of the {collection_name} collection into the {index_name} index...")
+
+    started_at = time.monotonic()
+    reporter = asyncio.create_task(report_progress())
+    try:
+        async with asyncio.TaskGroup() as task_group:
+            task_group.create_task(
+                _read_batches(db, collection_name, index_name, op_type, batch_size, batches, concurrency)
+            )
+            for _ in range(concurrency):
+                task_group.create_task(write_batches())
+    finally:
+        reporter.cancel()
+
+    elapsed = time.monotonic() - started_at
+    logger.info(
+        f"Reindexed {indexed} documents in {elapsed:.1f}s ({indexed / elapsed:.0f} docs/sec), {failed} failed."
+    )
+    return indexed, failed
+
+
+async def _read_batches(
+    db: AsyncIOMotorDatabase,
+    collection_name: str,
+    index_name: str,
+    op_type: str,
+    batch_size: int,
+    batches: asyncio.Queue[list[dict] | None],
+    writers: int,
+):
+    batch = []
+    async for doc in db[collection_name].find({}, batch_size=batch_size):
+        batch.append(
+            {
+                "_op_type": op_type,
+                "_index": index_name,
+                "_id": str(doc["_id"]),
+                "_source": ElasticsearchManager._prepare_mongo_doc_for_es(doc),
+            }
+        )
+        if len(batch) >= batch_size:
+            await batches.put(batch)
+            batch = []
+    if batch:
+        await batches.put(batch)
+    for _ in range(writers):
+        await batches.put(None)  # tells a writer to stop
+
+
+async def _write_batch(manager: ElasticsearchManager, index_name: str, batch: list[dict]) -> int:
+    errors = await manager.bulk(batch)
+    return _count_failures(index_name, errors)
+
+
+def _count_failures(index_name: str, errors: list[dict]) -> int:
+    # With the create operation, the documents that exist already have been written more recently.
+    errors = [error for error in errors if error.get("create", {}).get("status") != 409]
+    for error in errors:
+        logger.error(f"Failed to reindex a document into the {index_name} index: {error}")
+    return len(errors)
+
+
+async def _delete_missing_documents(
+    db: AsyncIOMotorDatabase,
+    manager: ElasticsearchManager,
+    collection_name: str,
+    index_name: str,
+    batch_size: int,
+) -> int:
+    # A document deleted after the backfill read it but before the backfill wrote it is recreated by the backfill,
+    # since its deletion found nothing to delete in the index, so the IDs of the index are checked against
+    # the collection afterwards. The documents deleted later are deleted by the indexing jobs.
+    deleted = 0
+    batch = []
+    hits = async_scan(manager.es, index=index_name, query={"match_all": {}}, _source=False, size=batch_size)
+    async for hit in hits:
+        batch.append(hit["_id"])
+        if len(batch) >= batch_size:
+            deleted += await _delete_missing_batch(db, manager, collection_name, index_name, batch)
+            batch = []
+    if batch:
+        deleted += await _delete_missing_batch(db, manager, collection_name, index_name, batch)
+
+    logger.info(f"Deleted {deleted} documents missing from the {collection_name} collection from {index_name}.")
+    return deleted
+
+
+async def _delete_missing_batch(
+    db: AsyncIOMotorDatabase,
+    manager: ElasticsearchManager,
+    collection_name: str,
+    index_name: str,
+    doc_ids: list[str],
+) -> int:
+    cursor = db[collection_name].find({"_id": {"$in": [ObjectId(doc_id) for doc_id in doc_ids]}}, {"_id": 1})
+    existing_ids = {str(doc["_id"]) async for doc in cursor}
+    actions = [
+        {"_op_type": "delete", "_index": index_name, "_id": doc_id} for doc_id in doc_ids if doc_id not in existing_ids
+    ]
+    if not actions:
+        return 0
+
+    errors = await manager.bulk(actions)
+    for error in errors:
+        logger.error(f"Failed to delete a document missing from the {collection_name} collection: {error}")
+    return len(actions) - len(errors)
+
+
+async def reindex(
+    collection_name: str = "creators",
+    index_name: str = "creator",
+    batch_size: int = settings.es_bulk_size,
+    concurrency: int = 4,
+):
+    """
+    Rebuild an Elasticsearch index from the documents of a collection in place, e.g. after the index was lost.
+
+    The refreshes and the replicas of the index are disabled while reindexing and restored afterwards.
+
+    Args:
+        collection_name (str, optional): The name of the collection to reindex. Defaults to "creators".
+        index_name (str, optional): The name of the index to write the documents to. Defaults to "creator".
+        batch_size (int, optional): The number of documents per bulk request. Defaults to `es_bulk_size`.
+        concurrency (int, optional): The number of parallel bulk requests. Defaults to 4.
+    """
+    db = await get_db()
+    es = await get_es()
+    await create_indices(es)
+    redis = await get_redis()
+    manager = ElasticsearchManager(es)
+
+    original_settings = await _get_index_settings(es, index_name)
+    await es.indices.put_settings(index=index_name, settings={"refresh_interval": "-1", "number_of_replicas": 0})
+    try:
+        await _copy_collection(db, manager, collection_name, index_name, "index", batch_size, concurrency)
+    finally:
+        await es.indices.put_settings(index=index_name, settings=original_settings)
+        await es.indices.refresh(index=index_name)
+
+    await bump_search_generation(redis, index_name)
+
+
+async def rollover(
+    collection_name: str = "creators",
+    index_name: str = "creator",
+    batch_size: int = settings.es_bulk_size,
+    concurrency: int = 4,
+):
+    """
+    Move an index to the current version of its definition in `INDICES` without interrupting the searches.
+
+    The new versioned index is added to the write alias, so the indexing jobs write to both the old
+    and the new index, and backfilled from the collection, skipping the documents the jobs have written already.
+    The documents deleted from the collection while being backfilled are deleted from the new index afterwards.
+    The refreshes and the replicas of the new index are disabled while backfilling and restored afterwards,
+    even when the backfill fails, in which case the rollover can be run again to resume it.
+    The read alias is then swapped to the new index atomically. The old index is kept for the searches
+    still paginating through it and can be deleted afterwards, unless it predates the aliases.
+
+    Args:
+        collection_name (str, optional): The name of the collection to backfill from. Defaults to "creators".
+        index_name (str, optional): The name of the index, which is the read alias. Defaults to "creator".
+        batch_size (int, optional): The number of documents per bulk request. Defaults to `es_bulk_size`.
+        concurrency (int, optional): The number of parallel bulk requests. Defaults to 4.
+    """
+    db = await get_db()
+    es = await get_es()
+    await create_indices(es)
+    redis = await get_redis()
+    manager = ElasticsearchManager(es)
+
+    definition = INDICES[index_name]
+    new_index_name = get_versioned_index_name(index_name)
+    write_alias = get_write_alias(index_name)
+    old_index_names = [name for name in await es.indices.get(index=index_name) if name != new_index_name]
+    if not old_index_names:
+        logger.info(f"Index {index_name} is at {new_index_name} already.")
+        return
+
+    # Resumes the backfill when a previous rollover has failed, which has restored the settings of the new index.
+    if not await es.indices.exists(index=new_index_name):
+        await es.indices.create(
+            index=new_index_name,
+            settings={**definition["settings"], "refresh_interval": "-1", "number_of_replicas": 0},
+            mappings=definition["mappings"],
+        )
+    else:
+        await es.indices.put_settings(
+            index=new_index_name, settings={"refresh_interval": "-1", "number_of_replicas": 0}
+        )
+    await es.indices.update_aliases(
+        actions=[{"add": {"index": name, "alias": write_alias}} for name in [*old_index_names, new_index_name]]
+    )
+
+    try:
+        # Waits for the workers to see the new write index, so the changes missed by the backfill are written to it.
+        await asyncio.sleep(WRITE_INDICES_TTL)
+        await _copy_collection(db, manager, collection_name, new_index_name, "create", batch_size, concurrency)
+    finally:
+        # The new index is written to by the indexing jobs already, even when the backfill has failed.
+        await es.indices.put_settings(
+            index=new_index_name,
+            settings={
+                "refresh_interval": definition["settings"].get("refresh_interval"),
+                "number_of_replicas": definition["settings"].get("number_of_replicas"),
+            },
+        )
+    await es.indices.refresh(index=new_index_name)
+    if await _delete_missing_documents(db, manager, collection_name, new_index_name, batch_size):
+        await es.indices.refresh(index=new_index_name)
+
+    actions = [{"add": {"index": new_index_name, "alias": index_name}}]
+    for name in old_index_names:
+        if name == index_name:  # an index predating the aliases, which can't share its name with one
+            actions.append({"remove_index": {"index": name}})
+        else:
+            actions.append({"remove": {"index": name, "alias": index_name}})
+            actions.append({"remove": {"index": name, "alias": write_alias}})
+    await es.indices.update_aliases(actions=actions)
+
+    await bump_search_generation(redis, index_name)
+    logger.info(f"Rolled index {index_name} over from {', '.join(old_index_names)} to {new_index_name}.")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Rebuild the creator index from the creators collection.")
+    parser.add_argument("--rollover", action="store_true", help="build a new index for the current mapping version")
+    parser.add_argument("--batch-size", type=int, default=settings.es_bulk_size, help="documents per bulk request")
+    parser.add_argument("--concurrency", type=int, default=4, help="parallel bulk requests")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    try:
+        if args.rollover:
+            await rollover(batch_size=args.batch_size, concurrency=args.concurrency)
+        else:
+            await reindex(batch_size=args.batch_size, concurrency=args.concurrency)
+    finally:
+        await close_db()
+        await close_es()
+        await close_redis()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,140 @@
+import json
+from collections.abc import AsyncIterator
+from datetime import datetime
+from typing import Any
+
+from bson import ObjectId
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from ..database.mongodb import get_db
+from ..services.creator import import_creators, iter_creators
+from ..settings import get_settings
+
+settings = get_settings()
+
+router = APIRouter(prefix="/creators", tags=["creators"])
+
+
+async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line
+    yield buffer
+
+
+def _serialize_for_json(value: Any) -> str:
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+async def _iter_ndjson(creators: AsyncIterator[dict[str, Any]]) -> AsyncIterator[bytes]:
+    # Sent a batch of lines at a time, each after the client has taken the previous one.
+    lines = []
+    async for creator in creators:
+        lines.append(json.dumps(creator, default=_serialize_for_json))
+        if len(lines) >= settings.creator_export_batch_size:
+            yield ("\n".join(lines) + "\n").encode()
+            lines = []
+    if lines:
+        yield ("\n".join(lines) + "\n").encode()
+
+
+async def _import_rows(db: AsyncIOMotorDatabase, rows: list[tuple[int, dict]], summary: dict[str, Any]):
+    results = await import_creators(db, [row for _, row in rows])
+    for (line_number, _), result in zip(rows, results):
+        if "creator" in result:
+            summary["created"] += 1
+        else:
+            _add_error(summary, line_number, result["error"])
+
+
+def _add_error(summary: dict[str, Any], line_number: int, error: str):
+    # Only the first errors are reported, so the summary of a bad upload doesn't grow with it.
+    summary["failed"] += 1
+    if len(summary["errors"]) < settings.creator_import_max_errors:
+        summary["errors"].append({"line": line_number, "error": error})
+
+
+@router.post("/import")
+async def import_creators_from_ndjson(request: Request, db: AsyncIOMotorDatabase = Depends(get_db)) -> dict[str, Any]:
+    """
+    Import creators from an NDJSON upload with a JSON object per line, e.g. `{"username": "...", "email": "..."}`.
+
+    The upload is read as a stream and imported in chunks of `creator_import_chunk_size` lines,
+    so the memory used doesn't depend on its size.
+
+    ```bash
+    curl -X POST -H "Content-Type: application/x-ndjson" --data-binary @creators.ndjson \\
+        http://localhost:8000/creators/import
+    ```
+
+    Returns:
+        dict[str, Any]: The number of `created` creators and of the lines that `failed` to be imported,
+            e.g. the duplicates, along with the `errors` of the first `creator_import_max_errors` of them
+            with their line numbers.
+    """
+    summary: dict[str, Any] = {"created": 0, "failed": 0, "errors": []}
+    rows = []
+    line_number = 0
+    async for line in _iter_lines(request.stream()):
+        line_number += 1
+        if not line.strip():
+            continue
+
+        try:
+            row = json.loads(line)
+            if not isinstance(row, dict):
+                raise ValueError("a JSON object is expected")
+        except ValueError as e:
+            _add_error(summary, line_number, f"Invalid JSON: {e}")
+            continue
+
+        rows.append((line_number, row))
+        if len(rows) >= settings.creator_import_chunk_size:
+            await _import_rows(db, rows, summary)
+            rows = []
+
+    if rows:
+        await _import_rows(db, rows, summary)
+
+    return summary
+
+
+@router.get("/export")
+async def export_creators_to_ndjson(
+    signed_up_from: datetime | None = None,
+    signed_up_to: datetime | None = None,
+    asset_type: str | None = None,
+    db: AsyncIOMotorDatabase = Depends(get_db),
+) -> StreamingResponse:
+    """
+    Export the creators as NDJSON with a JSON object per line, optionally only the ones
+    that signed up within the dates or have an asset of the type.
+
+    The creators are streamed from the database in batches of `creator_export_batch_size`,
+    as fast as the client reads them, so the memory used doesn't depend on the number of creators.
+
+    ```bash
+    curl "http://localhost:8000/creators/export?signed_up_from=2023-01-01T00:00:00" > creators.ndjson
+    ```
+
+    Returns:
+        StreamingResponse: The NDJSON stream of the creators.
+    """
+    creators = iter_creators(
+        db,
+        signed_up_from=signed_up_from,
+        signed_up_to=signed_up_to,
+        asset_type=asset_type,
+        batch_size=settings.creator_export_batch_size,
+    )
+
+    return StreamingResponse(_iter_ndjson(creators), media_type="application/x-ndjson")
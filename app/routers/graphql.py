@@ -1,19 +1,30 @@
+from functools import partial
 from typing import Any
 
 import strawberry
 from fastapi import Depends
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from strawberry.dataloader import DataLoader
 from strawberry.fastapi import GraphQLRouter
 
 from ..database.mongodb import get_db
+from ..graphql.extensions import TimingExtension
 from ..graphql.mutation import Mutation
 from ..graphql.query import Query
+from ..services.creator import load_creators_assets, load_creators_by_emails
 
 
 async def get_context(db: AsyncIOMotorDatabase = Depends(get_db)) -> dict[str, Any]:
-    return {"db": db}
+    return {
+        "db": db,
+        # Loaders live as long as a request, coalescing the lookups made within one tick of the event loop.
+        # Keyed by the email along with the fields selected, so the creators are read with a projection.
+        "creator_by_email_loader": DataLoader(load_fn=partial(load_creators_by_emails, db)),
+        # Keyed by the email of the creator along with the type, the offset and the limit of the page of assets.
+        "creator_assets_loader": DataLoader(load_fn=partial(load_creators_assets, db)),
+    }
 
 
-schema = strawberry.Schema(query=Query, mutation=Mutation)
+schema = strawberry.Schema(query=Query, mutation=Mutation, extensions=[TimingExtension])
 
 router = GraphQLRouter(schema, path="/graphql", context_getter=get_context)
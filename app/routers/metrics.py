@@ -0,0 +1,14 @@
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+from ..metrics import get_registry
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics")
+def get_metrics() -> Response:
+    """
+    Export the metrics of all the processes of the app in the Prometheus text format.
+    """
+    return Response(generate_latest(get_registry()), headers={"Content-Type": CONTENT_TYPE_LATEST})
@@ -2,6 +2,8 @@ from datetime import datetime
 
 import strawberry
 
+from ..schemas.pagination import PageInfo
+
 
 @strawberry.type
 class AssetSchema:
@@ -11,3 +13,23 @@ class AssetSchema:
 
     type: str
     created_at: datetime
+
+
+@strawberry.type
+class AssetEdge:
+    """
+    A Strawberry GraphQL type representing an asset in a connection along with its cursor.
+    """
+
+    cursor: str
+    node: AssetSchema
+
+
+@strawberry.type
+class AssetConnection:
+    """
+    A Strawberry GraphQL type representing a page of the assets of a creator in a cursor-based connection.
+    """
+
+    edges: list[AssetEdge]
+    page_info: PageInfo
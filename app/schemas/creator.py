@@ -1,39 +1,153 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
 from datetime import datetime
+from typing import Annotated
 
 import strawberry
+from graphql import GraphQLError
+from strawberry.dataloader import DataLoader
+from strawberry.types import Info
 
-from ..schemas.asset import AssetSchema
+from ..schemas.asset import AssetConnection, AssetEdge, AssetSchema
+from ..schemas.pagination import PageInfo
+
+# The number of assets on a page when not given, and the most of them on a page, so the assets of a creator
+# with a long history are never all read at once.
+DEFAULT_ASSETS_PAGE_SIZE = 10
+MAX_ASSETS_PAGE_SIZE = 100
 
 
 @strawberry.type
 class CreatorSchema:
     """
     A Strawberry GraphQL type representing a creator with their associated assets.
+
+    Built with `from_document`, so that it can be built from a partial document
+    holding only the fields selected in the GraphQL query.
     """
 
     _id: str
     username: str
     email: str
     signed_up: datetime
-    assets: list[AssetSchema]
+    # The asset documents, when the creator was built from a full document, e.g. one just written.
+    assets: strawberry.Private[list[dict] | None] = None
 
-    def __post_init__(self):
+    @classmethod
+    def from_document(cls, doc: dict) -> "CreatorSchema":
         """
-        Converts the `assets` field from a list of dictionaries to a list of
-        `AssetSchema` instances after the object is initialized. This step is
-        necessary because the data passed to the constructor might not be
-        instances of `AssetSchema` when creating the 'CreatorSchema' object.
+        Build the type from a creator document, which may hold only the fields selected in the GraphQL query.
+        The fields left out are set to None, which is never returned, since they aren't selected.
+
+        Args:
+            doc (dict): The creator document, or a part of it.
+
+        Returns:
+            CreatorSchema: The creator.
         """
-        self.assets = [AssetSchema(**asset) for asset in self.assets]
+        return cls(**{"_id": None, "username": None, "email": None, "signed_up": None, **doc})
 
-    @strawberry.field
-    def assets_resolver(self, info) -> list[AssetSchema]:
+    # Only needs the `email` of the document, the page of the assets is read on its own.
+    @strawberry.field(name="assets", metadata={"document_field": "email"})
+    async def assets_resolver(
+        self,
+        info: Info,
+        first: int = DEFAULT_ASSETS_PAGE_SIZE,
+        after: str | None = None,
+        asset_type: Annotated[str | None, strawberry.argument(name="type")] = None,
+    ) -> AssetConnection:
         """
-        Returns the list of `AssetSchema` instances associated with the creator.
+        Resolves a page of the assets of the creator, converting only the assets on the page
+        into `AssetSchema` instances.
 
-        The assets_resolver field method is used in the GraphQL query to resolve
-        the `assets` field of the `CreatorSchema` type. This field resolver
-        method returns the already processed list of 'AssetSchema' instances,
-        which was converted in the `__post_init__` method.
+        The asset documents already at hand are sliced in place. Otherwise only the page of them is read
+        through the `creator_assets_loader` of the context, which serves the cached pages and batches the pages
+        of all the other creators in the response into a single aggregation.
         """
-        return self.assets
+        if not 0 <= first <= MAX_ASSETS_PAGE_SIZE:
+            raise GraphQLError(message=f"First must be between 0 and {MAX_ASSETS_PAGE_SIZE}.")
+
+        offset = _decode_asset_cursor(after) + 1 if after is not None else 0
+        # One more asset to find out whether there is a next page.
+        limit = first + 1
+
+        if self.assets is not None:
+            assets = [asset for asset in self.assets if asset_type is None or asset["type"] == asset_type]
+            assets = assets[offset : offset + limit]
+        else:
+            creator_assets_loader: DataLoader = info.context["creator_assets_loader"]
+            assets = await creator_assets_loader.load((self.email, asset_type, offset, limit))
+
+        has_next_page = len(assets) > first
+        edges = [
+            AssetEdge(cursor=_encode_asset_cursor(offset + position), node=AssetSchema(**asset))
+            for position, asset in enumerate(assets[:first])
+        ]
+        end_cursor = edges[-1].cursor if edges else None
+
+        return AssetConnection(edges=edges, page_info=PageInfo(has_next_page=has_next_page, end_cursor=end_cursor))
+
+
+@strawberry.input
+class CreatorInput:
+    """
+    A Strawberry GraphQL input type representing a creator to add.
+    """
+
+    username: str
+    email: str
+
+
+@strawberry.type
+class AddCreatorResult:
+    """
+    A Strawberry GraphQL type representing the outcome of adding one of the creators at once,
+    either the added creator or the error that prevented it, e.g. a duplicate email.
+    """
+
+    creator: CreatorSchema | None
+    error: str | None
+
+
+@strawberry.type
+class CreatorSuggestion:
+    """
+    A Strawberry GraphQL type representing a creator suggested for a username prefix.
+    """
+
+    username: str
+    email: str
+
+
+@strawberry.type
+class CreatorEdge:
+    """
+    A Strawberry GraphQL type representing a creator in a connection along with its cursor.
+    """
+
+    cursor: str
+    node: CreatorSchema
+
+
+@strawberry.type
+class CreatorConnection:
+    """
+    A Strawberry GraphQL type representing a page of creators in a cursor-based connection.
+    """
+
+    edges: list[CreatorEdge]
+    page_info: PageInfo
+
+
+def _encode_asset_cursor(position: int) -> str:
+    return urlsafe_b64encode(json.dumps({"position": position}).encode()).decode()
+
+
+def _decode_asset_cursor(cursor: str) -> int:
+    try:
+        position = json.loads(urlsafe_b64decode(cursor.encode()))["position"]
+    except (ValueError, TypeError, KeyError):
+        raise GraphQLError(message="Cursor is invalid.")
+    if not isinstance(position, int) or position < 0:
+        raise GraphQLError(message="Cursor is invalid.")
+    return position
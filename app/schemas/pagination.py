@@ -0,0 +1,11 @@
+import strawberry
+
+
+@strawberry.type
+class PageInfo:
+    """
+    A Strawberry GraphQL type representing the pagination state of a connection.
+    """
+
+    has_next_page: bool
+    end_cursor: str | None
@@ -0,0 +1,75 @@
+from datetime import datetime
+from enum import Enum
+
+import strawberry
+
+from .creator import CreatorSchema
+
+
+@strawberry.input
+class CreatorSearchInput:
+    """
+    A Strawberry GraphQL input type representing a structured search of creators.
+
+    The text is matched against the usernames, emails and asset types, while the other fields
+    only narrow the creators down.
+    """
+
+    text: str | None = None
+    asset_types: list[str] | None = None
+    signed_up_from: datetime | None = None
+    signed_up_to: datetime | None = None
+
+
+@strawberry.enum
+class TotalHitsMode(Enum):
+    """
+    A Strawberry GraphQL enum representing how precisely the creators matching a search are counted.
+    """
+
+    EXACT = "exact"
+    CAPPED = "capped"
+    OFF = "off"
+
+
+@strawberry.type
+class SearchTotal:
+    """
+    A Strawberry GraphQL type representing the number of creators matching a search,
+    which is a lower bound unless it's exact.
+    """
+
+    value: int
+    is_exact: bool
+
+
+@strawberry.type
+class FacetBucket:
+    """
+    A Strawberry GraphQL type representing a value of a facet and the number of creators having it.
+    """
+
+    key: str
+    count: int
+
+
+@strawberry.type
+class CreatorFacets:
+    """
+    A Strawberry GraphQL type representing the facets of all the creators matching a search.
+    """
+
+    asset_types: list[FacetBucket]
+    signed_up: list[FacetBucket] = strawberry.field(description="Creators per signup month, e.g. `2023-05`.")
+
+
+@strawberry.type
+class CreatorSearchResult:
+    """
+    A Strawberry GraphQL type representing a page of creators matching a search,
+    along with the facets and the number of all of them.
+    """
+
+    creators: list[CreatorSchema]
+    facets: CreatorFacets | None
+    total: SearchTotal | None
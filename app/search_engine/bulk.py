@@ -0,0 +1,97 @@
+import asyncio
+import logging
+
+from elasticsearch import AsyncElasticsearch
+from elasticsearch.helpers import BulkIndexError, async_streaming_bulk
+
+logger = logging.getLogger("gunicorn.error")
+
+
+class BulkIndexer:
+    """
+    A class that buffers Elasticsearch actions submitted by concurrent indexing jobs
+    and flushes them through the bulk API once the buffer is full or the flush interval has passed.
+
+    Every submitter waits for the result of its own action, so a failed item fails only the job that submitted it.
+    """
+
+    def __init__(self, es: AsyncElasticsearch, max_size: int, flush_interval: float):
+        self.es = es
+        self.max_size = max_size
+        self.flush_interval = flush_interval
+        self._buffer: list[tuple[dict, asyncio.Future]] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._flush_lock = asyncio.Lock()  # to keep the order of actions between consecutive batches
+        self._flush_tasks: set[asyncio.Task] = set()
+
+    async def submit(self, action: dict) -> dict:
+        """
+        Add an action to the buffer and wait until the batch containing it is flushed.
+
+        Args:
+            action (dict): The bulk action, e.g. `{"_op_type": "index", "_index": ..., "_id": ..., "_source": ...}`.
+
+        Returns:
+            dict: The result of the action as reported by Elasticsearch.
+
+        Raises:
+            BulkIndexError: If Elasticsearch failed to apply the action.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._buffer.append((action, future))
+
+        if len(self._buffer) >= self.max_size:
+            self._start_flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.flush_interval, self._start_flush)
+
+        return await future
+
+    async def close(self):
+        """
+        Flush the remaining actions and wait for all the in-flight batches to complete.
+        """
+        self._start_flush()
+        if self._flush_tasks:
+            await asyncio.gather(*self._flush_tasks, return_exceptions=True)
+
+    def _start_flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._buffer = self._buffer, []
+        if not batch:
+            return
+
+        task = asyncio.create_task(self._flush(batch))
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _flush(self, batch: list[tuple[dict, asyncio.Future]]):
+        async with self._flush_lock:
+            processed = 0
+            error: Exception = BulkIndexError("No result was returned for the bulk action.", [])
+            try:
+                async for ok, item in async_streaming_bulk(
+                    self.es,
+                    [action for action, _ in batch],
+                    chunk_size=len(batch),
+                    raise_on_error=False,
+                    raise_on_exception=False,
+                ):
+                    _, future = batch[processed]
+                    processed += 1
+                    if future.done():
+                        continue
+                    if ok:
+                        future.set_result(item)
+                    else:
+                        future.set_exception(BulkIndexError("Failed to apply the bulk action.", [item]))
+            except Exception as e:
+                logger.exception(f"Failed to flush a batch of {len(batch)} bulk actions.")
+                error = e
+
+            for _, future in batch[processed:]:
+                if not future.done():
+                    future.set_exception(error)
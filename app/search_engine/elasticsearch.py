@@ -1,6 +1,8 @@
 from elasticsearch import AsyncElasticsearch
 
 from ..settings import get_settings
+from .manager import ElasticsearchManager
+from .mappings import INDICES
 
 settings = get_settings()
 
@@ -19,3 +21,9 @@ async def close_es():
     if es_client is not None:
         await es_client.close()
         es_client = None
+
+
+async def create_indices(es: AsyncElasticsearch):
+    manager = ElasticsearchManager(es)
+    for index_name in INDICES:
+        await manager.create_index(index_name)
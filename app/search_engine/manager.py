@@ -1,20 +1,64 @@
 import logging
+import time
 
-from elasticsearch import AsyncElasticsearch, ConnectionError, RequestError
+from bson import ObjectId
+from elasticsearch import AsyncElasticsearch, ConnectionError, NotFoundError, RequestError
+from elasticsearch.helpers import BulkIndexError, async_bulk
 from graphql import GraphQLError
-from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
+from tenacity import RetryCallState, retry, retry_if_exception_type, stop_after_attempt, wait_exponential
+
+from ..metrics import ELASTICSEARCH_RETRIES
+from ..tracing import traced
+from .bulk import BulkIndexer
+from .mappings import INDICES, get_versioned_index_name, get_write_alias
 
 logger = logging.getLogger("gunicorn.error")
 
+# How long the indices behind a write alias are cached for, a rollover waits as long for the caches to expire.
+WRITE_INDICES_TTL = 5
+
+# The largest number of suggestions returned at once, which keeps them cheap enough to ask for on every keystroke.
+MAX_SUGGESTIONS = 20
+
+# The deepest result reachable with `from` and `size`, the default `index.max_result_window` of Elasticsearch.
+MAX_RESULT_WINDOW = 10_000
+
+# The types of the root causes of the errors of Elasticsearch that are caused by a search text it can't parse.
+QUERY_ERROR_TYPES = {"query_shard_exception", "parse_exception"}
+
+
+def _count_retry(retry_state: RetryCallState):
+    ELASTICSEARCH_RETRIES.labels(retry_state.fn.__qualname__).inc()
+
+
+def _is_query_error(error: RequestError) -> bool:
+    """
+    Whether the request failed because of the search text, rather than e.g. its pagination or its point in time,
+    whose errors are not the user's to fix by changing the search.
+    """
+    try:
+        root_causes = error.body["error"]["root_cause"]
+    except (KeyError, TypeError):
+        return False
+    return any(root_cause.get("type") in QUERY_ERROR_TYPES for root_cause in root_causes)
+
 
 class ElasticsearchManager:
     """
     A class that encapsulates Elasticsearch operations like creating an index,
     indexing a document, updating a document, deleting a document, and searching.
+
+    When a `BulkIndexer` is given, the write operations are buffered and sent through the bulk API instead.
     """
 
-    def __init__(self, es: AsyncElasticsearch):
+    # Indices that are known to exist, shared by all the managers of the process.
+    known_indices: set[str] = set()
+    # The indices behind the write aliases with the time their entry expires at, by index name.
+    write_indices: dict[str, tuple[float, list[str]]] = {}
+
+    def __init__(self, es: AsyncElasticsearch, bulk_indexer: BulkIndexer | None = None):
         self.es = es
+        self.bulk_indexer = bulk_indexer
 
     @staticmethod
     def _prepare_mongo_doc_for_es(doc: dict) -> dict:
@@ -34,33 +78,114 @@ class ElasticsearchManager:
         prepared_doc["mongo_id"] = str(prepared_doc.pop("_id"))
         return prepared_doc
 
+    @staticmethod
+    def _prepare_es_hit_for_mongo(hit: dict) -> dict:
+        """
+        Prepare an Elasticsearch hit to be used as a MongoDB document, reversing `_prepare_mongo_doc_for_es`.
+
+        Args:
+            hit (dict): The Elasticsearch hit.
+
+        Returns:
+            dict: The prepared document.
+        """
+        prepared_doc = hit.get("_source", {}).copy()
+        prepared_doc.pop("mongo_id", None)
+        prepared_doc["_id"] = ObjectId(hit["_id"])
+        return prepared_doc
+
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=2, max=10),
         retry=retry_if_exception_type(ConnectionError),
+        before_sleep=_count_retry,
     )
     async def create_index(self, index_name: str):
         """
-        Create an index in Elasticsearch.
+        Create an index in Elasticsearch with the settings and mappings declared for it, unless it is already known.
+
+        An index declared in `INDICES` is created as the versioned index behind the index name as the read alias
+        and the write alias. When it exists already in another version, it has to be rolled over
+        with `python -m app.reindex --rollover`.
 
         Args:
             index_name (str): The name of the index to create.
         """
+        if index_name in self.known_indices:
+            return
+
+        definition = INDICES.get(index_name, {})
         if not await self.es.indices.exists(index=index_name):
+            if index_name in INDICES:
+                physical_index_name = get_versioned_index_name(index_name)
+                aliases = {index_name: {}, get_write_alias(index_name): {}}
+            else:
+                physical_index_name = index_name
+                aliases = None
             try:
-                await self.es.indices.create(index=index_name)
+                await self.es.indices.create(
+                    index=physical_index_name,
+                    settings=definition.get("settings"),
+                    mappings=definition.get("mappings"),
+                    aliases=aliases,
+                )
             except RequestError as e:
                 if "resource_already_exists_exception" in str(e):  # due to a race condition
                     logger.warning(f"Index {index_name} already exists, skipping.")
                     pass
                 else:
                     raise
+        elif "mappings" in definition:
+            response = await self.es.indices.get_mapping(index=index_name)
+            mappings = next(iter(response.values()))["mappings"]
+            version = mappings.get("_meta", {}).get("version")
+            if version != definition["mappings"]["_meta"]["version"]:
+                logger.warning(
+                    f"Index {index_name} has mapping version {version}, "
+                    f"expected {definition['mappings']['_meta']['version']}, it needs to be rolled over."
+                )
+
+        self.known_indices.add(index_name)
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=2, max=10),
+        retry=retry_if_exception_type(ConnectionError),
+        before_sleep=_count_retry,
+    )
+    async def get_write_indices(self, index_name: str) -> list[str]:
+        """
+        Get the indices behind the write alias of an index, which are all to be written to
+        so that an index being rolled over to doesn't miss any changes.
+
+        The result is cached for `WRITE_INDICES_TTL` seconds.
+
+        Args:
+            index_name (str): The name of the index, which is the read alias of the versioned indices.
+
+        Returns:
+            list[str]: The names of the indices to write to.
+        """
+        expires_at, write_indices = self.write_indices.get(index_name, (0.0, []))
+        if expires_at > time.monotonic():
+            return write_indices
+
+        try:
+            response = await self.es.indices.get_alias(name=get_write_alias(index_name))
+            write_indices = sorted(response)
+        except NotFoundError:
+            write_indices = [index_name]  # an index without aliases, e.g. one predating them
+
+        self.write_indices[index_name] = (time.monotonic() + WRITE_INDICES_TTL, write_indices)
+        return write_indices
 
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=2, max=10),
         retry=retry_if_exception_type(ConnectionError),
+        before_sleep=_count_retry,
     )
+    @traced("elasticsearch")
     async def index_document(self, index_name: str, doc_id: str, doc: dict):
         """
         Index a document in Elasticsearch.
@@ -71,13 +196,19 @@ class ElasticsearchManager:
             doc (dict): The document to index.
         """
         prepared_doc = self._prepare_mongo_doc_for_es(doc)
+        if self.bulk_indexer is not None:
+            action = {"_op_type": "index", "_index": index_name, "_id": doc_id, "_source": prepared_doc}
+            await self.bulk_indexer.submit(action)
+            return
         await self.es.index(index=index_name, id=doc_id, document=prepared_doc)
 
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=2, max=10),
         retry=retry_if_exception_type(ConnectionError),
+        before_sleep=_count_retry,
     )
+    @traced("elasticsearch")
     async def update_document(self, index_name: str, doc_id: str, doc: dict):
         """
         Update a document in Elasticsearch.
@@ -88,37 +219,92 @@ class ElasticsearchManager:
             doc (dict): The updated document.
         """
         prepared_doc = self._prepare_mongo_doc_for_es(doc)
+        if self.bulk_indexer is not None:
+            action = {"_op_type": "update", "_index": index_name, "_id": doc_id, "doc": prepared_doc}
+            await self.bulk_indexer.submit(action)
+            return
         await self.es.update(index=index_name, id=doc_id, doc=prepared_doc)
 
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=2, max=10),
         retry=retry_if_exception_type(ConnectionError),
+        before_sleep=_count_retry,
     )
-    async def delete_document(self, index_name: str, doc_id: str):
+    @traced("elasticsearch")
+    async def delete_document(self, index_name: str, doc_id: str, ignore_missing: bool = False):
         """
         Delete a document from Elasticsearch.
 
         Args:
             index_name (str): The name of the index where the document is located.
             doc_id (str): The ID of the document to delete.
+            ignore_missing (bool, optional): Whether a missing document counts as deleted. Defaults to False.
         """
-        await self.es.delete(index=index_name, id=doc_id)
+        if self.bulk_indexer is not None:
+            try:
+                await self.bulk_indexer.submit({"_op_type": "delete", "_index": index_name, "_id": doc_id})
+            except BulkIndexError as e:
+                if not (ignore_missing and e.errors and e.errors[0]["delete"]["status"] == 404):
+                    raise
+            return
+        try:
+            await self.es.delete(index=index_name, id=doc_id)
+        except NotFoundError:
+            if not ignore_missing:
+                raise
 
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=2, max=10),
         retry=retry_if_exception_type(ConnectionError),
+        before_sleep=_count_retry,
     )
-    async def search(self, index_name: str, search_text: str, page: int, per_page: int) -> dict:
+    @traced("elasticsearch")
+    async def bulk(self, actions: list[dict]) -> list[dict]:
         """
-        Search for documents in a specified Elasticsearch index using the given search text and pagination parameters.
+        Apply a batch of actions in Elasticsearch through the bulk API.
+
+        Args:
+            actions (list[dict]): The bulk actions, e.g. `{"_op_type": "delete", "_index": ..., "_id": ...}`.
+
+        Returns:
+            list[dict]: The results of the failed actions, except for the ones on missing documents.
+        """
+        _, errors = await async_bulk(self.es, actions, raise_on_error=False, ignore_status=404)
+        return errors
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=2, max=10),
+        retry=retry_if_exception_type(ConnectionError),
+        before_sleep=_count_retry,
+    )
+    @traced("elasticsearch")
+    async def search(
+        self,
+        index_name: str,
+        query: dict,
+        page: int,
+        per_page: int,
+        source: list[str] | bool = True,
+        aggregations: dict | None = None,
+        track_total_hits: bool | int = False,
+    ) -> dict:
+        """
+        Search for documents in a specified Elasticsearch index using the given query and pagination parameters.
 
         Args:
             index_name (str): The name of the Elasticsearch index to search in.
-            search_text (str): The text to search for in the index.
+            query (dict): The Elasticsearch query to search with.
             page (int): The page number of the search results.
             per_page (int): The number of search results per page.
+            source (list[str] | bool, optional): The fields of the `_source` to return, or whether to return
+                the whole `_source` at all. Defaults to True.
+            aggregations (dict, optional): The aggregations to compute over all the matching documents
+                in the same request. Defaults to none.
+            track_total_hits (bool | int, optional): Whether to count all the matching documents, or up to how many
+                of them, which is skipped by default, since it makes Elasticsearch visit every match.
 
         Returns:
             dict: A dictionary containing the search results metadata and the actual results as a list of dictionaries.
@@ -127,12 +313,174 @@ class ElasticsearchManager:
             raise GraphQLError(message="Page must be greater than or equal to 1.")
         if per_page < 1:
             raise GraphQLError(message="Per page must be greater than or equal to 1.")
+        if page * per_page > MAX_RESULT_WINDOW:
+            raise GraphQLError(
+                message=f"Only the first {MAX_RESULT_WINDOW} results can be paged through, "
+                "page further with searchCreatorsConnection."
+            )
+
+        try:
+            result = await self.es.search(
+                index=index_name,
+                query=query,
+                from_=(page - 1) * per_page,
+                size=per_page,
+                source=source,
+                aggregations=aggregations,
+                track_total_hits=track_total_hits,
+            )
+        except RequestError as e:
+            if _is_query_error(e):
+                raise GraphQLError(message="Search text is invalid.")
+            raise
+
+        return result
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=2, max=10),
+        retry=retry_if_exception_type(ConnectionError),
+        before_sleep=_count_retry,
+    )
+    @traced("elasticsearch")
+    async def count(self, index_name: str, query: dict) -> int:
+        """
+        Count the documents matching the query, without fetching or scoring any of them.
+
+        Args:
+            index_name (str): The name of the Elasticsearch index to count in.
+            query (dict): The Elasticsearch query to match the documents with.
+
+        Returns:
+            int: The number of matching documents.
+        """
+        try:
+            result = await self.es.count(index=index_name, query=query)
+        except RequestError as e:
+            if _is_query_error(e):
+                raise GraphQLError(message="Search text is invalid.")
+            raise
+
+        return result["count"]
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=2, max=10),
+        retry=retry_if_exception_type(ConnectionError),
+        before_sleep=_count_retry,
+    )
+    @traced("elasticsearch")
+    async def search_after(
+        self,
+        index_name: str,
+        query: dict,
+        size: int,
+        keep_alive: str,
+        pit_id: str | None = None,
+        search_after: list | None = None,
+        source: list[str] | bool = True,
+    ) -> dict:
+        """
+        Search for documents in a point in time of the index, continuing after the sort values of the previous hit.
+
+        Unlike `search`, the cost of a page doesn't grow with its depth, and the pages stay consistent with each other,
+        since all of them are taken from the same point in time, sorted by relevance with a stable tiebreaker.
+
+        Args:
+            index_name (str): The name of the Elasticsearch index to search in.
+            query (dict): The Elasticsearch query to search with.
+            size (int): The number of search results to return.
+            keep_alive (str): For how long to keep the point in time alive after this search, e.g. `1m`.
+            pit_id (str, optional): The ID of the point in time to search in. Defaults to opening a new one.
+            search_after (list, optional): The sort values of the last hit of the previous page.
+                Defaults to starting from the first hit.
+            source (list[str] | bool, optional): The fields of the `_source` to return, or whether to return
+                the whole `_source` at all. Defaults to True.
+
+        Returns:
+            dict: A dictionary containing the search results, where every hit has its `sort` values,
+                and the `pit_id` to continue the search with.
+        """
+        if size < 1:
+            raise GraphQLError(message="First must be greater than or equal to 1.")
+
+        opens_point_in_time = pit_id is None
+        if opens_point_in_time:
+            response = await self.es.open_point_in_time(index=index_name, keep_alive=keep_alive)
+            pit_id = response["id"]
+
+        try:
+            result = await self.es.search(
+                query=query,
+                pit={"id": pit_id, "keep_alive": keep_alive},
+                sort=[{"_score": "desc"}, {"_shard_doc": "asc"}],
+                search_after=search_after,
+                size=size,
+                source=source,
+                track_total_hits=False,
+            )
+        except Exception as e:
+            # Nobody gets a cursor to continue in the point in time, which would stay open until it expires.
+            if opens_point_in_time:
+                await self.close_point_in_time(pit_id)
+            if isinstance(e, NotFoundError):
+                raise GraphQLError(message="Cursor has expired.")
+            if isinstance(e, RequestError) and _is_query_error(e):
+                raise GraphQLError(message="Search text is invalid.")
+            raise
+
+        return result
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=2, max=10),
+        retry=retry_if_exception_type(ConnectionError),
+        before_sleep=_count_retry,
+    )
+    @traced("elasticsearch")
+    async def suggest(self, index_name: str, field: str, prefix: str, size: int, source: list[str]) -> dict:
+        """
+        Search for documents whose `search_as_you_type` field matches the prefix typed so far,
+        where the last term may be incomplete.
+
+        Args:
+            index_name (str): The name of the Elasticsearch index to search in.
+            field (str): The name of the `search_as_you_type` field to match the prefix against.
+            prefix (str): The text typed so far.
+            size (int): The number of suggestions to return.
+            source (list[str]): The fields of the `_source` to return.
+
+        Returns:
+            dict: A dictionary containing the suggested documents as search results.
+        """
+        if not 1 <= size <= MAX_SUGGESTIONS:
+            raise GraphQLError(message=f"Limit must be between 1 and {MAX_SUGGESTIONS}.")
 
         result = await self.es.search(
             index=index_name,
-            query={"bool": {"must": {"query_string": {"query": search_text}}}},
-            from_=(page - 1) * per_page,
-            size=per_page,
+            query={
+                "multi_match": {
+                    "query": prefix,
+                    "type": "bool_prefix",
+                    "fields": [field, f"{field}._2gram", f"{field}._3gram"],
+                }
+            },
+            size=size,
+            source=source,
+            track_total_hits=False,
         )
 
         return result
+
+    @traced("elasticsearch")
+    async def close_point_in_time(self, pit_id: str):
+        """
+        Close a point in time to free the resources held by it, ignoring the ones that have already expired.
+
+        Args:
+            pit_id (str): The ID of the point in time to close.
+        """
+        try:
+            await self.es.close_point_in_time(id=pit_id)
+        except NotFoundError:
+            pass
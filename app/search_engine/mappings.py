@@ -0,0 +1,96 @@
+from ..settings import get_settings
+
+settings = get_settings()
+
+# Bump it on any change of the mappings or the analysis, and roll the index over, see `app.reindex`.
+CREATOR_INDEX_VERSION = 4
+
+CREATOR_INDEX = {
+    "settings": {
+        "number_of_shards": settings.es_creator_shards,
+        "number_of_replicas": settings.es_creator_replicas,
+        "refresh_interval": settings.es_creator_refresh_interval,
+        # The fields a query string searches when it doesn't name any, instead of all the indexed ones.
+        "query": {"default_field": ["username", "email.text", "assets.type.text"]},
+        "analysis": {
+            "analyzer": {
+                # Matches "jose" to "José".
+                "folding": {"tokenizer": "standard", "filter": ["lowercase", "asciifolding"]},
+            },
+            "normalizer": {
+                "lowercase": {"type": "custom", "filter": ["lowercase"]},
+            },
+        },
+    },
+    "mappings": {
+        "_meta": {"version": CREATOR_INDEX_VERSION},
+        "dynamic": False,
+        "properties": {
+            # Only kept in the `_source`, the documents are looked up by their `_id`.
+            "mongo_id": {"type": "keyword", "index": False, "doc_values": False},
+            "username": {
+                "type": "text",
+                "analyzer": "folding",
+                "fields": {
+                    "keyword": {"type": "keyword", "ignore_above": 256},
+                    # Indexed as the edge n-grams of the shingles as well, for the prefix suggestions.
+                    "suggest": {"type": "search_as_you_type", "analyzer": "folding"},
+                },
+            },
+            "email": {
+                "type": "keyword",
+                "normalizer": "lowercase",
+                "fields": {"text": {"type": "text", "analyzer": "simple"}},
+            },
+            "signed_up": {"type": "date"},
+            "assets": {
+                "type": "nested",
+                # Also indexes the fields of the assets in the creator itself, for the queries not needing
+                # to match the fields of the same asset.
+                "include_in_root": True,
+                "properties": {
+                    # Analyzed as well, for the query strings, which split the text on whitespace before
+                    # matching a keyword, so a multi-word type would never match it.
+                    "type": {
+                        "type": "keyword",
+                        "normalizer": "lowercase",
+                        "fields": {"text": {"type": "text", "analyzer": "folding"}},
+                    },
+                    "created_at": {"type": "date"},
+                },
+            },
+        },
+    },
+}
+
+# Definitions of the indices provisioned at startup, by index name. Each of them is created as a versioned index,
+# e.g. `creator_v1`, behind the index name as the read alias and a write alias, see `get_write_alias`.
+INDICES = {
+    "creator": CREATOR_INDEX,
+}
+
+
+def get_versioned_index_name(index_name: str) -> str:
+    """
+    Get the name of the index for the current version of its definition.
+
+    Args:
+        index_name (str): The name of the index, which is the read alias of the versioned indices.
+
+    Returns:
+        str: The name of the versioned index.
+    """
+    return f"{index_name}_v{INDICES[index_name]['mappings']['_meta']['version']}"
+
+
+def get_write_alias(index_name: str) -> str:
+    """
+    Get the alias of the indices that the documents are written to, more than one while rolling over to a new version.
+
+    Args:
+        index_name (str): The name of the index, which is the read alias of the versioned indices.
+
+    Returns:
+        str: The name of the write alias.
+    """
+    return f"{index_name}_write"
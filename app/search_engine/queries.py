@@ -0,0 +1,76 @@
+import re
+
+from graphql import GraphQLError
+
+from ..models.search import CreatorSearchModel
+from ..settings import get_settings
+
+settings = get_settings()
+
+# The fields of the creator index matched by the search text, the same as its `index.query.default_field`.
+CREATOR_TEXT_FIELDS = ["username", "email", "email.text", "assets.type.text"]
+
+# The facets of the creators matching a search, counting the creators rather than their assets.
+CREATOR_AGGREGATIONS = {
+    "asset_types": {"terms": {"field": "assets.type", "size": 50}},
+    "signed_up": {"date_histogram": {"field": "signed_up", "calendar_interval": "month", "format": "yyyy-MM"}},
+}
+
+# Query string syntax that makes Elasticsearch scan the whole terms dictionary: regular expressions
+# and terms starting with a wildcard.
+_REGEXP_PATTERN = re.compile(r"(?<!\\)/")
+_LEADING_WILDCARD_PATTERN = re.compile(r"(?:^|[\s(:+\-!])[*?]")
+
+
+def build_creator_query(search: CreatorSearchModel) -> dict:
+    """
+    Compile a structured search of creators into an Elasticsearch query.
+
+    The text is matched according to the query mode of the search, or else `search_query_mode`,
+    while the asset types and the signup dates are applied as filters, which don't affect the scores
+    and are cached by Elasticsearch.
+
+    Args:
+        search (CreatorSearchModel): The structured search.
+
+    Returns:
+        dict: The Elasticsearch query.
+
+    Raises:
+        GraphQLError: If the text uses the query string syntax that is too expensive to run.
+    """
+    query_mode = search.query_mode or settings.search_query_mode
+    must = _build_text_query(search.text, query_mode) if search.text is not None else {"match_all": {}}
+
+    filters = []
+    if search.asset_types:
+        filters.append({"terms": {"assets.type": search.asset_types}})
+    if search.signed_up_from is not None or search.signed_up_to is not None:
+        signed_up_range = {}
+        if search.signed_up_from is not None:
+            signed_up_range["gte"] = search.signed_up_from.isoformat()
+        if search.signed_up_to is not None:
+            signed_up_range["lte"] = search.signed_up_to.isoformat()
+        filters.append({"range": {"signed_up": signed_up_range}})
+
+    return {"bool": {"must": must, "filter": filters}}
+
+
+def _build_text_query(text: str, query_mode: str) -> dict:
+    if query_mode == "match":
+        return {"multi_match": {"query": text, "fields": CREATOR_TEXT_FIELDS}}
+
+    if _REGEXP_PATTERN.search(text):
+        raise GraphQLError(message="Regular expressions are not allowed in the search text.")
+    if _LEADING_WILDCARD_PATTERN.search(text):
+        raise GraphQLError(message="Wildcards are not allowed at the start of a term in the search text.")
+
+    return {
+        "query_string": {
+            "query": text,
+            "fields": CREATOR_TEXT_FIELDS,
+            "allow_leading_wildcard": False,
+            "fuzzy_max_expansions": 10,
+            "lenient": True,
+        }
+    }
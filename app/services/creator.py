@@ -1,25 +1,221 @@
+import hashlib
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections.abc import AsyncIterator
+from datetime import datetime
+from functools import partial
 from typing import Any
 
 from bson import ObjectId
+from graphql import GraphQLError
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pydantic import ValidationError
+from pymongo.errors import BulkWriteError
 
+from ..cache.creator import (
+    cache_assets,
+    cache_creators,
+    get_cached_assets,
+    get_cached_creators,
+    invalidate_creator,
+    invalidate_creators,
+)
+from ..cache.search import cache_search, get_cached_search, get_search_cache_key
+from ..cache.singleflight import SingleFlight
+from ..models.creator import CreatorModel
+from ..models.search import CreatorSearchModel
 from ..search_engine.elasticsearch import get_es
 from ..search_engine.manager import ElasticsearchManager
+from ..search_engine.queries import CREATOR_AGGREGATIONS, build_creator_query
+from ..settings import get_settings
+from ..tasks.elasticsearch import mark_document_dirty, mark_documents_dirty
+from ..tracing import span, traced
 from ..worker import get_redis
 
+settings = get_settings()
 
-async def get_creator_by_email(db: AsyncIOMotorDatabase, email: str) -> dict[str, Any] | None:
+DUPLICATE_KEY_ERROR_CODE = 11000
+
+# The largest page of a search through the cursors, which keeps each of its requests cheap.
+MAX_SEARCH_PAGE_SIZE = 100
+
+# Their `single_flight_calls` and `single_flight_coalesced` metrics show how many lookups and searches
+# joined an in-flight one.
+creator_lookups = SingleFlight("creator_lookups")
+creator_searches = SingleFlight("creator_searches")
+
+
+async def get_creators_by_emails(
+    db: AsyncIOMotorDatabase,
+    emails: list[str],
+    fields: list[str] | None = None,
+) -> list[dict[str, Any] | None]:
     """
-    Retrieve a creator from the database using their email address.
+    Retrieve creators by their email addresses, reading through the cache and
+    querying the database in a single query only for the creators missing there.
+    Concurrent lookups of the same creators and fields share one query.
 
     Args:
         db (AsyncIOMotorDatabase): The database connection.
-        email (str): The email of the creator.
+        emails (list[str]): The emails of the creators.
+        fields (list[str], optional): The fields of the creators to read, along with their `_id` and `email`,
+            so a query for a few scalars doesn't transfer and cache the whole assets array. Defaults to all of them.
 
     Returns:
-        Optional[dict[str, Any]]: The creator data as a dictionary, or None if not found.
+        list[Optional[dict[str, Any]]]: The creator data for each of the emails, or None for the ones not found.
     """
-    return await db["creators"].find_one({"email": email})
+    fields = _get_projected_fields(fields)
+    creators_by_email, versions = await get_cached_creators(emails, fields)
+
+    missing_emails = [email for email in emails if email not in creators_by_email]
+    if missing_emails:
+        fields_key = tuple(fields) if fields is not None else None
+        found_creators = await creator_lookups.do_many(
+            [(email, fields_key) for email in missing_emails],
+            partial(_find_creators_by_emails, db, fields, versions),
+        )
+        creators_by_email.update((email, creator) for (email, _), creator in found_creators.items())
+
+    return [creators_by_email.get(email) for email in emails]
+
+
+async def load_creators_by_emails(
+    db: AsyncIOMotorDatabase,
+    keys: list[tuple[str, tuple[str, ...] | None]],
+) -> list[dict[str, Any] | None]:
+    """
+    Load creators for a DataLoader keyed by their emails along with the fields needed,
+    querying once for each distinct set of fields.
+
+    Args:
+        db (AsyncIOMotorDatabase): The database connection.
+        keys (list[tuple[str, Optional[tuple[str, ...]]]]): The emails of the creators along with
+            the fields to read, or None for all of them.
+
+    Returns:
+        list[Optional[dict[str, Any]]]: The creator data for each of the keys, or None for the ones not found.
+    """
+    emails_by_fields: dict[tuple[str, ...] | None, list[str]] = {}
+    for email, fields in keys:
+        emails_by_fields.setdefault(fields, []).append(email)
+
+    creators_by_key = {}
+    for fields, emails in emails_by_fields.items():
+        creators = await get_creators_by_emails(db, emails, list(fields) if fields is not None else None)
+        creators_by_key.update(((email, fields), creator) for email, creator in zip(emails, creators))
+
+    return [creators_by_key[key] for key in keys]
+
+
+async def _find_creators_by_emails(
+    db: AsyncIOMotorDatabase,
+    fields: list[str] | None,
+    versions: dict[str, bytes],
+    keys: list[tuple[str, tuple[str, ...] | None]],
+) -> dict[tuple[str, tuple[str, ...] | None], dict[str, Any]]:
+    emails = [email for email, _ in keys]
+    with span("mongo", "creators.find"):
+        creators = await db["creators"].find({"email": {"$in": emails}}, _get_projection(fields)).to_list(None)
+    await cache_creators(creators, versions, fields)
+
+    fields_key = tuple(fields) if fields is not None else None
+    return {(creator["email"], fields_key): creator for creator in creators}
+
+
+async def get_creators_by_ids(
+    db: AsyncIOMotorDatabase,
+    creator_ids: list[ObjectId],
+    fields: list[str] | None = None,
+) -> list[dict[str, Any] | None]:
+    """
+    Retrieve creators from the database by their IDs in a single query.
+
+    Args:
+        db (AsyncIOMotorDatabase): The database connection.
+        creator_ids (list[ObjectId]): The IDs of the creators.
+        fields (list[str], optional): The fields of the creators to read, along with their `_id`.
+            Defaults to all of them.
+
+    Returns:
+        list[Optional[dict[str, Any]]]: The creator data for each of the IDs, or None for the ones not found.
+    """
+    with span("mongo", "creators.find"):
+        creators = await db["creators"].find({"_id": {"$in": creator_ids}}, _get_projection(fields)).to_list(None)
+    creators_by_id = {creator["_id"]: creator for creator in creators}
+
+    return [creators_by_id.get(creator_id) for creator_id in creator_ids]
+
+
+async def get_creators_assets(
+    db: AsyncIOMotorDatabase,
+    emails: list[str],
+    asset_type: str | None = None,
+    offset: int = 0,
+    limit: int | None = None,
+) -> list[list[dict[str, Any]]]:
+    """
+    Retrieve a slice of the assets of each of the creators, reading through the cache and aggregating only
+    the ones missing there in a single aggregation, which filters and slices the assets arrays in the database,
+    so only the requested page of them is transferred.
+
+    Args:
+        db (AsyncIOMotorDatabase): The database connection.
+        emails (list[str]): The emails of the creators.
+        asset_type (str, optional): The type of the assets to return. Defaults to all of them.
+        offset (int, optional): The number of assets to skip. Defaults to 0.
+        limit (int, optional): The number of assets to return. Defaults to all of them.
+
+    Returns:
+        list[list[dict[str, Any]]]: The slice of the assets for each of the emails, empty for the creators not found.
+    """
+    assets_by_email, versions = await get_cached_assets(emails, asset_type, offset, limit)
+
+    missing_emails = [email for email in emails if email not in assets_by_email]
+    if missing_emails:
+        assets = {"$ifNull": ["$assets", []]}
+        if asset_type is not None:
+            assets = {"$filter": {"input": assets, "cond": {"$eq": ["$$this.type", asset_type]}}}
+        # The number of elements of $slice has to be positive, even for an empty array.
+        count = limit if limit is not None else {"$max": [{"$size": assets}, 1]}
+
+        pipeline = [
+            {"$match": {"email": {"$in": missing_emails}}},
+            {"$project": {"email": 1, "assets": {"$slice": [assets, offset, count]}}},
+        ]
+        with span("mongo", "creators.aggregate"):
+            creators = await db["creators"].aggregate(pipeline).to_list(None)
+        found_assets = {creator["email"]: creator["assets"] for creator in creators}
+        await cache_assets(found_assets, versions, asset_type, offset, limit)
+        assets_by_email.update(found_assets)
+
+    return [assets_by_email.get(email, []) for email in emails]
+
+
+async def load_creators_assets(
+    db: AsyncIOMotorDatabase,
+    keys: list[tuple[str, str | None, int, int | None]],
+) -> list[list[dict[str, Any]]]:
+    """
+    Load slices of the assets of creators for a DataLoader, reading once for each distinct slice.
+
+    Args:
+        db (AsyncIOMotorDatabase): The database connection.
+        keys (list[tuple[str, Optional[str], int, Optional[int]]]): The emails of the creators along with
+            the type, the offset and the limit of their assets to return.
+
+    Returns:
+        list[list[dict[str, Any]]]: The slice of the assets for each of the keys.
+    """
+    emails_by_slice: dict[tuple[str | None, int, int | None], list[str]] = {}
+    for email, *assets_slice in keys:
+        emails_by_slice.setdefault(tuple(assets_slice), []).append(email)
+
+    assets_by_key = {}
+    for assets_slice, emails in emails_by_slice.items():
+        assets = await get_creators_assets(db, emails, *assets_slice)
+        assets_by_key.update(((email, *assets_slice), creator_assets) for email, creator_assets in zip(emails, assets))
+
+    return [assets_by_key[key] for key in keys]
 
 
 async def create_creator(db: AsyncIOMotorDatabase, creator: dict) -> dict[str, Any]:
@@ -33,38 +229,214 @@ async def create_creator(db: AsyncIOMotorDatabase, creator: dict) -> dict[str, A
 
     Returns:
         dict[str, Any]: The result of the creator insertion.
+
+    Raises:
+        DuplicateKeyError: If a creator with the same email already exists.
     """
-    await db["creators"].insert_one(creator)
+    with span("mongo", "creators.insert_one"):
+        await db["creators"].insert_one(creator)
+    await invalidate_creator(creator["email"])
 
-    redis = await get_redis()
-    await redis.enqueue_job("es_create_index", "creator")
-    await redis.enqueue_job("es_index_document", "creator", str(creator["_id"]), creator)
+    await _enqueue_es_sync("creators", "creator", str(creator["_id"]))
+
+    return creator
+
+
+async def import_creators(db: AsyncIOMotorDatabase, rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """
+    Validate and create a chunk of creators at once, e.g. when onboarding a partner, and index them in a single job.
+
+    The valid creators are inserted in a single unordered write, so the duplicates don't stop the others
+    from being inserted.
+
+    Args:
+        db (AsyncIOMotorDatabase): The database connection.
+        rows (list[dict[str, Any]]): The data of the creators to create, as accepted by `CreatorModel`.
+
+    Returns:
+        list[dict[str, Any]]: For each of the rows, either the created `creator` or the `error` that prevented it.
+    """
+    results: list[dict[str, Any]] = []
+    creators = []
+    for row in rows:
+        try:
+            creator = CreatorModel(**row).dict(by_alias=True)
+        except ValidationError as e:
+            messages = [f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in e.errors()]
+            results.append({"error": "; ".join(messages)})
+        else:
+            results.append({"creator": creator})
+            creators.append(creator)
+
+    duplicate_indexes = await _insert_creators(db, creators) if creators else set()
+
+    # The indexes of the write errors are the ones of the valid creators, not of the rows.
+    creator_index = 0
+    for result in results:
+        if "creator" in result:
+            if creator_index in duplicate_indexes:
+                result.pop("creator")
+                result["error"] = "Creator already exists."
+            creator_index += 1
+
+    return results
+
+
+async def _insert_creators(db: AsyncIOMotorDatabase, creators: list[dict[str, Any]]) -> set[int]:
+    """
+    Insert the creators in a single unordered write, and index the inserted ones in a single job.
+
+    The inserted creators are indexed even when the write fails for another reason than a duplicate,
+    since the ones inserted before the failure are kept.
+
+    Args:
+        db (AsyncIOMotorDatabase): The database connection.
+        creators (list[dict[str, Any]]): The validated creators to insert.
+
+    Returns:
+        set[int]: The indexes of the creators that exist already.
+    """
+    failed_indexes = set()
+    try:
+        with span("mongo", "creators.insert_many"):
+            await db["creators"].insert_many(creators, ordered=False)
+    except BulkWriteError as e:
+        write_errors = e.details["writeErrors"]
+        failed_indexes = {error["index"] for error in write_errors}
+        if any(error["code"] != DUPLICATE_KEY_ERROR_CODE for error in write_errors):
+            raise
+    finally:
+        # The `_id` is set by the driver when sending the creators, the ones without it were never sent.
+        inserted_creators = [
+            creator for index, creator in enumerate(creators) if index not in failed_indexes and "_id" in creator
+        ]
+        await invalidate_creators([creator["email"] for creator in inserted_creators])
+        await _enqueue_es_sync_many("creators", "creator", [str(creator["_id"]) for creator in inserted_creators])
+
+    return failed_indexes
+
+
+async def iter_creators(
+    db: AsyncIOMotorDatabase,
+    signed_up_from: datetime | None = None,
+    signed_up_to: datetime | None = None,
+    asset_type: str | None = None,
+    batch_size: int = 1_000,
+) -> AsyncIterator[dict[str, Any]]:
+    """
+    Iterate over all the creators in the database, optionally filtered, fetching them in batches,
+    so only a batch of creators is held in memory at a time.
+
+    Args:
+        db (AsyncIOMotorDatabase): The database connection.
+        signed_up_from (datetime, optional): The earliest signup date of the creators. Defaults to none.
+        signed_up_to (datetime, optional): The latest signup date of the creators. Defaults to none.
+        asset_type (str, optional): The type of an asset the creators have. Defaults to any.
+        batch_size (int, optional): The number of creators to fetch at once. Defaults to 1000.
+
+    Returns:
+        AsyncIterator[dict[str, Any]]: The creator data as dictionaries.
+    """
+    query: dict[str, Any] = {}
+    if signed_up_from is not None or signed_up_to is not None:
+        query["signed_up"] = {}
+        if signed_up_from is not None:
+            query["signed_up"]["$gte"] = signed_up_from
+        if signed_up_to is not None:
+            query["signed_up"]["$lte"] = signed_up_to
+    if asset_type is not None:
+        query["assets.type"] = asset_type
+
+    async for creator in db["creators"].find(query, batch_size=batch_size):
+        yield creator
+
+
+async def add_creator_asset(db: AsyncIOMotorDatabase, email: str, asset: dict) -> dict[str, Any] | None:
+    """
+    Atomically append an asset to a creator in the database and Elasticsearch.
+
+    Args:
+        db (AsyncIOMotorDatabase): The database connection.
+        email (str): The email of the creator.
+        asset (dict): The asset to append to the creator's assets.
+
+    Returns:
+        Optional[dict[str, Any]]: The `_id` of the updated creator as a dictionary, or None if not found.
+    """
+    with span("mongo", "creators.find_one_and_update"):
+        creator = await db["creators"].find_one_and_update(
+            {"email": email},
+            {"$push": {"assets": asset}},
+            projection={"_id": 1},
+        )
+    if creator is None:
+        return None
+
+    await invalidate_creator(email)
+
+    await _enqueue_es_sync("creators", "creator", str(creator["_id"]))
 
     return creator
 
 
-async def update_creator_assets(db: AsyncIOMotorDatabase, email: str, assets: list) -> None:
+async def remove_creator_asset(db: AsyncIOMotorDatabase, email: str, asset_type: str) -> dict[str, Any] | None:
     """
-    Update a creator's assets in the database and Elasticsearch.
+    Atomically remove the first asset of the given type from a creator in the database and Elasticsearch.
 
     Args:
         db (AsyncIOMotorDatabase): The database connection.
         email (str): The email of the creator.
-        assets (list): The updated list of assets for the creator.
-        background_tasks: The FastAPI background tasks instance.
+        asset_type (str): The type of the asset to remove.
 
     Returns:
-        None
+        Optional[dict[str, Any]]: The removed asset, or None if the creator or the asset was not found.
     """
-    await db["creators"].update_one({"email": email}, {"$set": {"assets": assets}})
+    # Unlike `$pull`, which removes all the matching assets, splices out the first one only.
+    asset_types = {"$map": {"input": "$assets", "in": "$$this.type"}}
+    remove_first = {
+        "$let": {
+            "vars": {"index": {"$indexOfArray": [asset_types, asset_type]}},
+            "in": {
+                "$concatArrays": [
+                    {"$slice": ["$assets", "$$index"]},
+                    {"$slice": ["$assets", {"$add": ["$$index", 1]}, {"$size": "$assets"}]},
+                ]
+            },
+        }
+    }
+    with span("mongo", "creators.find_one_and_update"):
+        creator = await db["creators"].find_one_and_update(
+            {"email": email, "assets.type": asset_type},
+            [{"$set": {"assets": remove_first}}],
+            # Taken before the update, `$elemMatch` returns the same first asset of the type.
+            projection={"_id": 1, "assets": {"$elemMatch": {"type": asset_type}}},
+        )
+    if creator is None:
+        return None
 
-    creator = await get_creator_by_email(db, email)
+    await invalidate_creator(email)
 
-    redis = await get_redis()
-    await redis.enqueue_job("es_update_document", "creator", str(creator["_id"]), {"assets": assets})
+    await _enqueue_es_sync("creators", "creator", str(creator["_id"]))
 
+    return creator["assets"][0]
 
-async def delete_creator_by_email(db: AsyncIOMotorDatabase, email: str) -> dict[str, Any]:
+
+async def creator_exists(db: AsyncIOMotorDatabase, email: str) -> bool:
+    """
+    Check whether a creator with the given email exists in the database.
+
+    Args:
+        db (AsyncIOMotorDatabase): The database connection.
+        email (str): The email of the creator.
+
+    Returns:
+        bool: True if the creator exists, False otherwise.
+    """
+    with span("mongo", "creators.find_one"):
+        return await db["creators"].find_one({"email": email}, projection={"_id": 1}) is not None
+
+
+async def delete_creator_by_email(db: AsyncIOMotorDatabase, email: str) -> dict[str, Any] | None:
     """
     Delete a creator from the database by their email and remove their index from Elasticsearch.
 
@@ -74,44 +446,348 @@ async def delete_creator_by_email(db: AsyncIOMotorDatabase, email: str) -> dict[
         background_tasks: The FastAPI background tasks instance.
 
     Returns:
-        dict[str, Any]: The deleted creator data as a dictionary.
+        Optional[dict[str, Any]]: The deleted creator data as a dictionary, or None if not found.
     """
-    creator = await get_creator_by_email(db, email)
-    await db["creators"].delete_one({"email": email})
+    with span("mongo", "creators.find_one_and_delete"):
+        creator = await db["creators"].find_one_and_delete({"email": email})
+    if creator is None:
+        return None
 
-    redis = await get_redis()
-    await redis.enqueue_job("es_delete_document", "creator", str(creator["_id"]))
+    await invalidate_creator(email)
+
+    await _enqueue_es_sync("creators", "creator", str(creator["_id"]))
 
     return creator
 
 
 async def search_creators(
     db: AsyncIOMotorDatabase,
-    search_text: str,
+    search: CreatorSearchModel,
     page: int = 1,
     per_page: int = 10,
+    fields: list[str] | None = None,
 ) -> list[dict[str, Any]]:
     """
-    Search for creators in the database based on the provided search text, page, and per_page parameters.
+    Search for creators based on the provided structured search, page, and per_page parameters.
+
+    Args:
+        db (AsyncIOMotorDatabase): The database connection.
+        search (CreatorSearchModel): The text to search for in the creators' data and the filters to apply.
+        page (int, optional): The page number of the search results. Defaults to 1.
+        per_page (int, optional): The number of search results per page. Defaults to 10.
+        fields (list[str], optional): The fields of the creators to return. Defaults to all of them.
+
+    Returns:
+        list[dict[str, Any]]: A list of dictionaries containing creator data that matches the search.
+
+    Raises:
+        GraphQLError: If the search text is invalid or too expensive to run.
+    """
+    results = await search_creators_page(db, search, page, per_page, fields)
+
+    return results["creators"]
+
+
+async def search_creators_page(
+    db: AsyncIOMotorDatabase,
+    search: CreatorSearchModel,
+    page: int = 1,
+    per_page: int = 10,
+    fields: list[str] | None = None,
+    facets: bool = False,
+    total_hits: str = "off",
+) -> dict[str, Any]:
+    """
+    Search for creators in the database based on the provided structured search, page, and per_page parameters,
+    optionally along with the facets of all the matching creators computed in the same request.
 
-    This function utilizes Elasticsearch to perform the search, then queries the database using the creator IDs
-    returned from the search to retrieve the creator data.
+    This function utilizes Elasticsearch to perform the search and, by default, builds the creators right from
+    the `_source` of the hits, limited to the requested fields. When `search_hydrate_from_mongo` is enabled,
+    the database is queried using the creator IDs returned from the search to retrieve the creator data instead.
+    Either way, the creators are returned in the order of their relevance.
+
+    The results are cached for a short time per search and page, until the index changes,
+    and concurrent identical searches share one request to Elasticsearch.
 
     Args:
         db (AsyncIOMotorDatabase): The database connection.
-        search_text (str): The text to search for in the creators' data.
+        search (CreatorSearchModel): The text to search for in the creators' data and the filters to apply.
         page (int, optional): The page number of the search results. Defaults to 1.
         per_page (int, optional): The number of search results per page. Defaults to 10.
+        fields (list[str], optional): The fields of the creators to return. Defaults to all of them.
+        facets (bool, optional): Whether to count the matching creators per asset type and signup month.
+            Defaults to False.
+        total_hits (str, optional): Whether to count all the matching creators ("exact"),
+            up to `search_total_hits_cap` of them ("capped"), or not at all ("off"). Defaults to "off".
+
+    Returns:
+        dict[str, Any]: The `creators` that match the search, and if requested, their `facets`
+            as lists of buckets with a `key` and a `count` by the name of the facet,
+            and their `total` as its `value` and whether it `is_exact` or a lower bound.
+
+    Raises:
+        GraphQLError: If the search text is invalid or too expensive to run.
+    """
+    query = build_creator_query(search)
+    aggregations = CREATOR_AGGREGATIONS if facets else None
+    track_total_hits = {"exact": True, "capped": settings.search_total_hits_cap, "off": False}[total_hits]
+
+    redis = await get_redis()
+    cache_key = await get_search_cache_key(
+        redis,
+        "creator",
+        query,
+        page,
+        per_page,
+        fields,
+        aggregations,
+        track_total_hits,
+    )
+    results = await get_cached_search(redis, cache_key)
+    if results is not None:
+        return results
+
+    search_page = partial(
+        _search_creators,
+        db,
+        query,
+        page,
+        per_page,
+        fields,
+        aggregations,
+        track_total_hits,
+        cache_key,
+    )
+
+    return await creator_searches.do(cache_key, search_page)
+
+
+async def _search_creators(
+    db: AsyncIOMotorDatabase,
+    query: dict,
+    page: int,
+    per_page: int,
+    fields: list[str] | None,
+    aggregations: dict | None,
+    track_total_hits: bool | int,
+    cache_key: str,
+) -> dict[str, Any]:
+    es = await get_es()
+    source = _get_source(fields)
+    response = await ElasticsearchManager(es).search(
+        "creator",
+        query,
+        page,
+        per_page,
+        source=source,
+        aggregations=aggregations,
+        track_total_hits=track_total_hits,
+    )
+    results = {
+        "creators": await _prepare_es_hits_for_creators(db, response["hits"]["hits"], fields),
+        "facets": _prepare_es_aggregations_for_facets(response["aggregations"]) if aggregations else None,
+        "total": _prepare_es_total(response["hits"]["total"]) if track_total_hits is not False else None,
+    }
+
+    redis = await get_redis()
+    await cache_search(redis, cache_key, results)
+
+    return results
+
+
+async def count_creators(search: CreatorSearchModel) -> int:
+    """
+    Count the creators matching the structured search exactly, without fetching any of them.
+
+    Args:
+        search (CreatorSearchModel): The text to search for in the creators' data and the filters to apply.
 
     Returns:
-        list[dict[str, Any]]: A list of dictionaries containing creator data that matches the search text.
+        int: The number of matching creators.
+
+    Raises:
+        GraphQLError: If the search text is invalid or too expensive to run.
     """
     es = await get_es()
-    response = await ElasticsearchManager(es).search("creator", search_text, page, per_page)
 
-    creator_ids = [hit["_id"] for hit in response["hits"]["hits"]]
-    creators = (
-        await db["creators"].find({"_id": {"$in": [ObjectId(creator_id) for creator_id in creator_ids]}}).to_list(None)
+    return await ElasticsearchManager(es).count("creator", build_creator_query(search))
+
+
+async def search_creators_after(
+    db: AsyncIOMotorDatabase,
+    search: CreatorSearchModel,
+    first: int = 10,
+    after: str | None = None,
+    fields: list[str] | None = None,
+) -> tuple[list[tuple[str, dict[str, Any]]], bool]:
+    """
+    Search for creators based on the provided structured search, continuing after the cursor of the previous page.
+
+    The search runs in an Elasticsearch point in time with `search_after`, so the cost of a page doesn't depend
+    on how deep it is. The cursors are opaque strings holding the point in time ID and the sort values of a hit,
+    along with a hash of the query, so a cursor can't continue a different search.
+
+    Args:
+        db (AsyncIOMotorDatabase): The database connection.
+        search (CreatorSearchModel): The text to search for in the creators' data and the filters to apply.
+        first (int, optional): The number of creators to return, at most 100. Defaults to 10.
+        after (str, optional): The cursor of the creator to start after. Defaults to the start of the results.
+        fields (list[str], optional): The fields of the creators to return. Defaults to all of them.
+
+    Returns:
+        tuple[list[tuple[str, dict[str, Any]]], bool]: The cursors and data of the creators that match
+            the search, and whether there are more creators after them.
+    """
+    if not 1 <= first <= MAX_SEARCH_PAGE_SIZE:
+        raise GraphQLError(message=f"First must be between 1 and {MAX_SEARCH_PAGE_SIZE}.")
+
+    query = build_creator_query(search)
+    query_hash = _get_query_hash(query)
+    pit_id, search_after = _decode_cursor(after, query_hash) if after is not None else (None, None)
+
+    es = await get_es()
+    manager = ElasticsearchManager(es)
+    response = await manager.search_after(
+        "creator",
+        query,
+        # One more hit to find out whether there is a next page.
+        first + 1,
+        settings.search_pit_keep_alive,
+        pit_id=pit_id,
+        search_after=search_after,
+        source=_get_source(fields),
+    )
+
+    hits = response["hits"]["hits"]
+    has_next_page = len(hits) > first
+    if not has_next_page:
+        await manager.close_point_in_time(response["pit_id"])
+
+    hits = hits[:first]
+    cursors = [_encode_cursor(response["pit_id"], hit["sort"], query_hash) for hit in hits]
+    creators = await _prepare_es_hits_for_creators(db, hits, fields)
+
+    return list(zip(cursors, creators)), has_next_page
+
+
+async def suggest_creators(prefix: str, limit: int = 10) -> list[dict[str, Any]]:
+    """
+    Suggest creators whose username starts with the typed prefix, for searching as the user types.
+
+    Unlike `search_creators`, only the username and the email of the creators are returned,
+    right from the `_source` of the hits, without touching the database or the cache.
+
+    Args:
+        prefix (str): The beginning of the username typed so far.
+        limit (int, optional): The number of creators to suggest. Defaults to 10.
+
+    Returns:
+        list[dict[str, Any]]: The usernames and emails of the suggested creators, the best matches first.
+    """
+    es = await get_es()
+    response = await ElasticsearchManager(es).suggest(
+        "creator",
+        "username.suggest",
+        prefix,
+        limit,
+        source=["username", "email"],
     )
 
-    return creators
+    return [hit["_source"] for hit in response["hits"]["hits"]]
+
+
+def _get_query_hash(query: dict) -> str:
+    return hashlib.sha1(json.dumps(query, sort_keys=True).encode()).hexdigest()
+
+
+def _encode_cursor(pit_id: str, sort: list, query_hash: str) -> str:
+    return urlsafe_b64encode(json.dumps({"pit_id": pit_id, "sort": sort, "query": query_hash}).encode()).decode()
+
+
+def _decode_cursor(cursor: str, query_hash: str) -> tuple[str, list]:
+    try:
+        decoded = json.loads(urlsafe_b64decode(cursor.encode()))
+        pit_id, sort, cursor_query_hash = decoded["pit_id"], decoded["sort"], decoded["query"]
+    except (ValueError, TypeError, KeyError):
+        raise GraphQLError(message="Cursor is invalid.")
+    # The sort values of a hit only make sense in the search that returned it.
+    if cursor_query_hash != query_hash:
+        raise GraphQLError(message="Cursor is from a different search.")
+    return pit_id, sort
+
+
+def _get_projected_fields(fields: list[str] | None) -> list[str] | None:
+    # The email keys the cache and the lookups, and the `_id` is always returned by MongoDB.
+    if fields is None:
+        return None
+    return sorted({*fields, "email"} - {"_id"})
+
+
+def _get_projection(fields: list[str] | None) -> dict[str, int] | None:
+    if fields is None:
+        return None
+    return {field: 1 for field in fields} or {"_id": 1}  # an empty projection would return everything
+
+
+def _get_source(fields: list[str] | None) -> list[str] | bool:
+    if settings.search_hydrate_from_mongo:
+        return False
+    if fields is None:
+        return True
+    return [field for field in fields if field != "_id"] or False
+
+
+def _prepare_es_hit_for_creator(hit: dict) -> dict[str, Any]:
+    creator = ElasticsearchManager._prepare_es_hit_for_mongo(hit)
+    if "signed_up" in creator:
+        creator["signed_up"] = datetime.fromisoformat(creator["signed_up"])
+    for asset in creator.get("assets", []):
+        if "created_at" in asset:
+            asset["created_at"] = datetime.fromisoformat(asset["created_at"])
+    return creator
+
+
+async def _prepare_es_hits_for_creators(
+    db: AsyncIOMotorDatabase,
+    hits: list[dict],
+    fields: list[str] | None,
+) -> list[dict[str, Any]]:
+    if not settings.search_hydrate_from_mongo:
+        return [_prepare_es_hit_for_creator(hit) for hit in hits]
+
+    creators = await get_creators_by_ids(db, [ObjectId(hit["_id"]) for hit in hits], fields)
+
+    return [creator for creator in creators if creator is not None]
+
+
+def _prepare_es_total(total: dict) -> dict[str, Any]:
+    return {"value": total["value"], "is_exact": total["relation"] == "eq"}
+
+
+def _prepare_es_aggregations_for_facets(aggregations: dict) -> dict[str, list[dict[str, Any]]]:
+    return {
+        name: [
+            {"key": bucket.get("key_as_string", bucket["key"]), "count": bucket["doc_count"]}
+            for bucket in aggregation["buckets"]
+        ]
+        for name, aggregation in aggregations.items()
+    }
+
+
+@traced("arq")
+async def _enqueue_es_sync(collection_name: str, index_name: str, doc_id: str):
+    if settings.change_stream_indexing:
+        return  # the change stream indexer picks the change up from the database
+    redis = await get_redis()
+    if await mark_document_dirty(redis, index_name, doc_id):
+        await redis.enqueue_job("es_sync_document", collection_name, index_name, doc_id)
+
+
+@traced("arq")
+async def _enqueue_es_sync_many(collection_name: str, index_name: str, doc_ids: list[str]):
+    if settings.change_stream_indexing or not doc_ids:
+        return
+    redis = await get_redis()
+    doc_ids = await mark_documents_dirty(redis, index_name, doc_ids)
+    if doc_ids:
+        await redis.enqueue_job("es_sync_documents", collection_name, index_name, doc_ids)
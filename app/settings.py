@@ -1,5 +1,6 @@
 import logging
 from functools import lru_cache
+from typing import Literal
 
 from pydantic import BaseSettings
 
@@ -12,6 +13,29 @@ class Settings(BaseSettings):
     elasticsearch_url: str
     redis_host: str
     redis_port: int
+    change_stream_indexing: bool = False
+    creator_cache_size: int = 10_000
+    creator_cache_ttl: int = 60
+    creator_export_batch_size: int = 1_000
+    creator_import_chunk_size: int = 500
+    creator_import_max_errors: int = 100
+    es_bulk_indexing: bool = True
+    es_bulk_size: int = 500
+    es_bulk_flush_interval: float = 0.5
+    es_creator_shards: int = 1
+    es_creator_replicas: int = 1
+    es_creator_refresh_interval: str = "1s"
+    # Returns the timings of the GraphQL operations in the `extensions` of their responses.
+    graphql_timing_results: bool = False
+    search_cache_ttl: int = 10
+    search_hydrate_from_mongo: bool = False
+    search_pit_keep_alive: str = "1m"
+    # "match" matches the text of the structured searches as plain words, "query_string" allows the query string
+    # syntax except for its most expensive parts. The `searchText` argument always allows the query string syntax.
+    search_query_mode: Literal["match", "query_string"] = "match"
+    search_total_hits_cap: int = 10_000
+    worker_metrics_port: int = 9090
+    worker_queue_depth_interval: float = 5.0
 
 
 @lru_cache
@@ -1,7 +1,78 @@
+from arq import Retry
+from bson import ObjectId
 from elasticsearch import AsyncElasticsearch
+from elasticsearch.helpers import BulkIndexError
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from redis.asyncio import Redis
 
+from ..cache.search import bump_search_generation
+from ..search_engine.bulk import BulkIndexer
 from ..search_engine.manager import ElasticsearchManager
 
+# How long the sync state of a document outlives a lost job, after that the next write enqueues a new one.
+SYNC_STATE_TTL = 600
+
+# How many times a sync job runs before it gives up, arq's default `max_tries` of a job.
+SYNC_MAX_TRIES = 5
+
+# How many seconds a failed sync job waits per try before it runs again.
+SYNC_RETRY_DELAY = 5
+
+# Marks the document as changed and returns its previous state.
+_MARK_DIRTY_SCRIPT = """
+local previous = redis.call("GET", KEYS[1])
+redis.call("SET", KEYS[1], "dirty", "EX", ARGV[1])
+return previous
+"""
+
+# Forgets the state of the document unless it has changed again while it was being synced.
+_FINISH_SYNC_SCRIPT = """
+if redis.call("GET", KEYS[1]) == "syncing" then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+
+def _get_sync_state_key(index_name: str, doc_id: str) -> str:
+    return f"es:sync:{index_name}:{doc_id}"
+
+
+async def mark_document_dirty(redis: Redis, index_name: str, doc_id: str) -> bool:
+    """
+    Mark a document as changed in the database since it was last synced to Elasticsearch.
+
+    Args:
+        redis (Redis): The Redis connection.
+        index_name (str): The name of the index where the document is located.
+        doc_id (str): The ID of the document.
+
+    Returns:
+        bool: True if a sync job needs to be enqueued for the document, False if a pending or running one
+            is going to pick the change up.
+    """
+    return bool(await mark_documents_dirty(redis, index_name, [doc_id]))
+
+
+async def mark_documents_dirty(redis: Redis, index_name: str, doc_ids: list[str]) -> list[str]:
+    """
+    Mark documents as changed in the database since they were last synced to Elasticsearch, in a single round trip.
+
+    Args:
+        redis (Redis): The Redis connection.
+        index_name (str): The name of the index where the documents are located.
+        doc_ids (list[str]): The IDs of the documents.
+
+    Returns:
+        list[str]: The IDs of the documents that need a sync job to be enqueued for them.
+    """
+    async with redis.pipeline(transaction=False) as pipeline:
+        for doc_id in doc_ids:
+            pipeline.eval(_MARK_DIRTY_SCRIPT, 1, _get_sync_state_key(index_name, doc_id), SYNC_STATE_TTL)
+        previous_states = await pipeline.execute()
+
+    return [doc_id for doc_id, previous in zip(doc_ids, previous_states) if previous is None]
+
 
 async def es_create_index(ctx, index_name: str):
     """
@@ -14,39 +85,120 @@ async def es_create_index(ctx, index_name: str):
     await ElasticsearchManager(es).create_index(index_name=index_name)
 
 
-async def es_index_document(ctx, index_name: str, doc_id: str, doc: dict):
+async def es_sync_document(ctx, collection_name: str, index_name: str, doc_id: str):
     """
-    Index a document in Elasticsearch.
+    Make a document in Elasticsearch match its current state in the database, deleting it if it's gone there.
+
+    There is at most one job per document, which syncs it again as long as it keeps being marked as changed
+    (see `mark_document_dirty`), so the intermediate states of a hot document are skipped
+    and the concurrent jobs never apply its states out of order.
 
     Args:
-        index_name (str): The name of the index to which the document will be indexed.
+        collection_name (str): The name of the collection where the document is stored.
+        index_name (str): The name of the index where the document is located, written to through its write alias.
         doc_id (str): The ID of the document.
-        doc (dict): The document to index.
     """
+    db: AsyncIOMotorDatabase = ctx["db"]
     es: AsyncElasticsearch = ctx["es"]
-    await ElasticsearchManager(es).index_document(index_name=index_name, doc_id=doc_id, doc=doc)
+    bulk_indexer: BulkIndexer | None = ctx.get("bulk_indexer")
+    redis: Redis = ctx["redis"]
+    manager = ElasticsearchManager(es, bulk_indexer)
+    key = _get_sync_state_key(index_name, doc_id)
+
+    try:
+        while True:
+            # Set before reading, so the writes the read misses mark the document as changed again.
+            await redis.set(key, "syncing", ex=SYNC_STATE_TTL)
+
+            doc = await db[collection_name].find_one({"_id": ObjectId(doc_id)})
+            # More than one index while it's being rolled over to a new version.
+            for write_index_name in await manager.get_write_indices(index_name):
+                if doc is None:
+                    await manager.delete_document(index_name=write_index_name, doc_id=doc_id, ignore_missing=True)
+                else:
+                    await manager.index_document(index_name=write_index_name, doc_id=doc_id, doc=doc)
+            await bump_search_generation(redis, index_name)
+
+            if await redis.eval(_FINISH_SYNC_SCRIPT, 1, key):
+                return
+    except BaseException as e:
+        await _handle_sync_failure(ctx, [key], e)
+        raise
 
 
-async def es_update_document(ctx, index_name: str, doc_id: str, doc: dict):
+async def es_sync_documents(ctx, collection_name: str, index_name: str, doc_ids: list[str]):
     """
-    Update a document in Elasticsearch.
+    Make a batch of documents in Elasticsearch match their current state in the database, like `es_sync_document`,
+    reading them in a single query and writing them through the bulk API.
 
     Args:
-        index_name (str): The name of the index where the document is located.
-        doc_id (str): The ID of the document.
-        doc (dict): The updated document.
+        collection_name (str): The name of the collection where the documents are stored.
+        index_name (str): The name of the index where the documents are located, written to through its write alias.
+        doc_ids (list[str]): The IDs of the documents.
     """
+    db: AsyncIOMotorDatabase = ctx["db"]
     es: AsyncElasticsearch = ctx["es"]
-    await ElasticsearchManager(es).update_document(index_name=index_name, doc_id=doc_id, doc=doc)
+    redis: Redis = ctx["redis"]
+    manager = ElasticsearchManager(es)
+    keys = [_get_sync_state_key(index_name, doc_id) for doc_id in doc_ids]
+
+    try:
+        while doc_ids:
+            async with redis.pipeline(transaction=False) as pipeline:
+                for doc_id in doc_ids:
+                    pipeline.set(_get_sync_state_key(index_name, doc_id), "syncing", ex=SYNC_STATE_TTL)
+                await pipeline.execute()
+
+            cursor = db[collection_name].find({"_id": {"$in": [ObjectId(doc_id) for doc_id in doc_ids]}})
+            docs = {str(doc["_id"]): doc async for doc in cursor}
+            actions = []
+            for write_index_name in await manager.get_write_indices(index_name):
+                for doc_id in doc_ids:
+                    if doc_id in docs:
+                        doc = ElasticsearchManager._prepare_mongo_doc_for_es(docs[doc_id])
+                        actions.append(
+                            {"_op_type": "index", "_index": write_index_name, "_id": doc_id, "_source": doc}
+                        )
+                    else:
+                        actions.append({"_op_type": "delete", "_index": write_index_name, "_id": doc_id})
+            errors = await manager.bulk(actions)
+            if errors:
+                raise BulkIndexError(f"Failed to sync {len(errors)} documents.", errors)
+            await bump_search_generation(redis, index_name)
+
+            async with redis.pipeline(transaction=False) as pipeline:
+                for doc_id in doc_ids:
+                    pipeline.eval(_FINISH_SYNC_SCRIPT, 1, _get_sync_state_key(index_name, doc_id))
+                finished = await pipeline.execute()
+            doc_ids = [doc_id for doc_id, is_finished in zip(doc_ids, finished) if not is_finished]
+    except BaseException as e:
+        await _handle_sync_failure(ctx, keys, e)
+        raise
 
 
-async def es_delete_document(ctx, index_name: str, doc_id: str):
+async def _handle_sync_failure(ctx, keys: list[str], error: BaseException):
     """
-    Delete a document from Elasticsearch.
+    Leave the documents of a failed sync job marked as changed and have arq run the job again, so neither the change
+    it was syncing nor the writes it had coalesced are lost. A job that runs out of tries forgets the documents
+    instead, so the next writes enqueue new jobs rather than wait for their states to expire.
 
     Args:
-        index_name (str): The name of the index where the document is located.
-        doc_id (str): The ID of the document to delete.
+        keys (list[str]): The keys of the sync states of the documents.
+        error (BaseException): The error the job failed with.
+
+    Raises:
+        Retry: When the job has tries left, to run it again after a delay.
     """
-    es: AsyncElasticsearch = ctx["es"]
-    await ElasticsearchManager(es).delete_document(index_name=index_name, doc_id=doc_id)
+    redis: Redis = ctx["redis"]
+    job_try = ctx.get("job_try", 1)
+    if isinstance(error, Exception) and job_try >= SYNC_MAX_TRIES:
+        await redis.delete(*keys)
+        return
+
+    async with redis.pipeline(transaction=False) as pipeline:
+        for key in keys:
+            pipeline.set(key, "dirty", ex=SYNC_STATE_TTL)
+        await pipeline.execute()
+    # A cancelled job is run again by arq itself.
+    if isinstance(error, Exception):
+        raise Retry(defer=job_try * SYNC_RETRY_DELAY) from error
@@ -0,0 +1,79 @@
+import time
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Any
+
+from .metrics import SPAN_SECONDS
+
+
+@dataclass
+class Span:
+    """
+    A timed call to a datastore, with its start relative to the start of the trace, in seconds.
+    """
+
+    kind: str
+    name: str
+    start_offset: float
+    duration: float
+
+
+@dataclass
+class Trace:
+    """
+    The spans recorded while handling a request, e.g. a GraphQL operation.
+    """
+
+    started_at: float = field(default_factory=time.perf_counter)
+    spans: list[Span] = field(default_factory=list)
+
+
+# Copied into the tasks created while handling the request, e.g. the ones dispatching the DataLoaders.
+current_trace: ContextVar[Trace | None] = ContextVar("current_trace", default=None)
+
+
+@contextmanager
+def span(kind: str, name: str) -> Iterator[None]:
+    """
+    Time a call to a datastore, recording it in the `span_seconds` histogram and in the current trace, if any.
+
+    Args:
+        kind (str): The kind of the call, e.g. "mongo", "elasticsearch", "redis" or "arq".
+        name (str): The name of the call, which has to be one of a few, as it labels the histogram.
+    """
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - started_at
+        SPAN_SECONDS.labels(kind, name).observe(duration)
+        trace = current_trace.get()
+        if trace is not None:
+            trace.spans.append(Span(kind, name, started_at - trace.started_at, duration))
+
+
+def traced(kind: str) -> Callable[[Callable[..., Awaitable[Any]]], Callable[..., Awaitable[Any]]]:
+    """
+    Decorate a coroutine function to time each of its calls as a span named after the function.
+
+    Args:
+        kind (str): The kind of the calls, e.g. "elasticsearch".
+
+    Returns:
+        Callable: The decorator.
+    """
+
+    def decorator(fn: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        name = fn.__qualname__
+
+        @wraps(fn)
+        async def wrapper(*args, **kwargs) -> Any:
+            with span(kind, name):
+                return await fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -1,15 +1,21 @@
 import asyncio
+import logging
 
 from arq import create_pool, run_worker
-from arq.connections import RedisSettings
+from arq.connections import ArqRedis, RedisSettings
+from prometheus_client import start_http_server
 
 from .database.mongodb import close_db, get_db
-from .search_engine.elasticsearch import close_es, get_es
+from .metrics import ARQ_QUEUE_DEPTH, get_registry, job_metrics
+from .search_engine.bulk import BulkIndexer
+from .search_engine.elasticsearch import close_es, create_indices, get_es
 from .settings import get_settings
-from .tasks.elasticsearch import es_create_index, es_delete_document, es_index_document, es_update_document
+from .tasks.elasticsearch import SYNC_MAX_TRIES, es_create_index, es_sync_document, es_sync_documents
 
 settings = get_settings()
 
+logger = logging.getLogger("gunicorn.error")
+
 redis_settings = RedisSettings(host=settings.redis_host, port=settings.redis_port)
 redis_pool = None
 redis_lock = asyncio.Lock()
@@ -34,21 +40,46 @@ async def close_redis():
 async def startup(ctx):
     ctx["db"] = await get_db()
     ctx["es"] = await get_es()
+    await create_indices(ctx["es"])
     ctx["redis"] = await get_redis()
+    if settings.es_bulk_indexing:
+        ctx["bulk_indexer"] = BulkIndexer(
+            ctx["es"],
+            max_size=settings.es_bulk_size,
+            flush_interval=settings.es_bulk_flush_interval,
+        )
+    start_http_server(settings.worker_metrics_port, registry=get_registry())
+    ctx["queue_depth_sampler"] = asyncio.create_task(_sample_queue_depth(ctx["redis"]))
 
 
 async def shutdown(ctx):
+    if "queue_depth_sampler" in ctx:
+        ctx["queue_depth_sampler"].cancel()
+    if "bulk_indexer" in ctx:
+        await ctx["bulk_indexer"].close()
     await close_db()
     await close_es()
     await close_redis()
 
 
 class WorkerSettings:
-    functions = [es_create_index, es_index_document, es_update_document, es_delete_document]
+    functions = [job_metrics(function) for function in (es_create_index, es_sync_document, es_sync_documents)]
     redis_settings = redis_settings
+    max_tries = SYNC_MAX_TRIES
+    # In the bulk mode the concurrent jobs are what fills the buffer of a batch.
+    max_jobs = settings.es_bulk_size if settings.es_bulk_indexing else 10
     on_startup = startup
     on_shutdown = shutdown
 
 
+async def _sample_queue_depth(redis: ArqRedis):
+    while True:
+        try:
+            ARQ_QUEUE_DEPTH.set(await redis.zcard(redis.default_queue_name))
+        except Exception as e:
+            logger.warning(f"Failed to sample the depth of the arq queue: {e}")
+        await asyncio.sleep(settings.worker_queue_depth_interval)
+
+
 if __name__ == "__main__":
     run_worker(WorkerSettings)
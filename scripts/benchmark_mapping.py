@@ -0,0 +1,115 @@
+"""
+Benchmark the size and the search latency of the creator index with the declared mapping against dynamic mapping.
+
+Run it from the root of the repository against a disposable Elasticsearch, it creates and deletes its own indices:
+
+    ELASTICSEARCH_URL=http://localhost:9200 python -m scripts.benchmark_mapping --documents 100000
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import string
+import time
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from elasticsearch import AsyncElasticsearch
+from elasticsearch.helpers import async_bulk
+
+from app.search_engine.manager import ElasticsearchManager
+from app.search_engine.mappings import CREATOR_INDEX
+from app.settings import get_settings
+
+settings = get_settings()
+
+ASSET_TYPES = ["image", "video", "audio", "document", "3d model", "font"]
+SEARCHES = ["alice", "bob*", "example.com", "image", "video AND audio", "3d model", "user_42"]
+
+
+def generate_creator(rng: random.Random, number: int) -> dict:
+    username = "".join(rng.choices(string.ascii_lowercase, k=rng.randint(5, 12))) + f"_{number}"
+    signed_up = datetime(2020, 1, 1) + timedelta(seconds=rng.randint(0, 3 * 365 * 24 * 3600))
+    return {
+        "_id": ObjectId(),
+        "username": username,
+        "email": f"{username}@example.com",
+        "signed_up": signed_up.isoformat(),
+        "assets": [
+            {"type": rng.choice(ASSET_TYPES), "created_at": (signed_up + timedelta(days=days)).isoformat()}
+            for days in range(rng.randint(0, 5))
+        ],
+    }
+
+
+async def benchmark(es: AsyncElasticsearch, name: str, definition: dict, documents: int, searches: int) -> dict:
+    index_name = f"benchmark_creator_{name}"
+    await es.options(ignore_status=404).indices.delete(index=index_name)
+    await es.indices.create(index=index_name, settings=definition.get("settings"), mappings=definition.get("mappings"))
+
+    rng = random.Random(42)  # the same documents for every mapping
+    actions = (
+        {
+            "_index": index_name,
+            "_id": str(creator["_id"]),
+            "_source": ElasticsearchManager._prepare_mongo_doc_for_es(creator),
+        }
+        for creator in (generate_creator(rng, number) for number in range(documents))
+    )
+    started_at = time.monotonic()
+    await async_bulk(es, actions, chunk_size=settings.es_bulk_size)
+    await es.indices.refresh(index=index_name)
+    indexing_time = time.monotonic() - started_at
+
+    await es.indices.forcemerge(index=index_name, max_num_segments=1)
+    stats = await es.indices.stats(index=index_name, metric="store")
+    size = stats["indices"][index_name]["primaries"]["store"]["size_in_bytes"]
+
+    latencies = []
+    for number in range(searches):
+        search_text = SEARCHES[number % len(SEARCHES)]
+        started_at = time.monotonic()
+        await es.search(
+            index=index_name,
+            query={"query_string": {"query": search_text}},
+            size=10,
+            request_cache=False,
+        )
+        latencies.append((time.monotonic() - started_at) * 1000)
+
+    await es.indices.delete(index=index_name)
+
+    return {
+        "mapping": name,
+        "docs/sec": documents / indexing_time,
+        "size MB": size / 1024 / 1024,
+        "p50 ms": statistics.median(latencies),
+        "p95 ms": statistics.quantiles(latencies, n=20)[-1],
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=100_000, help="creators to index")
+    parser.add_argument("--searches", type=int, default=1_000, help="searches to time")
+    args = parser.parse_args()
+
+    es = AsyncElasticsearch(hosts=[settings.elasticsearch_url])
+    try:
+        results = [
+            await benchmark(es, "dynamic", {}, args.documents, args.searches),
+            await benchmark(es, "declared", CREATOR_INDEX, args.documents, args.searches),
+        ]
+    finally:
+        await es.close()
+
+    columns = list(results[0])
+    print(" | ".join(f"{column:>10}" for column in columns))
+    for result in results:
+        print(
+            " | ".join(f"{value:>10.1f}" if isinstance(value, float) else f"{value:>10}" for value in result.values())
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
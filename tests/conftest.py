@@ -1,13 +1,17 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
 import pytest
 from elasticsearch import AsyncElasticsearch, NotFoundError
 from httpx import AsyncClient
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 
-from app.database.mongodb import get_db
+from app.database.mongodb import create_indexes, get_db
 from app.main import create_application
 from app.models.creator import CreatorModel
-from app.search_engine.elasticsearch import get_es
+from app.search_engine.elasticsearch import create_indices, get_es
+from app.search_engine.manager import ElasticsearchManager
 from app.settings import get_settings
+from app.worker import close_redis
 
 pytestmark = pytest.mark.asyncio
 
@@ -31,11 +35,17 @@ app.dependency_overrides[get_es] = get_test_es
 
 async def data_cleanup(db: AsyncIOMotorDatabase, es: AsyncElasticsearch):
     try:
-        await es.indices.delete(index="creator")
+        # The versioned indices behind the aliases, which can't be deleted through them.
+        for index_name in await es.indices.get(index="creator*"):
+            await es.indices.delete(index=index_name)
     except NotFoundError:
         pass
     finally:
         await db["creators"].drop()
+        await create_indexes(db)
+    ElasticsearchManager.known_indices.clear()
+    ElasticsearchManager.write_indices.clear()
+    await create_indices(es)
 
 
 @pytest.fixture(autouse=True)
@@ -46,6 +56,28 @@ async def prepare_test_state():
     yield
     await test_db.close()
     await test_es.close()
+    # The pool of the app is bound to the event loop of the test, or is the mocked one of the test.
+    await close_redis()
+
+
+@pytest.fixture
+def mocked_redis() -> MagicMock:
+    """
+    A stand-in for the Redis pool of the app whose commands succeed without doing anything,
+    e.g. to keep the indexing jobs from being enqueued.
+    """
+    pipeline = MagicMock()
+    pipeline.__aenter__.return_value = pipeline
+    pipeline.execute = AsyncMock(return_value=[])
+
+    redis = MagicMock()
+    redis.pipeline.return_value = pipeline
+    for command in ("get", "set", "incr", "delete", "eval", "publish", "enqueue_job", "close"):
+        setattr(redis, command, AsyncMock(return_value=None))
+    redis.mget = AsyncMock(side_effect=lambda *keys: [None] * len(keys))
+
+    with patch("app.worker.create_pool", new=AsyncMock(return_value=redis)):
+        yield redis
 
 
 @pytest.fixture
@@ -68,8 +100,12 @@ async def add_test_creator(test_creator_data, test_client):
         addCreator(username: "{test_username}", email: "{test_email}") {{
             email
             assets {{
-                type
-                createdAt
+                edges {{
+                    node {{
+                        type
+                        createdAt
+                    }}
+                }}
             }}
         }}
     }}
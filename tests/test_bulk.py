@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+from bson import ObjectId
+from elasticsearch.helpers import BulkIndexError
+
+from app.search_engine.bulk import BulkIndexer
+from tests.conftest import get_test_es
+
+pytestmark = pytest.mark.asyncio
+
+
+def _get_index_action(username: str) -> dict:
+    return {"_op_type": "index", "_index": "creator", "_id": str(ObjectId()), "_source": {"username": username}}
+
+
+@pytest.fixture
+async def test_es():
+    es = await get_test_es()
+    yield es
+    await es.close()
+
+
+async def test_bulk_indexer_flushes_a_full_buffer_without_waiting(test_es):
+    async for es in test_es:
+        bulk_indexer = BulkIndexer(es, max_size=2, flush_interval=60)
+        actions = [_get_index_action("first"), _get_index_action("second")]
+
+        results = await asyncio.wait_for(asyncio.gather(*(bulk_indexer.submit(action) for action in actions)), 5)
+
+        assert [result["index"]["_id"] for result in results] == [action["_id"] for action in actions]
+        for action in actions:
+            assert await es.exists(index="creator", id=action["_id"])
+
+
+async def test_bulk_indexer_flushes_after_the_interval(test_es):
+    async for es in test_es:
+        bulk_indexer = BulkIndexer(es, max_size=100, flush_interval=0.05)
+        action = _get_index_action("first")
+
+        result = await asyncio.wait_for(bulk_indexer.submit(action), 5)
+
+        assert result["index"]["_id"] == action["_id"]
+        assert await es.exists(index="creator", id=action["_id"])
+
+
+async def test_bulk_indexer_fails_only_the_failed_actions(test_es):
+    async for es in test_es:
+        bulk_indexer = BulkIndexer(es, max_size=2, flush_interval=60)
+        action = _get_index_action("first")
+        missing_update = {
+            "_op_type": "update",
+            "_index": "creator",
+            "_id": str(ObjectId()),
+            "doc": {"username": "none"},
+        }
+
+        result, error = await asyncio.gather(
+            bulk_indexer.submit(action), bulk_indexer.submit(missing_update), return_exceptions=True
+        )
+
+        assert result["index"]["_id"] == action["_id"]
+        assert isinstance(error, BulkIndexError)
+        assert error.errors[0]["update"]["_id"] == missing_update["_id"]
+
+
+async def test_bulk_indexer_close_flushes_the_buffer(test_es):
+    async for es in test_es:
+        bulk_indexer = BulkIndexer(es, max_size=100, flush_interval=60)
+        action = _get_index_action("first")
+        submitted = asyncio.create_task(bulk_indexer.submit(action))
+        await asyncio.sleep(0)
+
+        await bulk_indexer.close()
+
+        assert (await asyncio.wait_for(submitted, 5))["index"]["_id"] == action["_id"]
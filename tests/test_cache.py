@@ -0,0 +1,33 @@
+from app.cache.memory import TTLCache
+
+
+def test_ttl_cache_returns_cached_value():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("key", "value")
+    assert cache.get("key") == "value"
+
+
+def test_ttl_cache_evicts_least_recently_used_key():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("first", 1)
+    cache.set("second", 2)
+    cache.get("first")
+    cache.set("third", 3)
+    assert cache.get("first") == 1
+    assert cache.get("second") is None
+    assert cache.get("third") == 3
+
+
+def test_ttl_cache_expires_keys():
+    cache = TTLCache(maxsize=2, ttl=0)
+    cache.set("key", "value")
+    assert cache.get("key", "default") == "default"
+    assert len(cache) == 0
+
+
+def test_ttl_cache_deletes_keys():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("key", "value")
+    cache.delete("key")
+    cache.delete("missing")
+    assert cache.get("key") is None
@@ -0,0 +1,154 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from app.cache import creator as creator_cache
+from app.cache.creator import (
+    INVALIDATION_CHANNEL,
+    _get_redis_key,
+    cache_creators,
+    get_cached_creators,
+    invalidate_creator,
+    local_cache,
+    start_invalidation_listener,
+    stop_invalidation_listener,
+)
+from app.services.creator import get_creators_by_emails
+from app.settings import get_settings
+from app.worker import get_redis
+from tests.conftest import get_test_db
+
+pytestmark = pytest.mark.asyncio
+
+settings = get_settings()
+
+
+@pytest.fixture
+def test_creator(test_creator_data) -> dict:
+    return {"_id": "id", "email": test_creator_data["email"], "username": test_creator_data["username"], "assets": []}
+
+
+async def test_full_variant_stands_in_for_any_fields(test_creator):
+    email = test_creator["email"]
+    _, versions = await get_cached_creators([email])
+    await cache_creators([test_creator], versions)
+    local_cache.clear()
+
+    cached_creators, versions = await get_cached_creators([email], ["email", "username"])
+
+    assert cached_creators == {email: test_creator}
+    assert versions == {}
+
+
+async def test_variant_is_only_served_for_its_fields(test_creator):
+    email = test_creator["email"]
+    creator = {"_id": "id", "email": email, "username": test_creator["username"]}
+    _, versions = await get_cached_creators([email], ["email", "username"])
+    await cache_creators([creator], versions, ["email", "username"])
+    local_cache.clear()
+
+    assert (await get_cached_creators([email], ["username", "email"]))[0] == {email: creator}
+    assert (await get_cached_creators([email], ["assets", "email"]))[0] == {}
+    assert (await get_cached_creators([email]))[0] == {}
+
+
+async def test_invalidate_creator_drops_all_variants(test_creator):
+    email = test_creator["email"]
+    _, versions = await get_cached_creators([email])
+    await cache_creators([test_creator], versions)
+    await cache_creators([test_creator], versions, ["email", "username"])
+
+    await invalidate_creator(email)
+
+    assert (await get_cached_creators([email]))[0] == {}
+    assert (await get_cached_creators([email], ["email", "username"]))[0] == {}
+
+
+async def test_cache_creators_skips_the_creators_invalidated_since_the_lookup(test_creator):
+    email = test_creator["email"]
+    _, versions = await get_cached_creators([email])
+    await invalidate_creator(email)
+
+    await cache_creators([test_creator], versions)
+
+    assert local_cache.get(email) is None
+    assert (await get_cached_creators([email]))[0] == {}
+    _, versions = await get_cached_creators([email])
+    await cache_creators([test_creator], versions)
+    assert (await get_cached_creators([email]))[0] == {email: test_creator}
+
+
+async def test_cache_creators_keeps_the_expiry_of_the_entry(test_creator):
+    email = test_creator["email"]
+    redis = await get_redis()
+    _, versions = await get_cached_creators([email], ["email", "username"])
+    await cache_creators([test_creator], versions, ["email", "username"])
+    await redis.expire(_get_redis_key(email), 5)
+
+    await cache_creators([test_creator], versions)
+
+    assert 0 < await redis.ttl(_get_redis_key(email)) <= 5
+
+
+async def test_local_cache_returns_copies(test_creator):
+    email = test_creator["email"]
+    _, versions = await get_cached_creators([email])
+    await cache_creators([test_creator], versions)
+
+    (await get_cached_creators([email]))[0][email]["assets"].append({"type": "Changed"})
+
+    assert (await get_cached_creators([email]))[0] == {email: test_creator}
+
+
+async def test_local_cache_is_not_filled_when_invalidated_during_the_read(test_creator):
+    email = test_creator["email"]
+    _, versions = await get_cached_creators([email])
+    await cache_creators([test_creator], versions)
+    local_cache.clear()
+
+    async def get_redis_while_invalidating():
+        creator_cache._drop_local("other@example.com")
+        return await get_redis()
+
+    with patch.object(creator_cache, "get_redis", new=get_redis_while_invalidating):
+        cached_creators, _ = await get_cached_creators([email])
+
+    assert cached_creators == {email: test_creator}
+    assert local_cache.get(email) is None
+
+
+async def test_invalidation_listener_drops_the_local_entries(test_creator):
+    email = test_creator["email"]
+    redis = await get_redis()
+    await start_invalidation_listener()
+    try:
+        while (await redis.pubsub_numsub(INVALIDATION_CHANNEL))[0][1] == 0:
+            await asyncio.sleep(0.01)
+        _, versions = await get_cached_creators([email])
+        await cache_creators([test_creator], versions)
+
+        # As published by another process, which has dropped the shared entry.
+        await redis.publish(INVALIDATION_CHANNEL, email)
+        for _ in range(100):
+            if local_cache.get(email) is None:
+                break
+            await asyncio.sleep(0.01)
+
+        assert local_cache.get(email) is None
+    finally:
+        await stop_invalidation_listener()
+
+
+async def test_get_creators_by_emails_reads_and_caches_the_projected_fields(add_test_creator, test_creator_data):
+    await add_test_creator
+    email = test_creator_data["email"]
+    db = await get_test_db()
+
+    creators = await get_creators_by_emails(db, [email], ["username"])
+    local_cache.clear()
+    cached_creators, _ = await get_cached_creators([email], ["email", "username"])
+
+    assert set(creators[0]) == {"_id", "email", "username"}
+    assert cached_creators == {email: creators[0]}
+    assert (await get_cached_creators([email]))[0] == {}
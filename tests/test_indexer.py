@@ -0,0 +1,117 @@
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from bson import ObjectId
+from elasticsearch.helpers import BulkIndexError
+
+from app.indexer import APPLY_MAX_TRIES, STATE_COLLECTION, _load_resume_token, _save_resume_token, _tail_changes
+from app.search_engine.manager import ElasticsearchManager
+from app.worker import get_redis
+from tests.conftest import get_test_db, get_test_es
+
+pytestmark = pytest.mark.asyncio
+
+
+class ReplayedChangeStream:
+    """
+    Replays the given change events like a change stream of MongoDB, which needs a replica set,
+    with the `_id` of the last returned event as its resume token.
+    """
+
+    def __init__(self, changes: list[dict]):
+        self.changes = list(changes)
+        self.resume_token = None
+
+    @property
+    def alive(self) -> bool:
+        return bool(self.changes)
+
+    async def try_next(self) -> dict:
+        change = self.changes.pop(0)
+        self.resume_token = change["_id"]
+        return change
+
+
+def _get_change(token: int, operation_type: str, doc_id: ObjectId, username: str | None = None) -> dict:
+    change = {"_id": {"_data": str(token)}, "operationType": operation_type, "documentKey": {"_id": doc_id}}
+    if username is not None:
+        change["fullDocument"] = {"_id": doc_id, "username": username, "email": f"{username}@example.com"}
+    return change
+
+
+@pytest.fixture
+async def indexer_deps() -> tuple:
+    """
+    The database, the Redis pool and the Elasticsearch manager the changes are tailed with.
+    """
+    db = await get_test_db()
+    es = await get_test_es()
+    await db[STATE_COLLECTION].drop()
+    yield db, await get_redis(), ElasticsearchManager(es)
+    await es.close()
+
+
+async def test_tail_changes_applies_the_latest_change_of_a_batch(indexer_deps):
+    async for db, redis, manager in indexer_deps:
+        first_id, second_id = ObjectId(), ObjectId()
+        stream = ReplayedChangeStream(
+            [
+                _get_change(1, "insert", first_id, "first"),
+                _get_change(2, "update", first_id, "renamed"),
+                _get_change(3, "insert", second_id, "second"),
+            ]
+        )
+
+        with patch.object(manager, "bulk", wraps=manager.bulk) as bulk:
+            await _tail_changes(db, redis, manager, stream, "creators", "creator", None)
+
+        bulk.assert_awaited_once()
+        assert len(bulk.await_args.args[0]) == 2
+        es_doc = await manager.es.get(index="creator", id=str(first_id))
+        assert es_doc["_source"]["username"] == "renamed"
+        assert await manager.es.exists(index="creator", id=str(second_id))
+        assert await _load_resume_token(db, "creators") == {"_data": "3"}
+
+
+async def test_tail_changes_applies_the_deletes(indexer_deps):
+    async for db, redis, manager in indexer_deps:
+        deleted_id, missing_id = ObjectId(), ObjectId()
+        await manager.es.index(index="creator", id=str(deleted_id), document={"username": "deleted"})
+        stream = ReplayedChangeStream([_get_change(1, "delete", deleted_id), _get_change(2, "delete", missing_id)])
+
+        await _tail_changes(db, redis, manager, stream, "creators", "creator", None)
+
+        assert not await manager.es.exists(index="creator", id=str(deleted_id))
+        assert await _load_resume_token(db, "creators") == {"_data": "2"}
+
+
+async def test_tail_changes_retries_the_failed_changes(indexer_deps):
+    async for db, redis, manager in indexer_deps:
+        failed_id, applied_id = ObjectId(), ObjectId()
+        stream = ReplayedChangeStream(
+            [_get_change(1, "insert", failed_id, "failed"), _get_change(2, "insert", applied_id, "applied")]
+        )
+        error = {"index": {"_index": "creator_v1", "_id": str(failed_id), "status": 429}}
+
+        with patch("app.indexer.APPLY_RETRY_DELAY", 0):
+            with patch.object(manager, "bulk", new=AsyncMock(side_effect=[[error], []])) as bulk:
+                await _tail_changes(db, redis, manager, stream, "creators", "creator", None)
+
+        assert [action["_id"] for action in bulk.await_args.args[0]] == [str(failed_id)]
+        assert await _load_resume_token(db, "creators") == {"_data": "2"}
+
+
+async def test_tail_changes_keeps_the_resume_token_before_a_failed_batch(indexer_deps):
+    async for db, redis, manager in indexer_deps:
+        await _save_resume_token(db, "creators", {"_data": "0"})
+        failed_id = ObjectId()
+        stream = ReplayedChangeStream([_get_change(1, "insert", failed_id, "failed")])
+        error = {"index": {"_index": "creator_v1", "_id": str(failed_id), "status": 429}}
+
+        with patch("app.indexer.APPLY_RETRY_DELAY", 0):
+            with patch.object(manager, "bulk", new=AsyncMock(return_value=[error])) as bulk:
+                with pytest.raises(BulkIndexError):
+                    await _tail_changes(db, redis, manager, stream, "creators", "creator", {"_data": "0"})
+
+        assert bulk.await_count == APPLY_MAX_TRIES
+        assert await _load_resume_token(db, "creators") == {"_data": "0"}
@@ -1,12 +1,9 @@
-from unittest.mock import AsyncMock, patch
-
 import pytest
 
 pytestmark = pytest.mark.asyncio
 
 
-@patch("app.worker.create_pool", new_callable=AsyncMock)
-async def test_graphql_mutation_add_creator(mocked_create_pool, faker, test_client):
+async def test_graphql_mutation_add_creator(mocked_redis, faker, test_client):
     test_email = faker.email()
     test_username = faker.user_name()
     add_creator = f"""
@@ -14,8 +11,12 @@ async def test_graphql_mutation_add_creator(mocked_create_pool, faker, test_clie
         addCreator(username: "{test_username}", email: "{test_email}") {{
             email
             assets {{
-                type
-                createdAt
+                edges {{
+                    node {{
+                        type
+                        createdAt
+                    }}
+                }}
             }}
         }}
     }}
@@ -27,6 +28,48 @@ async def test_graphql_mutation_add_creator(mocked_create_pool, faker, test_clie
         assert response.json()["data"]["addCreator"]["email"] == test_email
 
 
+async def test_graphql_mutation_add_creators(mocked_redis, faker, test_client):
+    test_email = faker.email()
+    add_creators = f"""
+    mutation {{
+        addCreators(input: [
+            {{username: "{faker.user_name()}", email: "{test_email}"}},
+            {{username: "{faker.user_name()}", email: "{test_email}"}},
+            {{username: "{faker.user_name()}", email: "not an email"}}
+        ]) {{
+            creator {{
+                email
+            }}
+            error
+        }}
+    }}
+    """
+    async for client in test_client:
+        response = await client.post("/graphql", json={"query": add_creators})
+        assert response.status_code == 200
+        assert "errors" not in response.json()
+        assert response.json()["data"]["addCreators"] == [
+            {"creator": {"email": test_email}, "error": None},
+            {"creator": None, "error": "Creator already exists."},
+            {"creator": None, "error": "email: value is not a valid email address"},
+        ]
+
+
+async def test_graphql_mutation_add_too_many_creators(mocked_redis, test_client):
+    creators = ", ".join(f'{{username: "user{number}", email: "user{number}@example.com"}}' for number in range(1001))
+    add_creators = f"""
+    mutation {{
+        addCreators(input: [{creators}]) {{
+            error
+        }}
+    }}
+    """
+    async for client in test_client:
+        response = await client.post("/graphql", json={"query": add_creators})
+        assert response.status_code == 200
+        assert response.json()["errors"][0]["message"] == "At most 1000 creators can be added at once."
+
+
 async def test_graphql_mutation_add_existing_creator(add_test_creator, test_creator_data, test_client):
     await add_test_creator
     test_email = test_creator_data["email"]
@@ -36,8 +79,12 @@ async def test_graphql_mutation_add_existing_creator(add_test_creator, test_crea
         addCreator(username: "{test_username}", email: "{test_email}") {{
             email
             assets {{
-                type
-                createdAt
+                edges {{
+                    node {{
+                        type
+                        createdAt
+                    }}
+                }}
             }}
         }}
     }}
@@ -117,6 +164,94 @@ async def test_graphql_mutation_remove_asset_from_creator(add_test_creator, test
         assert response.json()["data"]["removeAssetFromCreator"]["type"] == test_type
 
 
+async def test_graphql_mutation_remove_asset_keeps_other_assets(add_test_creator, test_creator_data, test_client):
+    await add_test_creator
+    test_email = test_creator_data["email"]
+    async for client in test_client:
+        for test_type in ("Test Type", "Other Type"):
+            add_asset_to_creator = f"""
+            mutation {{
+                addAssetToCreator(type: "{test_type}", email: "{test_email}") {{
+                    type
+                }}
+            }}
+            """
+            response = await client.post("/graphql", json={"query": add_asset_to_creator})
+            assert "errors" not in response.json()
+
+        remove_asset = f"""
+        mutation {{
+            removeAssetFromCreator(type: "Test Type", email: "{test_email}") {{
+                type
+            }}
+        }}
+        """
+        response = await client.post("/graphql", json={"query": remove_asset})
+        assert "errors" not in response.json()
+
+        get_creator = f"""
+            {{
+                getCreator(email: "{test_email}") {{
+                    assets {{
+                        edges {{
+                            node {{
+                                type
+                            }}
+                        }}
+                    }}
+                }}
+            }}
+        """
+        response = await client.post("/graphql", json={"query": get_creator})
+        assert response.status_code == 200
+        assert response.json()["data"]["getCreator"]["assets"]["edges"] == [{"node": {"type": "Other Type"}}]
+
+
+async def test_graphql_mutation_remove_asset_removes_one_asset_of_the_type(
+    add_test_creator, test_creator_data, test_client
+):
+    await add_test_creator
+    test_email = test_creator_data["email"]
+    async for client in test_client:
+        for _ in range(2):
+            add_asset_to_creator = f"""
+            mutation {{
+                addAssetToCreator(type: "Test Type", email: "{test_email}") {{
+                    type
+                }}
+            }}
+            """
+            response = await client.post("/graphql", json={"query": add_asset_to_creator})
+            assert "errors" not in response.json()
+
+        remove_asset = f"""
+        mutation {{
+            removeAssetFromCreator(type: "Test Type", email: "{test_email}") {{
+                type
+            }}
+        }}
+        """
+        response = await client.post("/graphql", json={"query": remove_asset})
+        assert "errors" not in response.json()
+
+        get_creator = f"""
+            {{
+                getCreator(email: "{test_email}") {{
+                    assets {{
+                        edges {{
+                            node {{
+                                type
+                            }}
+                        }}
+                    }}
+                }}
+            }}
+        """
+        response = await client.post("/graphql", json={"query": get_creator})
+        assert response.status_code == 200
+        assert response.json()["data"]["getCreator"]["assets"]["edges"] == [{"node": {"type": "Test Type"}}]
+
+
 async def test_graphql_mutation_remove_asset_from_non_existing_creator(test_client):
     test_email = "Test Type"
     test_type = "non_existing@example.com"
@@ -182,8 +317,12 @@ async def test_graphql_mutation_delete_non_existing_creator(test_client):
         deleteCreator(email: "{test_email}") {{
             email
             assets {{
-                type
-                createdAt
+                edges {{
+                    node {{
+                        type
+                        createdAt
+                    }}
+                }}
             }}
         }}
     }}
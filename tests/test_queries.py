@@ -0,0 +1,52 @@
+from datetime import datetime
+
+import pytest
+from graphql import GraphQLError
+from pydantic import ValidationError
+
+from app.models.search import CreatorSearchModel
+from app.search_engine import queries
+from app.search_engine.queries import build_creator_query
+
+
+def test_build_creator_query_matches_all_without_text():
+    query = build_creator_query(CreatorSearchModel())
+    assert query == {"bool": {"must": {"match_all": {}}, "filter": []}}
+
+
+def test_build_creator_query_applies_filters():
+    search = CreatorSearchModel(
+        text="  cool   creator ",
+        asset_types=["video"],
+        signed_up_from=datetime(2023, 1, 1),
+    )
+    query = build_creator_query(search)
+    assert query["bool"]["must"]["multi_match"]["query"] == "cool creator"
+    assert query["bool"]["filter"] == [
+        {"terms": {"assets.type": ["video"]}},
+        {"range": {"signed_up": {"gte": "2023-01-01T00:00:00"}}},
+    ]
+
+
+def test_creator_search_rejects_empty_signed_up_range():
+    with pytest.raises(ValidationError):
+        CreatorSearchModel(signed_up_from=datetime(2023, 2, 1), signed_up_to=datetime(2023, 1, 1))
+
+
+@pytest.mark.parametrize("text", ["/cre.*or/", "*ator", "username:?reator"])
+def test_build_creator_query_rejects_expensive_query_string(monkeypatch, text):
+    monkeypatch.setattr(queries.settings, "search_query_mode", "query_string")
+    with pytest.raises(GraphQLError):
+        build_creator_query(CreatorSearchModel(text=text))
+
+
+def test_build_creator_query_allows_trailing_wildcard_in_query_string(monkeypatch):
+    monkeypatch.setattr(queries.settings, "search_query_mode", "query_string")
+    query = build_creator_query(CreatorSearchModel(text="username:creat* AND assets.type:video"))
+    assert query["bool"]["must"]["query_string"]["query"] == "username:creat* AND assets.type:video"
+
+
+def test_build_creator_query_uses_the_query_mode_of_the_search(monkeypatch):
+    monkeypatch.setattr(queries.settings, "search_query_mode", "match")
+    query = build_creator_query(CreatorSearchModel(text="username:creat*", query_mode="query_string"))
+    assert query["bool"]["must"]["query_string"]["query"] == "username:creat*"
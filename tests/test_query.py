@@ -1,4 +1,13 @@
+from unittest.mock import patch
+
 import pytest
+from bson import ObjectId
+
+from app.graphql import extensions
+from app.search_engine import queries
+from app.search_engine.manager import ElasticsearchManager
+from app.services import creator as creator_service
+from tests.conftest import get_test_db, get_test_es
 
 pytestmark = pytest.mark.asyncio
 
@@ -11,8 +20,12 @@ async def test_graphql_query_get_creator(add_test_creator, test_creator_data, te
             getCreator(email: "{test_email}") {{
                 email
                 assets {{
-                    type
-                    createdAt
+                    edges {{
+                        node {{
+                            type
+                            createdAt
+                        }}
+                    }}
                 }}
             }}
         }}
@@ -45,8 +58,12 @@ async def test_graphql_query_get_creator_assets(add_test_creator, test_creator_d
                 getCreator(email: "{test_email}") {{
                     email
                     assets {{
-                        type
-                        createdAt
+                        edges {{
+                            node {{
+                                type
+                                createdAt
+                            }}
+                        }}
                     }}
                 }}
             }}
@@ -54,7 +71,134 @@ async def test_graphql_query_get_creator_assets(add_test_creator, test_creator_d
         response = await client.post("/graphql", json={"query": get_creator})
         assert response.status_code == 200
         assert "errors" not in response.json()
-        assert response.json()["data"]["getCreator"]["assets"][0]["type"] == test_type
+        assert response.json()["data"]["getCreator"]["assets"]["edges"][0]["node"]["type"] == test_type
+
+
+async def test_graphql_query_get_creator_assets_page(add_test_creator, test_creator_data, test_client):
+    await add_test_creator
+    test_email = test_creator_data["email"]
+    async for client in test_client:
+        for test_type in ("Test Type", "Other Type", "Test Type", "Test Type"):
+            add_asset_to_creator = f"""
+            mutation {{
+                addAssetToCreator(type: "{test_type}", email: "{test_email}") {{
+                    type
+                }}
+            }}
+            """
+            response = await client.post("/graphql", json={"query": add_asset_to_creator})
+            assert "errors" not in response.json()
+
+        end_cursor = None
+        pages = []
+        while True:
+            after = f', after: "{end_cursor}"' if end_cursor else ""
+            get_creator = f"""
+                {{
+                    getCreator(email: "{test_email}") {{
+                        assets(first: 2, type: "Test Type"{after}) {{
+                            edges {{
+                                node {{
+                                    type
+                                }}
+                            }}
+                            pageInfo {{
+                                hasNextPage
+                                endCursor
+                            }}
+                        }}
+                    }}
+                }}
+            """
+            response = await client.post("/graphql", json={"query": get_creator})
+            assert "errors" not in response.json()
+            assets = response.json()["data"]["getCreator"]["assets"]
+            pages.append([edge["node"]["type"] for edge in assets["edges"]])
+            if not assets["pageInfo"]["hasNextPage"]:
+                break
+            end_cursor = assets["pageInfo"]["endCursor"]
+
+        assert pages == [["Test Type", "Test Type"], ["Test Type"]]
+
+
+async def test_graphql_query_get_creator_assets_page_from_cache(
+    add_test_creator, test_creator_data, test_client, monkeypatch
+):
+    monkeypatch.setattr(extensions.settings, "graphql_timing_results", True)
+    await add_test_creator
+    test_email = test_creator_data["email"]
+    add_asset_to_creator = f"""
+        mutation {{
+            addAssetToCreator(type: "Test Type", email: "{test_email}") {{
+                type
+            }}
+        }}
+    """
+    get_creator = f"""
+        {{
+            getCreator(email: "{test_email}") {{
+                assets(first: 5) {{
+                    edges {{
+                        node {{
+                            type
+                        }}
+                    }}
+                }}
+            }}
+        }}
+    """
+    async for client in test_client:
+        await client.post("/graphql", json={"query": add_asset_to_creator})
+        await client.post("/graphql", json={"query": get_creator})
+        response = await client.post("/graphql", json={"query": get_creator})
+        assert len(response.json()["data"]["getCreator"]["assets"]["edges"]) == 1
+        assert {span["kind"] for span in response.json()["extensions"]["timing"]["spans"]} == {"redis"}
+
+        # Adding an asset invalidates the cached pages along with the creator.
+        await client.post("/graphql", json={"query": add_asset_to_creator})
+        response = await client.post("/graphql", json={"query": get_creator})
+        assert len(response.json()["data"]["getCreator"]["assets"]["edges"]) == 2
+
+
+async def test_graphql_query_get_creator_assets_page_too_large(add_test_creator, test_creator_data, test_client):
+    await add_test_creator
+    test_email = test_creator_data["email"]
+    get_creator = f"""
+        {{
+            getCreator(email: "{test_email}") {{
+                assets(first: 101) {{
+                    edges {{
+                        node {{
+                            type
+                        }}
+                    }}
+                }}
+            }}
+        }}
+    """
+    async for client in test_client:
+        response = await client.post("/graphql", json={"query": get_creator})
+        assert response.json()["errors"][0]["message"] == "First must be between 0 and 100."
+
+
+async def test_graphql_query_timing(add_test_creator, test_creator_data, test_client, monkeypatch):
+    monkeypatch.setattr(extensions.settings, "graphql_timing_results", True)
+    await add_test_creator
+    test_email = test_creator_data["email"]
+    get_creator = f"""
+        {{
+            getCreator(email: "{test_email}") {{
+                email
+            }}
+        }}
+    """
+    async for client in test_client:
+        response = await client.post("/graphql", json={"query": get_creator})
+        assert response.status_code == 200
+        timing = response.json()["extensions"]["timing"]
+        assert set(timing["phases"]) == {"parsing", "validation", "execution"}
+        assert [resolver["path"] for resolver in timing["resolvers"]] == ["getCreator"]
+        assert {span["kind"] for span in timing["spans"]} >= {"redis"}
 
 
 async def test_graphql_query_get_non_existing_creator(test_client):
@@ -64,8 +208,12 @@ async def test_graphql_query_get_non_existing_creator(test_client):
         getCreator(email: "{test_email}") {{
             email
             assets {{
-                type
-                createdAt
+                edges {{
+                    node {{
+                        type
+                        createdAt
+                    }}
+                }}
             }}
         }}
     }}
@@ -77,6 +225,23 @@ async def test_graphql_query_get_non_existing_creator(test_client):
         assert response.json()["errors"][0]["message"] == "Creator does not exist."
 
 
+async def test_graphql_query_get_creators(add_test_creator, test_creator_data, test_client):
+    await add_test_creator
+    test_email = test_creator_data["email"]
+    get_creators = f"""
+        {{
+            getCreators(emails: ["{test_email}", "non_existing@example.com"]) {{
+                email
+            }}
+        }}
+    """
+    async for client in test_client:
+        response = await client.post("/graphql", json={"query": get_creators})
+        assert response.status_code == 200
+        assert "errors" not in response.json()
+        assert response.json()["data"]["getCreators"] == [{"email": test_email}, None]
+
+
 async def test_graphql_query_search_creators(add_test_creator, test_creator_data, test_client):
     await add_test_creator
     test_email = test_creator_data["email"]
@@ -85,8 +250,12 @@ async def test_graphql_query_search_creators(add_test_creator, test_creator_data
         searchCreators(searchText: "{test_email}", page: 1, perPage: 10) {{
             email
             assets {{
-                type
-                createdAt
+                edges {{
+                    node {{
+                        type
+                        createdAt
+                    }}
+                }}
             }}
         }}
     }}
@@ -99,11 +268,236 @@ async def test_graphql_query_search_creators(add_test_creator, test_creator_data
         assert response.json()["data"]["searchCreators"][0]["email"] == test_email
 
 
+async def _index_creators(creators: list[dict], in_mongo: bool = True):
+    if in_mongo:
+        db = await get_test_db()
+        await db["creators"].insert_many([creator.copy() for creator in creators])
+    es = await get_test_es()
+    for creator in creators:
+        doc = ElasticsearchManager._prepare_mongo_doc_for_es(creator)
+        await es.index(index="creator", id=str(creator["_id"]), document=doc)
+    await es.indices.refresh(index="creator")
+    await es.close()
+
+
+@pytest.mark.parametrize("hydrate_from_mongo", [False, True])
+async def test_graphql_query_search_creators_in_rank_order(hydrate_from_mongo, faker, test_client, monkeypatch):
+    monkeypatch.setattr(creator_service.settings, "search_hydrate_from_mongo", hydrate_from_mongo)
+    token = faker.lexify("??????????").lower()
+    # Indexed in the reverse order of their scores, the shorter username matching better.
+    await _index_creators(
+        [
+            {"_id": ObjectId(), "username": f"{token} with a longer username", "email": f"second@{token}.com"},
+            {"_id": ObjectId(), "username": token, "email": f"first@{token}.com"},
+        ]
+    )
+    search_creators = f"""
+    {{
+        searchCreators(searchText: "{token}") {{
+            email
+        }}
+    }}
+    """
+    async for client in test_client:
+        response = await client.post("/graphql", json={"query": search_creators})
+        assert "errors" not in response.json()
+        assert response.json()["data"]["searchCreators"] == [
+            {"email": f"first@{token}.com"},
+            {"email": f"second@{token}.com"},
+        ]
+
+
+async def test_graphql_query_search_creators_from_source(faker, test_client, monkeypatch):
+    monkeypatch.setattr(creator_service.settings, "search_hydrate_from_mongo", False)
+    token = faker.lexify("??????????").lower()
+    # Only in the index, so it can only be served from the `_source` of its hit.
+    await _index_creators([{"_id": ObjectId(), "username": token, "email": f"{token}@example.com"}], in_mongo=False)
+    search_creators = f"""
+    {{
+        searchCreators(searchText: "{token}") {{
+            username
+            email
+        }}
+    }}
+    """
+    async for client in test_client:
+        response = await client.post("/graphql", json={"query": search_creators})
+        assert "errors" not in response.json()
+        assert response.json()["data"]["searchCreators"] == [{"username": token, "email": f"{token}@example.com"}]
+
+
+async def test_graphql_query_search_creators_hydrated_from_mongo(faker, test_client, monkeypatch):
+    monkeypatch.setattr(creator_service.settings, "search_hydrate_from_mongo", True)
+    token = faker.lexify("??????????").lower()
+    creator = {"_id": ObjectId(), "username": token, "email": f"{token}@example.com"}
+    await _index_creators([creator])
+    await _index_creators([{"_id": ObjectId(), "username": token, "email": f"deleted@{token}.com"}], in_mongo=False)
+    db = await get_test_db()
+    await db["creators"].update_one({"_id": creator["_id"]}, {"$set": {"username": f"{token} renamed"}})
+    search_creators = f"""
+    {{
+        searchCreators(searchText: "{token}") {{
+            username
+            email
+        }}
+    }}
+    """
+    async for client in test_client:
+        response = await client.post("/graphql", json={"query": search_creators})
+        assert "errors" not in response.json()
+        # The latest data of the creators still in the database.
+        assert response.json()["data"]["searchCreators"] == [
+            {"username": f"{token} renamed", "email": f"{token}@example.com"}
+        ]
+
+
+async def test_graphql_query_search_creators_by_multi_word_asset_type(test_creator_data, test_client):
+    test_email = test_creator_data["email"]
+    es = await get_test_es()
+    await es.index(
+        index="creator",
+        id=str(ObjectId()),
+        document={**test_creator_data, "assets": [{"type": "3D Model", "created_at": "2023-01-01T00:00:00"}]},
+        refresh=True,
+    )
+    await es.close()
+    search_creators = """
+    {
+        searchCreators(searchText: "3d model") {
+            email
+        }
+    }
+    """
+    async for client in test_client:
+        response = await client.post("/graphql", json={"query": search_creators})
+        assert "errors" not in response.json()
+        assert response.json()["data"]["searchCreators"] == [{"email": test_email}]
+
+
+async def test_graphql_query_search_creators_with_structured_query(add_test_creator, test_creator_data, test_client):
+    await add_test_creator
+    test_email = test_creator_data["email"]
+    search_creators = f"""
+    {{
+        withoutAssets: searchCreators(query: {{text: "{test_email}"}}) {{
+            email
+        }}
+        withAssets: searchCreators(query: {{text: "{test_email}", assetTypes: ["video"]}}) {{
+            email
+        }}
+    }}
+    """
+    async for client in test_client:
+        response = await client.post("/graphql", json={"query": search_creators})
+        assert response.status_code == 200
+        assert "errors" not in response.json()
+        assert response.json()["data"]["withoutAssets"] == [{"email": test_email}]
+        assert response.json()["data"]["withAssets"] == []
+
+
+async def test_graphql_query_search_creators_with_both_search_text_and_query(test_client):
+    search_creators = """
+    {
+        searchCreators(searchText: "anything", query: {text: "anything"}) {
+            email
+        }
+    }
+    """
+    async for client in test_client:
+        response = await client.post("/graphql", json={"query": search_creators})
+        assert response.status_code == 200
+        assert "errors" in response.json()
+        assert response.json()["errors"][0]["message"] == "Only one of searchText and query can be given."
+
+
+async def test_graphql_query_search_creators_with_invalid_search_text(test_client, monkeypatch):
+    # The search text is parsed as a query string whatever the mode of the structured searches.
+    monkeypatch.setattr(queries.settings, "search_query_mode", "match")
+    search_creators = """
+    {
+        searchCreators(searchText: "username:(creator") {
+            email
+        }
+    }
+    """
+    async for client in test_client:
+        response = await client.post("/graphql", json={"query": search_creators})
+        assert response.status_code == 200
+        assert response.json()["errors"][0]["message"] == "Search text is invalid."
+
+
+async def test_graphql_query_search_creators_with_empty_signed_up_range(test_client):
+    search_creators = """
+    {
+        searchCreators(query: {signedUpFrom: "2023-02-01T00:00:00", signedUpTo: "2023-01-01T00:00:00"}) {
+            email
+        }
+    }
+    """
+    async for client in test_client:
+        response = await client.post("/graphql", json={"query": search_creators})
+        assert response.status_code == 200
+        assert response.json()["errors"][0]["message"] == "signed_up_from must not be later than signed_up_to"
+
+
+async def test_graphql_query_search_creators_with_facets(add_test_creator, test_creator_data, test_client):
+    await add_test_creator
+    test_email = test_creator_data["email"]
+    search_creators_with_facets = f"""
+    {{
+        searchCreatorsWithFacets(query: {{text: "{test_email}"}}) {{
+            creators {{
+                email
+            }}
+            facets {{
+                assetTypes {{
+                    key
+                    count
+                }}
+                signedUp {{
+                    count
+                }}
+            }}
+        }}
+    }}
+    """
+    async for client in test_client:
+        response = await client.post("/graphql", json={"query": search_creators_with_facets})
+        assert response.status_code == 200
+        assert "errors" not in response.json()
+        result = response.json()["data"]["searchCreatorsWithFacets"]
+        assert result["creators"] == [{"email": test_email}]
+        assert result["facets"] == {"assetTypes": [], "signedUp": [{"count": 1}]}
+
+
+async def test_graphql_query_search_creators_with_facets_and_total(add_test_creator, test_creator_data, test_client):
+    await add_test_creator
+    test_email = test_creator_data["email"]
+    search_creators_with_facets = f"""
+    {{
+        searchCreatorsWithFacets(query: {{text: "{test_email}"}}, totalHits: EXACT) {{
+            total {{
+                value
+                isExact
+            }}
+        }}
+        countCreators(query: {{text: "{test_email}"}})
+    }}
+    """
+    async for client in test_client:
+        response = await client.post("/graphql", json={"query": search_creators_with_facets})
+        assert response.status_code == 200
+        assert "errors" not in response.json()
+        assert response.json()["data"]["searchCreatorsWithFacets"]["total"] == {"value": 1, "isExact": True}
+        assert response.json()["data"]["countCreators"] == 1
+
+
 @pytest.mark.parametrize(
     "page, per_page, expected_error",
     [
         (0, 10, "Page must be greater than or equal to 1."),
         (1, 0, "Per page must be greater than or equal to 1."),
+        (1001, 10, "Only the first 10000 results can be paged through, page further with searchCreatorsConnection."),
     ],
 )
 async def test_graphql_query_search_creators_with_page_errors(
@@ -121,8 +515,12 @@ async def test_graphql_query_search_creators_with_page_errors(
         searchCreators(searchText: "{test_email}", page: {page}, perPage: {per_page}) {{
             email
             assets {{
-                type
-                createdAt
+                edges {{
+                    node {{
+                        type
+                        createdAt
+                    }}
+                }}
             }}
         }}
     }}
@@ -132,3 +530,124 @@ async def test_graphql_query_search_creators_with_page_errors(
         assert response.status_code == 200
         assert "errors" in response.json()
         assert response.json()["errors"][0]["message"] == expected_error
+
+
+async def test_graphql_query_search_creators_connection(add_test_creator, test_creator_data, test_client):
+    await add_test_creator
+    test_email = test_creator_data["email"]
+    search_creators_connection = f"""
+    {{
+        searchCreatorsConnection(searchText: "{test_email}", first: 10) {{
+            edges {{
+                cursor
+                node {{
+                    email
+                }}
+            }}
+            pageInfo {{
+                hasNextPage
+                endCursor
+            }}
+        }}
+    }}
+    """
+    async for client in test_client:
+        response = await client.post("/graphql", json={"query": search_creators_connection})
+        assert response.status_code == 200
+        assert "errors" not in response.json()
+        connection = response.json()["data"]["searchCreatorsConnection"]
+        assert len(connection["edges"]) == 1
+        assert connection["edges"][0]["node"]["email"] == test_email
+        assert connection["pageInfo"] == {"hasNextPage": False, "endCursor": connection["edges"][0]["cursor"]}
+
+
+async def test_graphql_query_search_creators_connection_with_invalid_cursor(test_client):
+    search_creators_connection = """
+    {
+        searchCreatorsConnection(searchText: "anything", first: 10, after: "invalid") {
+            pageInfo {
+                hasNextPage
+            }
+        }
+    }
+    """
+    async for client in test_client:
+        response = await client.post("/graphql", json={"query": search_creators_connection})
+        assert response.status_code == 200
+        assert "errors" in response.json()
+        assert response.json()["errors"][0]["message"] == "Cursor is invalid."
+
+
+async def test_graphql_query_search_creators_connection_with_cursor_of_another_search(test_client):
+    cursor = creator_service._encode_cursor("pit_id", [1.0, 0], "another search")
+    search_creators_connection = f"""
+    {{
+        searchCreatorsConnection(searchText: "anything", first: 10, after: "{cursor}") {{
+            pageInfo {{
+                hasNextPage
+            }}
+        }}
+    }}
+    """
+    async for client in test_client:
+        response = await client.post("/graphql", json={"query": search_creators_connection})
+        assert response.status_code == 200
+        assert response.json()["errors"][0]["message"] == "Cursor is from a different search."
+
+
+async def test_graphql_query_search_creators_connection_closes_the_point_in_time_of_a_failed_search(test_client):
+    search_creators_connection = """
+    {
+        searchCreatorsConnection(searchText: "username:(creator", first: 10) {
+            pageInfo {
+                hasNextPage
+            }
+        }
+    }
+    """
+    close_point_in_time = ElasticsearchManager.close_point_in_time
+    with patch.object(
+        ElasticsearchManager, "close_point_in_time", autospec=True, side_effect=close_point_in_time
+    ) as close:
+        async for client in test_client:
+            response = await client.post("/graphql", json={"query": search_creators_connection})
+            assert response.json()["errors"][0]["message"] == "Search text is invalid."
+
+    close.assert_awaited_once()
+
+
+@pytest.mark.parametrize("first", [0, 101])
+async def test_graphql_query_search_creators_connection_with_page_too_large(test_client, first):
+    search_creators_connection = f"""
+    {{
+        searchCreatorsConnection(searchText: "anything", first: {first}) {{
+            pageInfo {{
+                hasNextPage
+            }}
+        }}
+    }}
+    """
+    async for client in test_client:
+        response = await client.post("/graphql", json={"query": search_creators_connection})
+        assert response.status_code == 200
+        assert response.json()["errors"][0]["message"] == "First must be between 1 and 100."
+
+
+async def test_graphql_query_suggest_creators(add_test_creator, test_creator_data, test_client):
+    await add_test_creator
+    test_username = test_creator_data["username"]
+    suggest_creators = f"""
+    {{
+        suggestCreators(prefix: "{test_username[:-1]}", limit: 5) {{
+            username
+            email
+        }}
+    }}
+    """
+    async for client in test_client:
+        response = await client.post("/graphql", json={"query": suggest_creators})
+        assert response.status_code == 200
+        assert "errors" not in response.json()
+        assert response.json()["data"]["suggestCreators"] == [
+            {"username": test_username, "email": test_creator_data["email"]}
+        ]
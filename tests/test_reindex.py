@@ -0,0 +1,128 @@
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app import reindex
+from app.database.mongodb import close_db
+from app.search_engine.elasticsearch import close_es
+from app.search_engine.manager import ElasticsearchManager
+from app.search_engine.mappings import CREATOR_INDEX, INDICES, get_versioned_index_name, get_write_alias
+from tests.conftest import get_test_db, get_test_es
+
+pytestmark = pytest.mark.asyncio
+
+OLD_INDEX_NAME = "creator_v0"
+
+
+@pytest.fixture
+async def old_creator_index() -> tuple:
+    """
+    The creator index in a version older than the current one, behind the read and the write alias,
+    along with the database and the Elasticsearch client to check the rollover with.
+    """
+    db = await get_test_db()
+    es = await get_test_es()
+    for index_name in await es.indices.get(index="creator*"):
+        await es.indices.delete(index=index_name)
+    ElasticsearchManager.known_indices.clear()
+    ElasticsearchManager.write_indices.clear()
+    await es.indices.create(
+        index=OLD_INDEX_NAME,
+        mappings=CREATOR_INDEX["mappings"],
+        aliases={"creator": {}, get_write_alias("creator"): {}},
+    )
+    yield db, es
+    await es.close()
+    # The clients of the rollover are bound to the event loop of the test.
+    await close_db()
+    await close_es()
+
+
+async def test_rollover_moves_the_aliases_to_the_new_index(old_creator_index, test_creator_data):
+    async for db, es in old_creator_index:
+        creator_id = str((await db["creators"].insert_one(test_creator_data)).inserted_id)
+
+        with patch.object(reindex, "WRITE_INDICES_TTL", 0):
+            await reindex.rollover()
+
+        new_index_name = get_versioned_index_name("creator")
+        assert set(await es.indices.get_alias(name="creator")) == {new_index_name}
+        assert set(await es.indices.get_alias(name=get_write_alias("creator"))) == {new_index_name}
+        assert await es.exists(index=new_index_name, id=creator_id)
+        # Kept for the searches still paginating through it.
+        assert await es.indices.exists(index=OLD_INDEX_NAME)
+
+
+async def test_rollover_deletes_the_documents_deleted_during_the_backfill(old_creator_index, test_creator_data):
+    async for db, es in old_creator_index:
+        creator_id = (await db["creators"].insert_one(test_creator_data)).inserted_id
+        copy_collection = reindex._copy_collection
+
+        async def copy_collection_deleted_meanwhile(*args, **kwargs):
+            result = await copy_collection(*args, **kwargs)
+            # Deleted after it was read, its deletion having found nothing to delete in the new index yet.
+            await db["creators"].delete_one({"_id": creator_id})
+            return result
+
+        with patch.object(reindex, "WRITE_INDICES_TTL", 0):
+            with patch.object(reindex, "_copy_collection", new=copy_collection_deleted_meanwhile):
+                await reindex.rollover()
+
+        assert not await es.exists(index=get_versioned_index_name("creator"), id=str(creator_id))
+
+
+async def test_copy_collection_copies_all_the_batches(faker):
+    db = await get_test_db()
+    es = await get_test_es()
+    creators = [{"username": faker.user_name(), "email": faker.email(), "assets": []} for _ in range(5)]
+    await db["creators"].insert_many(creators)
+
+    result = await reindex._copy_collection(db, ElasticsearchManager(es), "creators", "creator", "index", 2, 2)
+
+    assert result == (5, 0)
+    for creator in creators:
+        assert await es.exists(index="creator", id=str(creator["_id"]))
+    await es.close()
+
+
+async def test_copy_collection_keeps_the_documents_written_meanwhile(test_creator_data):
+    db = await get_test_db()
+    es = await get_test_es()
+    creator_id = str((await db["creators"].insert_one(test_creator_data)).inserted_id)
+    await es.index(index="creator", id=creator_id, document={**test_creator_data, "username": "newer"})
+
+    result = await reindex._copy_collection(db, ElasticsearchManager(es), "creators", "creator", "create", 10, 1)
+
+    assert result == (1, 0)
+    assert (await es.get(index="creator", id=creator_id))["_source"]["username"] == "newer"
+    await es.close()
+
+
+async def test_copy_collection_counts_the_failed_documents(test_creator_data):
+    db = await get_test_db()
+    es = await get_test_es()
+    creator_id = str((await db["creators"].insert_one(test_creator_data)).inserted_id)
+    manager = ElasticsearchManager(es)
+    error = {"index": {"_index": "creator_v1", "_id": creator_id, "status": 429}}
+
+    with patch.object(manager, "bulk", new=AsyncMock(return_value=[error])):
+        result = await reindex._copy_collection(db, manager, "creators", "creator", "index", 10, 1)
+
+    assert result == (0, 1)
+    await es.close()
+
+
+async def test_rollover_restores_the_settings_of_the_new_index_after_a_failed_backfill(old_creator_index):
+    async for _, es in old_creator_index:
+        new_index_name = get_versioned_index_name("creator")
+
+        with patch.object(reindex, "WRITE_INDICES_TTL", 0):
+            with patch.object(reindex, "_copy_collection", new=AsyncMock(side_effect=RuntimeError("Unavailable"))):
+                with pytest.raises(RuntimeError):
+                    await reindex.rollover()
+
+        index_settings = (await es.indices.get_settings(index=new_index_name))[new_index_name]["settings"]["index"]
+        assert index_settings["refresh_interval"] == INDICES["creator"]["settings"]["refresh_interval"]
+        assert index_settings["number_of_replicas"] == str(INDICES["creator"]["settings"]["number_of_replicas"])
+        # Left behind the read alias of the old index, for the rollover to resume.
+        assert set(await es.indices.get_alias(name="creator")) == {OLD_INDEX_NAME}
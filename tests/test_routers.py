@@ -0,0 +1,81 @@
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+
+from app.services.creator import import_creators
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_import_creators_from_ndjson(mocked_redis, faker, test_client):
+    test_email = faker.email()
+    lines = [
+        json.dumps({"username": faker.user_name(), "email": test_email}),
+        "not json",
+        json.dumps({"username": faker.user_name(), "email": test_email}),
+    ]
+    async for client in test_client:
+        response = await client.post("/creators/import", content="\n".join(lines))
+        assert response.status_code == 200
+        assert response.json()["created"] == 1
+        assert response.json()["failed"] == 2
+        assert [error["line"] for error in response.json()["errors"]] == [2, 3]
+        assert response.json()["errors"][1]["error"] == "Creator already exists."
+
+
+async def test_import_creators_indexes_the_inserted_creators_when_the_write_fails(mocked_redis, faker):
+    rows = [{"username": faker.user_name(), "email": faker.email()} for _ in range(3)]
+
+    def insert_many_failing_the_second(creators: list[dict], ordered: bool):
+        for creator in creators:
+            creator["_id"] = ObjectId()
+        raise BulkWriteError({"writeErrors": [{"index": 1, "code": 1, "errmsg": "Failed."}]})
+
+    collection = MagicMock()
+    collection.insert_many = AsyncMock(side_effect=insert_many_failing_the_second)
+    # Neither of the inserted creators is waiting for a sync job yet.
+    mocked_redis.pipeline.return_value.execute.return_value = [None, None]
+
+    with pytest.raises(BulkWriteError):
+        await import_creators({"creators": collection}, rows)
+
+    creators = collection.insert_many.await_args.args[0]
+    mocked_redis.enqueue_job.assert_awaited_once_with(
+        "es_sync_documents", "creators", "creator", [str(creators[0]["_id"]), str(creators[2]["_id"])]
+    )
+
+
+async def test_export_creators_to_ndjson(add_test_creator, test_creator_data, test_client):
+    await add_test_creator
+    async for client in test_client:
+        response = await client.get("/creators/export")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        creators = [json.loads(line) for line in response.text.splitlines()]
+        assert [creator["email"] for creator in creators] == [test_creator_data["email"]]
+
+        response = await client.get("/creators/export", params={"asset_type": "video"})
+        assert response.status_code == 200
+        assert response.text == ""
+
+
+async def test_metrics(add_test_creator, test_creator_data, test_client):
+    await add_test_creator
+    get_creator = f"""
+        query GetCreator {{
+            getCreator(email: "{test_creator_data["email"]}") {{
+                email
+            }}
+        }}
+    """
+    async for client in test_client:
+        response = await client.post("/graphql", json={"query": get_creator})
+        assert response.status_code == 200
+
+        response = await client.get("/metrics")
+        assert response.status_code == 200
+        assert 'graphql_operation_seconds_count{operation_name="GetCreator",operation_type="query"}' in response.text
+        assert 'mongodb_command_seconds_count{command="insert",status="succeeded"}' in response.text
@@ -0,0 +1,66 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from app.cache import search as search_cache
+from app.cache.search import bump_search_generation, cache_search, get_cached_search, get_search_cache_key
+from app.models.search import CreatorSearchModel
+from app.search_engine.manager import ElasticsearchManager
+from app.services.creator import search_creators_page
+from app.worker import get_redis
+from tests.conftest import get_test_db
+
+pytestmark = pytest.mark.asyncio
+
+QUERY = {"match_all": {}}
+
+
+async def test_search_results_are_cached_per_search():
+    redis = await get_redis()
+    key = await get_search_cache_key(redis, "test", QUERY, 1, 10)
+    await cache_search(redis, key, {"creators": []})
+
+    assert await get_cached_search(redis, key) == {"creators": []}
+    assert await get_search_cache_key(redis, "test", QUERY, 1, 10) == key
+    assert await get_search_cache_key(redis, "test", QUERY, 2, 10) != key
+
+
+async def test_bump_search_generation_invalidates_the_cached_results():
+    redis = await get_redis()
+    key = await get_search_cache_key(redis, "test", QUERY, 1, 10)
+    await cache_search(redis, key, {"creators": []})
+
+    await bump_search_generation(redis, "test")
+
+    new_key = await get_search_cache_key(redis, "test", QUERY, 1, 10)
+    assert new_key != key
+    assert await get_cached_search(redis, new_key) is None
+
+
+async def test_results_searched_before_the_refresh_are_not_served_after_it():
+    redis = await get_redis()
+    with patch.object(search_cache, "_get_refresh_interval", return_value=0.1):
+        await bump_search_generation(redis, "test")
+    settling_key = await get_search_cache_key(redis, "test", QUERY, 1, 10)
+    await cache_search(redis, settling_key, {"creators": []})
+
+    await asyncio.sleep(0.2)
+
+    key = await get_search_cache_key(redis, "test", QUERY, 1, 10)
+    assert key != settling_key
+    assert await get_cached_search(redis, key) is None
+
+
+async def test_search_creators_page_is_served_from_the_cache(test_creator_data):
+    db = await get_test_db()
+    search = CreatorSearchModel(text=test_creator_data["email"])
+
+    with patch.object(ElasticsearchManager, "search", autospec=True, side_effect=ElasticsearchManager.search) as es:
+        first = await search_creators_page(db, search)
+        second = await search_creators_page(db, search)
+        await bump_search_generation(await get_redis(), "creator")
+        await search_creators_page(db, search)
+
+    assert second == first
+    assert es.call_count == 2
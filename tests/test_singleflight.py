@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app.cache.singleflight import SingleFlight
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_single_flight_coalesces_concurrent_calls():
+    single_flight = SingleFlight("test")
+    calls = 0
+
+    async def fn():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "result"
+
+    results = await asyncio.gather(*(single_flight.do("key", fn) for _ in range(5)))
+    assert results == ["result"] * 5
+    assert calls == 1
+    assert single_flight.calls == 5
+    assert single_flight.coalesced == 4
+
+
+async def test_single_flight_exports_its_counters():
+    single_flight = SingleFlight("test_metrics")
+
+    async def fn():
+        await asyncio.sleep(0.01)
+        return "result"
+
+    await asyncio.gather(*(single_flight.do("key", fn) for _ in range(3)))
+    assert REGISTRY.get_sample_value("single_flight_calls_total", {"name": "test_metrics"}) == 3
+    assert REGISTRY.get_sample_value("single_flight_coalesced_total", {"name": "test_metrics"}) == 2
+
+
+async def test_single_flight_coalesces_overlapping_batches():
+    single_flight = SingleFlight("test")
+    batches = []
+
+    async def fn(keys):
+        batches.append(keys)
+        await asyncio.sleep(0.01)
+        return {key: key.upper() for key in keys if key != "missing"}
+
+    first, second = await asyncio.gather(
+        single_flight.do_many(["a", "b"], fn),
+        single_flight.do_many(["b", "c", "missing"], fn),
+    )
+    assert first == {"a": "A", "b": "B"}
+    assert second == {"b": "B", "c": "C", "missing": None}
+    assert batches == [["a", "b"], ["c", "missing"]]
+    assert single_flight.coalesced == 1
+
+
+async def test_single_flight_shares_exceptions_and_forgets_finished_calls():
+    single_flight = SingleFlight("test")
+
+    async def fn():
+        await asyncio.sleep(0.01)
+        raise ValueError("Failed.")
+
+    results = await asyncio.gather(single_flight.do("key", fn), single_flight.do("key", fn), return_exceptions=True)
+    assert all(isinstance(result, ValueError) for result in results)
+
+    async def other_fn():
+        return "result"
+
+    assert await single_flight.do("key", other_fn) == "result"
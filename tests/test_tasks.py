@@ -0,0 +1,90 @@
+from unittest.mock import patch
+
+import pytest
+from arq import Retry
+from bson import ObjectId
+
+from app.search_engine.manager import ElasticsearchManager
+from app.tasks.elasticsearch import SYNC_MAX_TRIES, _get_sync_state_key, es_sync_document, mark_document_dirty
+from app.worker import get_redis
+from tests.conftest import get_test_db, get_test_es
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+async def sync_ctx(test_creator_data) -> tuple[dict, str]:
+    """
+    The context of the sync jobs, along with the ID of a test creator to sync.
+    """
+    db = await get_test_db()
+    es = await get_test_es()
+    result = await db["creators"].insert_one(test_creator_data)
+    yield {"db": db, "es": es, "redis": await get_redis(), "job_try": 1}, str(result.inserted_id)
+    await es.close()
+
+
+async def test_mark_document_dirty_coalesces_the_jobs():
+    redis = await get_redis()
+    doc_id = str(ObjectId())
+    assert await mark_document_dirty(redis, "creator", doc_id)
+    assert not await mark_document_dirty(redis, "creator", doc_id)
+    await redis.delete(_get_sync_state_key("creator", doc_id))
+    assert await mark_document_dirty(redis, "creator", doc_id)
+
+
+async def test_es_sync_document_indexes_the_latest_state(sync_ctx):
+    async for ctx, test_creator_id in sync_ctx:
+        db, es, redis = ctx["db"], ctx["es"], ctx["redis"]
+        await mark_document_dirty(redis, "creator", test_creator_id)
+        index_document = ElasticsearchManager.index_document
+
+        async def index_document_written_meanwhile(self, index_name: str, doc_id: str, doc: dict):
+            if doc["username"] != "latest":
+                await db["creators"].update_one({"_id": ObjectId(doc_id)}, {"$set": {"username": "latest"}})
+                # Picked up by the running job instead of a new one.
+                assert not await mark_document_dirty(redis, "creator", doc_id)
+            await index_document(self, index_name=index_name, doc_id=doc_id, doc=doc)
+
+        with patch.object(ElasticsearchManager, "index_document", new=index_document_written_meanwhile):
+            await es_sync_document(ctx, "creators", "creator", test_creator_id)
+
+        es_doc = await es.get(index="creator", id=test_creator_id)
+        assert es_doc["_source"]["username"] == "latest"
+        assert await redis.get(_get_sync_state_key("creator", test_creator_id)) is None
+
+
+async def test_es_sync_document_deletes_the_removed_documents(sync_ctx):
+    async for ctx, test_creator_id in sync_ctx:
+        db, es = ctx["db"], ctx["es"]
+        await es_sync_document(ctx, "creators", "creator", test_creator_id)
+        await db["creators"].delete_one({"_id": ObjectId(test_creator_id)})
+
+        await es_sync_document(ctx, "creators", "creator", test_creator_id)
+
+        assert not await es.exists(index="creator", id=test_creator_id)
+
+
+async def test_es_sync_document_retries_a_failed_sync(sync_ctx):
+    async for ctx, test_creator_id in sync_ctx:
+        redis = ctx["redis"]
+        await mark_document_dirty(redis, "creator", test_creator_id)
+
+        with patch.object(ElasticsearchManager, "get_write_indices", side_effect=RuntimeError("Unavailable")):
+            with pytest.raises(Retry):
+                await es_sync_document(ctx, "creators", "creator", test_creator_id)
+
+        assert await redis.get(_get_sync_state_key("creator", test_creator_id)) == b"dirty"
+        assert not await mark_document_dirty(redis, "creator", test_creator_id)
+
+
+async def test_es_sync_document_gives_up_after_the_last_try(sync_ctx):
+    async for ctx, test_creator_id in sync_ctx:
+        redis = ctx["redis"]
+        await mark_document_dirty(redis, "creator", test_creator_id)
+
+        with patch.object(ElasticsearchManager, "get_write_indices", side_effect=RuntimeError("Unavailable")):
+            with pytest.raises(RuntimeError):
+                await es_sync_document({**ctx, "job_try": SYNC_MAX_TRIES}, "creators", "creator", test_creator_id)
+
+        assert await mark_document_dirty(redis, "creator", test_creator_id)